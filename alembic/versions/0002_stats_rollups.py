@@ -0,0 +1,57 @@
+"""stats rollup tables
+
+Revision ID: 0002_stats_rollups
+Revises: 0001_initial
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_stats_rollups"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "request_stats_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", sa.Enum("draft", "pending", "approved", "rejected", "paid", name="request_status", create_type=False), nullable=False),
+        sa.Column("creator_id", sa.BigInteger(), nullable=False),
+        sa.Column("request_count", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("total_amount", sa.Numeric(36, 18), nullable=False, server_default=sa.text("0")),
+        sa.PrimaryKeyConstraint("day", "status", "creator_id"),
+    )
+
+    op.create_table(
+        "aml_risk_stats_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("risk_level", sa.Enum("low", "medium", "high", name="risk_level", create_type=False), nullable=False),
+        sa.Column("check_count", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.PrimaryKeyConstraint("day", "risk_level"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO request_stats_daily (day, status, creator_id, request_count, total_amount)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, status, creator_id, count(*), sum(amount)
+        FROM payment_requests
+        GROUP BY 1, 2, 3;
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO aml_risk_stats_daily (day, risk_level, check_count)
+        SELECT (checked_at AT TIME ZONE 'UTC')::date, risk_level, count(*)
+        FROM wallet_checks
+        GROUP BY 1, 2;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("aml_risk_stats_daily")
+    op.drop_table("request_stats_daily")
@@ -0,0 +1,30 @@
+"""search indexes on payment requests
+
+Revision ID: 0003_search_indexes
+Revises: 0002_stats_rollups
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "0003_search_indexes"
+down_revision = "0002_stats_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.execute("CREATE INDEX idx_payment_requests_address_trgm ON payment_requests USING gin (address gin_trgm_ops);")
+    op.execute("CREATE INDEX idx_payment_requests_request_no_trgm ON payment_requests USING gin (request_no gin_trgm_ops);")
+    op.execute(
+        "CREATE INDEX idx_payment_requests_comment_fts ON payment_requests "
+        "USING gin (to_tsvector('simple', coalesce(comment, '')));"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_payment_requests_comment_fts;")
+    op.execute("DROP INDEX IF EXISTS idx_payment_requests_request_no_trgm;")
+    op.execute("DROP INDEX IF EXISTS idx_payment_requests_address_trgm;")
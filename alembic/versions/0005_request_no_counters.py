@@ -0,0 +1,27 @@
+"""request_no counters
+
+Revision ID: 0005_request_no_counters
+Revises: 0004_idempotency_keys
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_request_no_counters"
+down_revision = "0004_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "request_no_counters",
+        sa.Column("period", sa.Text(), primary_key=True),
+        sa.Column("next_value", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("request_no_counters")
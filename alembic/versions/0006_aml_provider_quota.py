@@ -0,0 +1,29 @@
+"""aml provider daily quota
+
+Revision ID: 0006_aml_provider_quota
+Revises: 0005_request_no_counters
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_aml_provider_quota"
+down_revision = "0005_request_no_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "aml_provider_quota",
+        sa.Column("provider", sa.String(length=64), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("used", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("provider", "day"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("aml_provider_quota")
@@ -0,0 +1,23 @@
+"""request risk escalation flag
+
+Revision ID: 0007_request_risk_escalation
+Revises: 0006_aml_provider_quota
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_request_risk_escalation"
+down_revision = "0006_aml_provider_quota"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("payment_requests", sa.Column("risk_escalated_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("payment_requests", "risk_escalated_at")
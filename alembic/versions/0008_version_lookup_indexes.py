@@ -0,0 +1,27 @@
+"""covering indexes for ETag version lookups
+
+Revision ID: 0008_version_lookup_indexes
+Revises: 0007_request_risk_escalation
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "0008_version_lookup_indexes"
+down_revision = "0007_request_risk_escalation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX idx_payment_requests_id_updated_at ON payment_requests (id) INCLUDE (updated_at);")
+    # (request_id, id) serves both history listing and max(id) lookups, so it replaces the single-column index.
+    op.create_index("idx_status_history_request_id_id", "status_history", ["request_id", "id"])
+    op.drop_index("idx_status_history_request_id", table_name="status_history")
+
+
+def downgrade() -> None:
+    op.create_index("idx_status_history_request_id", "status_history", ["request_id"])
+    op.drop_index("idx_status_history_request_id_id", table_name="status_history")
+    op.execute("DROP INDEX IF EXISTS idx_payment_requests_id_updated_at;")
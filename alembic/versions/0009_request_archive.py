@@ -0,0 +1,70 @@
+"""archive tables for terminal payment requests
+
+Revision ID: 0009_request_archive
+Revises: 0008_version_lookup_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_request_archive"
+down_revision = "0008_version_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+REQUEST_STATUSES = ("draft", "pending", "approved", "rejected", "paid")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_requests_archive",
+        sa.Column("id", sa.UUID(), primary_key=True),
+        sa.Column("request_no", sa.Text(), nullable=False, unique=True),
+        sa.Column("creator_id", sa.BigInteger(), nullable=False),
+        sa.Column("address", sa.Text(), nullable=False),
+        sa.Column("network", sa.Text(), nullable=False),
+        sa.Column("asset", sa.Text(), nullable=False),
+        sa.Column("amount", sa.Numeric(36, 18), nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("attachment_url", sa.Text(), nullable=True),
+        sa.Column("aml_check_id", sa.UUID(), nullable=False),
+        sa.Column("status", sa.Enum(*REQUEST_STATUSES, name="request_status", create_type=False), nullable=False),
+        sa.Column("approved_by", sa.BigInteger(), nullable=True),
+        sa.Column("approved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rejection_reason", sa.Text(), nullable=True),
+        sa.Column("tx_hash", sa.Text(), nullable=True, unique=True),
+        sa.Column("paid_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("risk_escalated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index("idx_payment_requests_archive_created_at", "payment_requests_archive", ["created_at"])
+    op.create_index("idx_payment_requests_archive_status_created_at", "payment_requests_archive", ["status", "created_at"])
+    op.create_table(
+        "status_history_archive",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("request_id", sa.UUID(), nullable=False),
+        sa.Column("old_status", sa.Enum(*REQUEST_STATUSES, name="request_status", create_type=False), nullable=True),
+        sa.Column("new_status", sa.Enum(*REQUEST_STATUSES, name="request_status", create_type=False), nullable=False),
+        sa.Column("actor_id", sa.BigInteger(), nullable=True),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("idx_status_history_archive_request_id_id", "status_history_archive", ["request_id", "id"])
+    # Lets each archive batch find its candidates without scanning the live part of the hot table.
+    op.execute(
+        "CREATE INDEX idx_payment_requests_terminal_updated_at ON payment_requests (updated_at) "
+        "WHERE status IN ('paid', 'rejected');"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_payment_requests_terminal_updated_at;")
+    op.drop_index("idx_status_history_archive_request_id_id", table_name="status_history_archive")
+    op.drop_table("status_history_archive")
+    op.drop_index("idx_payment_requests_archive_status_created_at", table_name="payment_requests_archive")
+    op.drop_index("idx_payment_requests_archive_created_at", table_name="payment_requests_archive")
+    op.drop_table("payment_requests_archive")
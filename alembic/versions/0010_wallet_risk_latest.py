@@ -0,0 +1,39 @@
+"""latest risk per address
+
+Revision ID: 0010_wallet_risk_latest
+Revises: 0009_request_archive
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_wallet_risk_latest"
+down_revision = "0009_request_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wallet_risk_latest",
+        sa.Column("address", sa.Text(), nullable=False),
+        sa.Column("network", sa.Text(), nullable=False),
+        sa.Column("check_id", sa.UUID(), sa.ForeignKey("wallet_checks.id"), nullable=False),
+        sa.Column("provider", sa.Text(), nullable=False),
+        sa.Column("risk_score", sa.Numeric(5, 2), nullable=False),
+        sa.Column("risk_level", sa.Enum("low", "medium", "high", name="risk_level", create_type=False), nullable=False),
+        sa.Column("checked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("address", "network"),
+    )
+    # One pass over the existing history; from here on save_wallet_check keeps the table current.
+    op.execute(
+        "INSERT INTO wallet_risk_latest (address, network, check_id, provider, risk_score, risk_level, checked_at) "
+        "SELECT DISTINCT ON (address, network) address, network, id, provider, risk_score, risk_level, checked_at "
+        "FROM wallet_checks ORDER BY address, network, checked_at DESC, id DESC;"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("wallet_risk_latest")
@@ -0,0 +1,45 @@
+"""payout batches
+
+Revision ID: 0011_payout_batches
+Revises: 0010_wallet_risk_latest
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_payout_batches"
+down_revision = "0010_wallet_risk_latest"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE payout_batch_status AS ENUM ('open', 'settled');")
+    op.create_table(
+        "payout_batches",
+        sa.Column("id", sa.UUID(), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("status", sa.Enum("open", "settled", name="payout_batch_status", create_type=False), nullable=False, server_default=sa.text("'open'")),
+        sa.Column("created_by", sa.BigInteger(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("item_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("total_amount", sa.Numeric(36, 18), nullable=False, server_default=sa.text("0")),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("settled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_table(
+        "payout_batch_items",
+        sa.Column("request_id", sa.UUID(), primary_key=True),
+        sa.Column("batch_id", sa.UUID(), sa.ForeignKey("payout_batches.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("request_no", sa.Text(), nullable=False),
+        sa.Column("amount", sa.Numeric(36, 18), nullable=False),
+    )
+    # Settlement files are matched by request_no within one batch.
+    op.create_index("idx_payout_batch_items_batch_id_request_no", "payout_batch_items", ["batch_id", "request_no"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_payout_batch_items_batch_id_request_no", table_name="payout_batch_items")
+    op.drop_table("payout_batch_items")
+    op.drop_table("payout_batches")
+    op.execute("DROP TYPE IF EXISTS payout_batch_status;")
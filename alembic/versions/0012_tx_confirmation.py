@@ -0,0 +1,47 @@
+"""on-chain confirmation of paid requests
+
+Revision ID: 0012_tx_confirmation
+Revises: 0011_payout_batches
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_tx_confirmation"
+down_revision = "0011_payout_batches"
+branch_labels = None
+depends_on = None
+
+TABLES = ("payment_requests", "payment_requests_archive")
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE tx_confirmation_status AS ENUM ('confirmed', 'mismatch', 'failed', 'not_found');")
+    # The archive gets the same columns: archiving copies every payment_requests column by name.
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "tx_confirmation",
+                sa.Enum("confirmed", "mismatch", "failed", "not_found", name="tx_confirmation_status", create_type=False),
+                nullable=True,
+            ),
+        )
+        op.add_column(table, sa.Column("tx_block_number", sa.BigInteger(), nullable=True))
+        op.add_column(table, sa.Column("tx_checked_at", sa.DateTime(timezone=True), nullable=True))
+    # The confirmation worker's queue: paid requests not verified yet, least recently looked up first.
+    op.execute(
+        "CREATE INDEX idx_payment_requests_tx_unconfirmed ON payment_requests (tx_checked_at NULLS FIRST, paid_at) "
+        "WHERE status = 'paid' AND tx_confirmation IS NULL;"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_payment_requests_tx_unconfirmed;")
+    for table in TABLES:
+        op.drop_column(table, "tx_checked_at")
+        op.drop_column(table, "tx_block_number")
+        op.drop_column(table, "tx_confirmation")
+    op.execute("DROP TYPE tx_confirmation_status;")
@@ -0,0 +1,39 @@
+"""audit log lookup indexes
+
+Revision ID: 0013_audit_log_indexes
+Revises: 0012_tx_confirmation
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "0013_audit_log_indexes"
+down_revision = "0012_tx_confirmation"
+branch_labels = None
+depends_on = None
+
+# Every index ends in (created_at, id), the keyset order of GET /audit, so each filter reads one index range.
+INDEXES = {
+    "idx_audit_logs_created_at_id": "(created_at, id)",
+    "idx_audit_logs_entity_created_at_id": "(entity_type, entity_id, created_at, id)",
+    "idx_audit_logs_actor_created_at_id": "(actor_id, created_at, id)",
+    "idx_audit_logs_action_created_at_id": "(action, created_at, id)",
+}
+
+
+def upgrade() -> None:
+    # audit_logs is the largest table and is written on every transition; CONCURRENTLY keeps those writes going
+    # while the indexes build. It cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON audit_logs {columns};")
+        # (created_at, id) serves everything the single-column index did.
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_audit_logs_created_at;")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_created_at ON audit_logs (created_at);")
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
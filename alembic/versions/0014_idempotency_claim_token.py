@@ -0,0 +1,24 @@
+"""idempotency claim token
+
+Revision ID: 0014_idempotency_claim_token
+Revises: 0013_audit_log_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014_idempotency_claim_token"
+down_revision = "0013_audit_log_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Identifies the run holding a key, so a worker whose lease was taken over cannot store over or delete it.
+    op.add_column("idempotency_keys", sa.Column("claim_token", sa.UUID(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "claim_token")
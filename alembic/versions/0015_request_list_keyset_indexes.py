@@ -0,0 +1,42 @@
+"""request list keyset indexes
+
+Revision ID: 0015_request_list_keyset_indexes
+Revises: 0014_idempotency_claim_token
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "0015_request_list_keyset_indexes"
+down_revision = "0014_idempotency_claim_token"
+branch_labels = None
+depends_on = None
+
+# GET /requests pages on (created_at, id) descending in both tables; ending every index in id lets each UNION ALL
+# branch stop after one page instead of sorting the ties.
+INDEXES = {
+    "idx_payment_requests_created_at_id": "payment_requests (created_at, id)",
+    "idx_payment_requests_archive_created_at_id": "payment_requests_archive (created_at, id)",
+    "idx_payment_requests_archive_status_created_at_id": "payment_requests_archive (status, created_at, id)",
+}
+REPLACED = {
+    "idx_payment_requests_archive_created_at": "payment_requests_archive (created_at)",
+    "idx_payment_requests_archive_status_created_at": "payment_requests_archive (status, created_at)",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, target in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target};")
+        for name in REPLACED:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, target in REPLACED.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target};")
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
@@ -0,0 +1,26 @@
+import uuid
+from datetime import datetime
+
+
+def request_etag(request_id: uuid.UUID, updated_at: datetime, expand: set[str] = frozenset(), last_history_id: int | None = None) -> str:
+    # Weak: equal tags mean the same resource version, not byte-identical JSON.
+    tag = f"{request_id.hex}-{int(updated_at.timestamp() * 1_000_000)}"
+    if expand:
+        tag += "-" + ".".join(sorted(expand))
+    if "history" in expand:
+        tag += f"-{last_history_id or 0}"
+    return f'W/"{tag}"'
+
+
+def history_etag(request_id: uuid.UUID, last_history_id: int | None) -> str:
+    return f'W/"h-{request_id.hex}-{last_history_id or 0}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides.
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
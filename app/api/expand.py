@@ -0,0 +1,64 @@
+from collections.abc import Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas import RequestDetail, StatusHistoryItem, UserResponse, WalletCheckResponse
+from app.db.models import PaymentRequest, StatusHistory, StatusHistoryArchive, User, WalletCheck
+
+EXPAND_OPTIONS = ("aml_check", "history", "creator")
+
+
+def parse_expand(expand: str | None) -> set[str]:
+    if not expand:
+        return set()
+    fields = {part.strip() for part in expand.split(",") if part.strip()}
+    unknown = fields - set(EXPAND_OPTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown expand field(s): {', '.join(sorted(unknown))}; allowed: {', '.join(EXPAND_OPTIONS)}",
+        )
+    return fields
+
+
+async def expand_requests(
+    db: AsyncSession, requests: Sequence[PaymentRequest], expand: set[str], archived: bool = False
+) -> list[RequestDetail]:
+    # One IN query per expanded relation, whatever the number of requests.
+    details = [RequestDetail.model_validate(request) for request in requests]
+    if not details or not expand:
+        return details
+
+    if "aml_check" in expand:
+        check_ids = {detail.aml_check_id for detail in details}
+        checks = (await db.execute(select(WalletCheck).where(WalletCheck.id.in_(check_ids)))).scalars().all()
+        by_id = {check.id: WalletCheckResponse.model_validate(check) for check in checks}
+        for detail in details:
+            detail.aml_check = by_id.get(detail.aml_check_id)
+
+    if "history" in expand:
+        request_ids = [detail.id for detail in details]
+        model = StatusHistoryArchive if archived else StatusHistory
+        rows = (
+            await db.execute(
+                select(model)
+                .where(model.request_id.in_(request_ids))
+                .order_by(model.request_id, model.created_at.asc(), model.id.asc())
+            )
+        ).scalars().all()
+        history: dict = {request_id: [] for request_id in request_ids}
+        for row in rows:
+            history[row.request_id].append(StatusHistoryItem.model_validate(row))
+        for detail in details:
+            detail.history = history[detail.id]
+
+    if "creator" in expand:
+        creator_ids = {detail.creator_id for detail in details}
+        users = (await db.execute(select(User).where(User.id.in_(creator_ids)))).scalars().all()
+        by_id = {user.id: UserResponse.model_validate(user) for user in users}
+        for detail in details:
+            detail.creator = by_id.get(detail.creator_id)
+
+    return details
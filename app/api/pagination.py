@@ -0,0 +1,28 @@
+import base64
+import binascii
+from datetime import datetime
+
+
+def encode_cursor(*parts: object) -> str:
+    raw = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    # A plain ValueError, since the export service and scripts decode cursors too; routes turn it into a 400.
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    parts = raw.split("|")
+    if len(parts) != size:
+        raise ValueError("Invalid cursor")
+    return parts
+
+
+def decode_time_cursor(cursor: str) -> tuple[datetime, str]:
+    created_at, row_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), row_id
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
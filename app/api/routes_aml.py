@@ -1,11 +1,17 @@
-﻿from fastapi import APIRouter, Depends
+﻿import math
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_actor_id, get_actor_role, require_role
-from app.api.schemas import AmlCheckRequest, AmlCheckResponse
-from app.db.models import UserRole, WalletCheck
+from app.api.schemas import AddressRiskResponse, AmlCheckRequest, AmlCheckResponse
+from app.db.models import UserRole
 from app.db.session import get_db
-from app.services.aml_provider import get_aml_provider
+from app.services.aml_provider import AmlProviderUnavailable, get_aml_provider
+from app.services.idempotency import run_idempotent
+from app.services.tron_address import InvalidTronAddress, normalize_tron_address
+from app.services.wallet_checks import build_latest_query, is_stale, save_wallet_check, screen_address
 
 router = APIRouter(tags=["AML"])
 
@@ -16,27 +22,47 @@ async def run_aml_check(
     db: AsyncSession = Depends(get_db),
     actor_id: int = Depends(get_actor_id),
     actor_role: UserRole = Depends(get_actor_role),
+    idempotency_key: Annotated[str | None, Header(max_length=255)] = None,
 ) -> AmlCheckResponse:
     require_role({UserRole.manager, UserRole.analyst, UserRole.head, UserRole.admin}, actor_role)
-    aml_provider = get_aml_provider()
-    risk_score, risk_level, categories, raw_report = await aml_provider.check(payload.address, payload.network)
-    check = WalletCheck(
-        address=payload.address,
-        network=payload.network,
-        provider=aml_provider.provider_name,
-        risk_score=risk_score,
-        risk_level=risk_level,
-        categories_json=[c.model_dump() for c in categories],
-        raw_report_json=raw_report,
-        checked_by=actor_id,
+    return await run_idempotent(
+        db, idempotency_key, actor_id, "POST /aml/check", payload, AmlCheckResponse, lambda: _run_aml_check(payload, db, actor_id)
     )
-    db.add(check)
+
+
+async def _run_aml_check(payload: AmlCheckRequest, db: AsyncSession, actor_id: int) -> AmlCheckResponse:
+    try:
+        provider_name, result = await screen_address(payload.address, payload.network, get_aml_provider())
+    except AmlProviderUnavailable as exc:
+        headers = {"Retry-After": str(max(1, math.ceil(exc.retry_after_s)))} if exc.retry_after_s is not None else None
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc), headers=headers) from exc
+    check = await save_wallet_check(db, payload.address, payload.network, provider_name, result, actor_id)
     await db.commit()
     await db.refresh(check)
     return AmlCheckResponse(
         check_id=check.id,
         risk_score=float(check.risk_score),
         risk_level=check.risk_level,
-        categories=categories,
+        categories=result[2],
         checked_at=check.checked_at,
     )
+
+
+@router.get("/aml/addresses/{address}", response_model=AddressRiskResponse)
+async def get_address_risk(
+    address: str,
+    network: str = Query(default="TRON", pattern="^TRON$"),
+    db: AsyncSession = Depends(get_db),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> AddressRiskResponse:
+    require_role({UserRole.manager, UserRole.analyst, UserRole.head, UserRole.admin}, actor_role)
+    try:
+        address = normalize_tron_address(address)
+    except InvalidTronAddress as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    latest = (await db.execute(build_latest_query(address, network))).scalar_one_or_none()
+    if latest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Address has not been checked")
+    response = AddressRiskResponse.model_validate(latest)
+    response.stale = is_stale(latest.checked_at)
+    return response
@@ -0,0 +1,63 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_actor_role, require_role
+from app.db.session import get_sessionmaker
+from app.db.models import RequestStatus, UserRole
+from app.services.export import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    ExportFilter,
+    build_export_query,
+    iter_export_chunks,
+    require_parquet,
+    stream_export,
+)
+
+router = APIRouter(tags=["Export"])
+
+
+async def _export_body(dataset: str, filters: ExportFilter, fmt: str, chunk_size: int) -> AsyncIterator[bytes]:
+    # The request-scoped session is closed before a streaming body runs, so the export owns its own session.
+    async with get_sessionmaker()() as session:
+        chunks = iter_export_chunks(session, dataset, filters, chunk_size)
+        async for data in stream_export(chunks, dataset, fmt):
+            yield data
+
+
+@router.get("/export/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = "csv",
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    status_filter: RequestStatus | None = Query(default=None, alias="status"),
+    after: str | None = None,
+    chunk_size: int = Query(default=DEFAULT_CHUNK_SIZE, ge=100, le=50000),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> StreamingResponse:
+    require_role({UserRole.head, UserRole.analyst, UserRole.admin}, actor_role)
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown export dataset")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported export format")
+    filters = ExportFilter(date_from=date_from, date_to=date_to, status=status_filter, after=after)
+    try:
+        build_export_query(dataset, filters)
+        if format == "parquet":
+            require_parquet()
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc)) from exc
+    get_sessionmaker()
+
+    return StreamingResponse(
+        _export_body(dataset, filters, format, chunk_size),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
@@ -0,0 +1,104 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_actor_id, get_actor_role, require_role
+from app.api.schemas import PayoutBatchCreate, PayoutBatchResponse, SettleReport
+from app.config import get_settings
+from app.db.models import PayoutBatch, UserRole
+from app.db.session import get_db
+from app.services.bulk_import import IMPORT_FORMATS, ImportFormatError, ImportTooLarge
+from app.services.payouts import (
+    build_export_query,
+    build_paid_count_query,
+    create_batch,
+    read_settle_lines,
+    render_export_csv,
+    settle_batch,
+)
+
+router = APIRouter(tags=["Payouts"])
+
+SETTLE_BODY = {"requestBody": {"required": True, "content": {media: {"schema": {"type": "string"}} for media in IMPORT_FORMATS}}}
+
+
+async def get_batch(db: AsyncSession, batch_id: uuid.UUID) -> PayoutBatch:
+    batch = (await db.execute(select(PayoutBatch).where(PayoutBatch.id == batch_id))).scalar_one_or_none()
+    if batch is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payout batch not found")
+    return batch
+
+
+@router.post("/payout-batches", response_model=PayoutBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_payout_batch(
+    payload: PayoutBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    actor_id: int = Depends(get_actor_id),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> PayoutBatchResponse:
+    require_role({UserRole.head, UserRole.admin}, actor_role)
+    max_size = get_settings().payout_batch_max_size
+    if payload.request_ids is not None and len(payload.request_ids) > max_size:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"At most {max_size} requests per batch")
+    batch = await create_batch(db, actor_id, payload.request_ids, max_size)
+    if batch is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No approved requests outside other payout batches")
+    return PayoutBatchResponse.model_validate(batch)
+
+
+@router.get("/payout-batches/{batch_id}", response_model=PayoutBatchResponse)
+async def get_payout_batch(
+    batch_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> PayoutBatchResponse:
+    require_role({UserRole.head, UserRole.analyst, UserRole.admin}, actor_role)
+    batch = await get_batch(db, batch_id)
+    response = PayoutBatchResponse.model_validate(batch)
+    response.paid_count = (await db.execute(build_paid_count_query(batch_id))).scalar_one_or_none() or 0
+    return response
+
+
+@router.get("/payout-batches/{batch_id}/export", response_class=Response)
+async def export_payout_batch(
+    batch_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> Response:
+    require_role({UserRole.head, UserRole.admin}, actor_role)
+    await get_batch(db, batch_id)
+    # Bounded by PAYOUT_BATCH_MAX_SIZE, so the file is built in memory rather than streamed.
+    rows = (await db.execute(build_export_query(batch_id))).all()
+    return Response(
+        render_export_csv(rows),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="payout-batch-{batch_id}.csv"'},
+    )
+
+
+@router.post("/payout-batches/{batch_id}/settle", response_model=SettleReport, openapi_extra=SETTLE_BODY)
+async def settle_payout_batch(
+    batch_id: uuid.UUID,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    actor_id: int = Depends(get_actor_id),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> SettleReport:
+    require_role({UserRole.head, UserRole.admin}, actor_role)
+    media_type = http_request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(media_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Send one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    batch = await get_batch(db, batch_id)
+    settings = get_settings()
+    try:
+        lines = await read_settle_lines(http_request.stream(), fmt, settings.import_max_bytes, settings.import_max_rows)
+    except ImportTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return await settle_batch(db, batch, lines, actor_id, settings.payout_settle_chunk_size)
@@ -1,23 +1,51 @@
 ﻿import uuid
 from datetime import datetime
+from decimal import Decimal
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import Select, false, func, literal_column, or_, select, true, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_actor_id, get_actor_role, require_role
-from app.api.schemas import DecisionPayload, MarkPaidPayload, RequestCreate, RequestResponse, StatusHistoryItem
-from app.db.models import AuditLog, PaymentRequest, RequestStatus, StatusHistory, UserRole, WalletCheck
+from app.api.etag import etag_matches, history_etag, request_etag
+from app.api.expand import expand_requests, parse_expand
+from app.api.pagination import decode_cursor, decode_time_cursor, encode_cursor
+from app.api.schemas import (
+    DecisionPayload,
+    ImportReport,
+    MarkPaidPayload,
+    RequestCreate,
+    RequestDetail,
+    RequestResponse,
+    RequestSearchHit,
+    RequestSearchResponse,
+    StatusHistoryItem,
+)
+from app.db.models import (
+    AuditLog,
+    PaymentRequest,
+    PaymentRequestArchive,
+    RequestStatus,
+    StatusHistory,
+    StatusHistoryArchive,
+    User,
+    UserRole,
+    WalletCheck,
+)
+from app.config import get_settings
 from app.db.session import get_db
+from app.services.aml_provider import get_aml_provider
+from app.services.bulk_import import IMPORT_FORMATS, ImportFormatError, ImportTooLarge, import_requests, read_import_rows
+from app.services.idempotency import run_idempotent
+from app.services.policy import ApprovalFacts, ApprovalPolicy, get_approval_policy
+from app.services.request_numbers import next_request_no
+from app.services.stats import bump_request_stats
+from app.services.wallet_checks import build_latest_query, is_stale
 
 router = APIRouter(tags=["Requests"])
 
 
-def build_request_no() -> str:
-    now = datetime.utcnow()
-    return f"PAY-{now:%Y%m}-{uuid.uuid4().hex[:4].upper()}"
-
-
 def ensure_transition(old_status: RequestStatus, new_status: RequestStatus) -> None:
     allowed = {
         RequestStatus.draft: {RequestStatus.pending, RequestStatus.rejected},
@@ -35,15 +63,15 @@ def ensure_transition(old_status: RequestStatus, new_status: RequestStatus) -> N
 
 async def log_status(
     db: AsyncSession,
-    request_id: uuid.UUID,
+    request: PaymentRequest,
     old_status: RequestStatus | None,
     new_status: RequestStatus,
-    actor_id: int,
+    actor_id: int | None,
     reason: str | None = None,
 ) -> None:
     db.add(
         StatusHistory(
-            request_id=request_id,
+            request_id=request.id,
             old_status=old_status,
             new_status=new_status,
             actor_id=actor_id,
@@ -55,10 +83,11 @@ async def log_status(
             actor_id=actor_id,
             action="request_status_changed",
             entity_type="payment_request",
-            entity_id=str(request_id),
+            entity_id=str(request.id),
             payload_json={"old_status": old_status.value if old_status else None, "new_status": new_status.value, "reason": reason},
         )
     )
+    await bump_request_stats(db, request, old_status, new_status)
 
 
 @router.post("/requests", response_model=RequestResponse, status_code=status.HTTP_201_CREATED)
@@ -67,13 +96,33 @@ async def create_request(
     db: AsyncSession = Depends(get_db),
     actor_id: int = Depends(get_actor_id),
     actor_role: UserRole = Depends(get_actor_role),
+    idempotency_key: Annotated[str | None, Header(max_length=255)] = None,
 ) -> RequestResponse:
     require_role({UserRole.manager, UserRole.admin}, actor_role)
-    check = (await db.execute(select(WalletCheck).where(WalletCheck.id == payload.aml_check_id))).scalar_one_or_none()
-    if not check:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AML check not found")
+    return await run_idempotent(
+        db, idempotency_key, actor_id, "POST /requests", payload, RequestResponse, lambda: _create_request(payload, db, actor_id)
+    )
+
+
+async def ensure_fresh_check(db: AsyncSession, payload: RequestCreate) -> None:
+    # One primary-key lookup in the common case: the request cites the newest check of its own address.
+    latest = (await db.execute(build_latest_query(payload.address, payload.network))).scalar_one_or_none()
+    if latest is None or latest.check_id != payload.aml_check_id:
+        check = (await db.execute(select(WalletCheck.id).where(WalletCheck.id == payload.aml_check_id))).scalar_one_or_none()
+        if not check:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AML check not found")
+        detail = "AML check is not the latest for this address"
+        if latest is not None:
+            detail += f"; use check {latest.check_id}"
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+    if is_stale(latest.checked_at):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="AML check is stale; run a new check")
+
+
+async def _create_request(payload: RequestCreate, db: AsyncSession, actor_id: int) -> RequestResponse:
+    await ensure_fresh_check(db, payload)
     request = PaymentRequest(
-        request_no=build_request_no(),
+        request_no=await next_request_no(),
         creator_id=actor_id,
         address=payload.address,
         network=payload.network,
@@ -86,37 +135,261 @@ async def create_request(
     )
     db.add(request)
     await db.flush()
-    await log_status(db, request.id, None, RequestStatus.draft, actor_id, "created")
+    await log_status(db, request, None, RequestStatus.draft, actor_id, "created")
     await db.commit()
     await db.refresh(request)
     return RequestResponse.model_validate(request)
 
 
-@router.get("/requests", response_model=list[RequestResponse])
+@router.post(
+    "/requests/import",
+    response_model=ImportReport,
+    openapi_extra={"requestBody": {"required": True, "content": {media: {"schema": {"type": "string"}} for media in IMPORT_FORMATS}}},
+)
+async def import_requests_file(
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    actor_id: int = Depends(get_actor_id),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> ImportReport:
+    require_role({UserRole.manager, UserRole.admin}, actor_role)
+    media_type = http_request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(media_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Send one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    settings = get_settings()
+    try:
+        rows = await read_import_rows(http_request.stream(), fmt, settings.import_max_bytes, settings.import_max_rows)
+    except ImportTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return await import_requests(
+        db, rows, actor_id, get_aml_provider(), settings.import_chunk_size, settings.import_aml_concurrency
+    )
+
+
+EXPAND_DESCRIPTION = "Comma-separated related rows to embed: aml_check, history, creator"
+
+
+# Only terminal requests are archived, so a filter on a live status never needs the archive table.
+ARCHIVE_EXCLUDED_STATUSES = {RequestStatus.draft, RequestStatus.pending, RequestStatus.approved}
+
+
+def _keyset(stmt: Select, model, status: RequestStatus | None, after: tuple[datetime, uuid.UUID] | None, limit: int) -> Select:
+    if status:
+        stmt = stmt.where(model.status == status)
+    if after is not None:
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(*after))
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def decode_list_cursor(after: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        created_at, raw_id = decode_time_cursor(after)
+        return created_at, uuid.UUID(raw_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def build_list_query(model, status: RequestStatus | None, limit: int, after: tuple[datetime, uuid.UUID] | None = None) -> Select:
+    return _keyset(select(model), model, status, after, limit)
+
+
+def build_merged_page_query(status: RequestStatus | None, limit: int, after: tuple[datetime, uuid.UUID] | None = None) -> Select:
+    # Only ids of one page cross the UNION ALL: each branch stops after limit + 1 rows of its (created_at, id) index
+    # from migration 0015, so the archive is never read past the page however large it grows.
+    branches = [
+        _keyset(select(model.id, model.created_at, flag.label("archived")), model, status, after, limit)
+        for model, flag in ((PaymentRequest, false()), (PaymentRequestArchive, true()))
+    ]
+    page = union_all(*branches).subquery("page")
+    return select(page).order_by(page.c.created_at.desc(), page.c.id.desc()).limit(limit + 1)
+
+
+async def _load_merged_page(db: AsyncSession, page: list, fields: set[str]) -> list[RequestDetail]:
+    details: dict[uuid.UUID, RequestDetail] = {}
+    for model, archived in ((PaymentRequest, False), (PaymentRequestArchive, True)):
+        ids = [row.id for row in page if row.archived == archived]
+        if ids:
+            rows = (await db.execute(select(model).where(model.id.in_(ids)))).scalars().all()
+            details.update((detail.id, detail) for detail in await expand_requests(db, rows, fields, archived=archived))
+    return [details[row.id] for row in page if row.id in details]
+
+
+# exclude_unset: relations that were not requested are left out instead of being returned as null.
+@router.get("/requests", response_model=list[RequestDetail], response_model_exclude_unset=True)
 async def list_requests(
+    response: Response,
     status: RequestStatus | None = None,
+    expand: str | None = Query(default=None, description=EXPAND_DESCRIPTION),
+    include_archived: bool = Query(default=False, description="Also return paid/rejected requests moved to the archive"),
+    limit: int = Query(default=100, ge=1, le=500),
+    after: str | None = None,
     db: AsyncSession = Depends(get_db),
     actor_role: UserRole = Depends(get_actor_role),
-) -> list[RequestResponse]:
+) -> list[RequestDetail]:
     require_role({UserRole.manager, UserRole.head, UserRole.analyst, UserRole.admin}, actor_role)
-    stmt = select(PaymentRequest).order_by(PaymentRequest.created_at.desc())
-    if status:
-        stmt = stmt.where(PaymentRequest.status == status)
-    rows = (await db.execute(stmt)).scalars().all()
-    return [RequestResponse.model_validate(row) for row in rows]
+    fields = parse_expand(expand)
+    after_key = decode_list_cursor(after) if after else None
+    if include_archived and status not in ARCHIVE_EXCLUDED_STATUSES:
+        page = (await db.execute(build_merged_page_query(status, limit, after_key))).all()
+        items = await _load_merged_page(db, page[:limit], fields)
+        has_more = len(page) > limit
+    else:
+        rows = (await db.execute(build_list_query(PaymentRequest, status, limit, after_key))).scalars().all()
+        items = await expand_requests(db, rows[:limit], fields)
+        has_more = len(rows) > limit
+    # The body stays a plain array for existing clients; the cursor for the next page travels in a header.
+    if has_more and items:
+        response.headers["X-Next-Cursor"] = encode_cursor(items[-1].created_at, items[-1].id)
+    return items
+
+
+def build_search_query(q: str, limit: int, after: str | None = None) -> Select:
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    # Literal config/default so the expression matches idx_payment_requests_comment_fts under prepared statements.
+    document = func.to_tsvector(literal_column("'simple'::regconfig"), func.coalesce(PaymentRequest.comment, literal_column("''")))
+    ts_query = func.plainto_tsquery(literal_column("'simple'::regconfig"), q)
+    # All three predicates are served by the GIN indexes from migration 0003 (pg_trgm + full-text).
+    rank = func.greatest(
+        func.word_similarity(q, PaymentRequest.address),
+        func.word_similarity(q, PaymentRequest.request_no),
+        func.ts_rank(document, ts_query),
+    ).label("rank")
+    stmt = select(PaymentRequest, rank).where(
+        or_(
+            PaymentRequest.address.ilike(pattern),
+            PaymentRequest.address.op("%>")(q),
+            PaymentRequest.request_no.ilike(pattern),
+            document.op("@@")(ts_query),
+        )
+    )
+    if after:
+        try:
+            raw_rank, raw_id = decode_cursor(after, 2)
+            stmt = stmt.where(tuple_(rank, PaymentRequest.id) < tuple_(float(raw_rank), uuid.UUID(raw_id)))
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    return stmt.order_by(rank.desc(), PaymentRequest.id.desc()).limit(limit + 1)
+
+
+@router.get("/requests/search", response_model=RequestSearchResponse)
+async def search_requests(
+    q: str = Query(min_length=3, max_length=128),
+    limit: int = Query(default=20, ge=1, le=100),
+    after: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> RequestSearchResponse:
+    require_role({UserRole.manager, UserRole.head, UserRole.analyst, UserRole.admin}, actor_role)
+    rows = (await db.execute(build_search_query(q.strip(), limit, after))).all()
+    items = [
+        RequestSearchHit(**RequestResponse.model_validate(item).model_dump(), rank=rank)
+        for item, rank in rows[:limit]
+    ]
+    next_cursor = encode_cursor(items[-1].rank, items[-1].id) if len(rows) > limit else None
+    return RequestSearchResponse(items=items, next_cursor=next_cursor)
+
+
+def last_history_id_query(request_id: uuid.UUID, archived: bool = False):
+    model = StatusHistoryArchive if archived else StatusHistory
+    return select(func.max(model.id)).where(model.request_id == request_id).scalar_subquery()
+
+
+def build_version_query(request_id: uuid.UUID, archived: bool = False) -> Select:
+    # Served from the covering indexes in migration 0008 without touching the heap rows.
+    model = PaymentRequestArchive if archived else PaymentRequest
+    return select(model.updated_at, last_history_id_query(request_id, archived).label("last_history_id")).where(
+        model.id == request_id
+    )
+
+
+async def find_request(db: AsyncSession, request_id: uuid.UUID) -> tuple[PaymentRequest | PaymentRequestArchive | None, bool]:
+    item = (await db.execute(select(PaymentRequest).where(PaymentRequest.id == request_id))).scalar_one_or_none()
+    if item is not None:
+        return item, False
+    # A miss on the hot table is rare for live ids; only then pay for the archive lookup.
+    item = (await db.execute(select(PaymentRequestArchive).where(PaymentRequestArchive.id == request_id))).scalar_one_or_none()
+    return item, item is not None
 
 
-@router.get("/requests/{request_id}", response_model=RequestResponse)
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+@router.get("/requests/{request_id}", response_model=RequestDetail, response_model_exclude_unset=True)
 async def get_request(
     request_id: uuid.UUID,
+    response: Response,
+    expand: str | None = Query(default=None, description=EXPAND_DESCRIPTION),
+    if_none_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_db),
     actor_role: UserRole = Depends(get_actor_role),
-) -> RequestResponse:
+) -> RequestDetail:
     require_role({UserRole.manager, UserRole.head, UserRole.analyst, UserRole.admin}, actor_role)
-    item = (await db.execute(select(PaymentRequest).where(PaymentRequest.id == request_id))).scalar_one_or_none()
+    fields = parse_expand(expand)
+    # The version lookup only covers the request and its history; an expanded creator can change on its own, so
+    # those responses carry no ETag rather than one that would answer 304 for a stale user.
+    cacheable = "creator" not in fields
+    if if_none_match and cacheable:
+        version = (await db.execute(build_version_query(request_id))).one_or_none()
+        if version is None:
+            version = (await db.execute(build_version_query(request_id, archived=True))).one_or_none()
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
+        # Archiving copies updated_at and history ids unchanged, so ETags cached before the move still match.
+        etag = request_etag(request_id, version.updated_at, fields, version.last_history_id)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    item, archived = await find_request(db, request_id)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
-    return RequestResponse.model_validate(item)
+    detail = (await expand_requests(db, [item], fields, archived))[0]
+    last_history_id = max((row.id for row in detail.history), default=None) if detail.history is not None else None
+    if cacheable:
+        response.headers["ETag"] = request_etag(item.id, item.updated_at, fields, last_history_id)
+    return detail
+
+
+async def apply_approval_policy(db: AsyncSession, item: PaymentRequest, policy: ApprovalPolicy) -> str | None:
+    if getattr(item, "risk_escalated_at", None) is not None:
+        return None
+    row = (
+        await db.execute(
+            select(
+                WalletCheck.risk_level, WalletCheck.risk_score, WalletCheck.categories_json, WalletCheck.checked_at, User.role
+            ).where(
+                WalletCheck.id == item.aml_check_id,
+                # Only a check of this very address may approve it; drafts created before the link was enforced
+                # can point anywhere.
+                WalletCheck.address == item.address,
+                WalletCheck.network == item.network,
+                User.id == item.creator_id,
+            )
+        )
+    ).one_or_none()
+    if row is None or is_stale(row.checked_at):
+        return None
+    facts = ApprovalFacts(
+        asset=item.asset,
+        amount=Decimal(item.amount),
+        risk_level=row.risk_level,
+        risk_score=float(row.risk_score),
+        categories=tuple((str(c.get("name", "")), float(c.get("score", 0))) for c in row.categories_json or []),
+        creator_role=row.role,
+    )
+    rule = policy.evaluate(facts)
+    if rule is None:
+        return None
+    # Same transaction as the submit: the request is never visible as pending to approvers.
+    item.status = RequestStatus.approved
+    item.approved_by = None
+    item.approved_at = datetime.utcnow()
+    await log_status(db, item, RequestStatus.pending, RequestStatus.approved, None, f"policy:{rule}")
+    return rule
 
 
 @router.post("/requests/{request_id}/submit", response_model=RequestResponse)
@@ -133,7 +406,10 @@ async def submit_request(
     old = item.status
     ensure_transition(old, RequestStatus.pending)
     item.status = RequestStatus.pending
-    await log_status(db, item.id, old, RequestStatus.pending, actor_id, "submitted")
+    await log_status(db, item, old, RequestStatus.pending, actor_id, "submitted")
+    policy = get_approval_policy()
+    if policy:
+        await apply_approval_policy(db, item, policy)
     await db.commit()
     await db.refresh(item)
     return RequestResponse.model_validate(item)
@@ -156,7 +432,7 @@ async def approve_request(
     item.status = RequestStatus.approved
     item.approved_by = actor_id
     item.approved_at = datetime.utcnow()
-    await log_status(db, item.id, old, RequestStatus.approved, actor_id, payload.reason if payload else None)
+    await log_status(db, item, old, RequestStatus.approved, actor_id, payload.reason if payload else None)
     await db.commit()
     await db.refresh(item)
     return RequestResponse.model_validate(item)
@@ -178,7 +454,7 @@ async def reject_request(
     ensure_transition(old, RequestStatus.rejected)
     item.status = RequestStatus.rejected
     item.rejection_reason = payload.reason
-    await log_status(db, item.id, old, RequestStatus.rejected, actor_id, payload.reason)
+    await log_status(db, item, old, RequestStatus.rejected, actor_id, payload.reason)
     await db.commit()
     await db.refresh(item)
     return RequestResponse.model_validate(item)
@@ -198,10 +474,14 @@ async def mark_paid(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
     old = item.status
     ensure_transition(old, RequestStatus.paid)
+    # The unique index on payment_requests.tx_hash no longer sees hashes of archived payouts.
+    archived = (await db.execute(select(PaymentRequestArchive.id).where(PaymentRequestArchive.tx_hash == payload.tx_hash))).scalar_one_or_none()
+    if archived is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tx_hash already used by an archived request")
     item.status = RequestStatus.paid
     item.tx_hash = payload.tx_hash
     item.paid_at = datetime.utcnow()
-    await log_status(db, item.id, old, RequestStatus.paid, actor_id, "marked paid")
+    await log_status(db, item, old, RequestStatus.paid, actor_id, "marked paid")
     await db.commit()
     await db.refresh(item)
     return RequestResponse.model_validate(item)
@@ -210,11 +490,31 @@ async def mark_paid(
 @router.get("/requests/{request_id}/history", response_model=list[StatusHistoryItem])
 async def request_history(
     request_id: uuid.UUID,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_db),
     actor_role: UserRole = Depends(get_actor_role),
 ) -> list[StatusHistoryItem]:
     require_role({UserRole.manager, UserRole.head, UserRole.analyst, UserRole.admin}, actor_role)
+    if if_none_match:
+        # History is append-only, so the newest id identifies the version.
+        last_id = (await db.execute(select(last_history_id_query(request_id)))).scalar_one_or_none()
+        if last_id is None:
+            last_id = (await db.execute(select(last_history_id_query(request_id, archived=True)))).scalar_one_or_none()
+        etag = history_etag(request_id, last_id)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
     rows = (
         await db.execute(select(StatusHistory).where(StatusHistory.request_id == request_id).order_by(StatusHistory.created_at.asc()))
     ).scalars().all()
+    if not rows:
+        # Every request has at least its "created" entry, so an empty hot history means it was archived or never existed.
+        rows = (
+            await db.execute(
+                select(StatusHistoryArchive)
+                .where(StatusHistoryArchive.request_id == request_id)
+                .order_by(StatusHistoryArchive.created_at.asc())
+            )
+        ).scalars().all()
+    response.headers["ETag"] = history_etag(request_id, max((row.id for row in rows), default=None))
     return [StatusHistoryItem.model_validate(row) for row in rows]
@@ -0,0 +1,75 @@
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_actor_role, require_role
+from app.api.schemas import CreatorStat, DailyStatusStat, RiskLevelStat, StatsResponse, StatusStat
+from app.db.models import AmlRiskStatsDaily, RequestStatsDaily, UserRole
+from app.db.session import get_db
+
+router = APIRouter(tags=["Stats"])
+
+DEFAULT_WINDOW_DAYS = 30
+MAX_WINDOW_DAYS = 366
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    db: AsyncSession = Depends(get_db),
+    actor_role: UserRole = Depends(get_actor_role),
+) -> StatsResponse:
+    require_role({UserRole.head, UserRole.analyst, UserRole.admin}, actor_role)
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_WINDOW_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Date range is limited to {MAX_WINDOW_DAYS} days")
+
+    in_range = RequestStatsDaily.day.between(date_from, date_to)
+    count = func.sum(RequestStatsDaily.request_count)
+    amount = func.sum(RequestStatsDaily.total_amount)
+
+    by_day = (
+        await db.execute(
+            select(RequestStatsDaily.day, RequestStatsDaily.status, count, amount)
+            .where(in_range)
+            .group_by(RequestStatsDaily.day, RequestStatsDaily.status)
+            .order_by(RequestStatsDaily.day, RequestStatsDaily.status)
+        )
+    ).all()
+    by_creator = (
+        await db.execute(
+            select(RequestStatsDaily.creator_id, count, amount)
+            .where(in_range)
+            .group_by(RequestStatsDaily.creator_id)
+            .order_by(RequestStatsDaily.creator_id)
+        )
+    ).all()
+    risk_levels = (
+        await db.execute(
+            select(AmlRiskStatsDaily.risk_level, func.sum(AmlRiskStatsDaily.check_count))
+            .where(AmlRiskStatsDaily.day.between(date_from, date_to))
+            .group_by(AmlRiskStatsDaily.risk_level)
+            .order_by(AmlRiskStatsDaily.risk_level)
+        )
+    ).all()
+
+    by_status: dict = {}
+    for _day, request_status, request_count, total_amount in by_day:
+        acc = by_status.setdefault(request_status, [0, 0])
+        acc[0] += request_count
+        acc[1] += total_amount
+
+    return StatsResponse(
+        date_from=date_from,
+        date_to=date_to,
+        by_status=[StatusStat(status=s, request_count=c, total_amount=a) for s, (c, a) in by_status.items()],
+        by_day=[DailyStatusStat(day=d, status=s, request_count=c, total_amount=a) for d, s, c, a in by_day],
+        by_creator=[CreatorStat(creator_id=cid, request_count=c, total_amount=a) for cid, c, a in by_creator],
+        risk_levels=[RiskLevelStat(risk_level=lvl, check_count=c) for lvl, c in risk_levels],
+    )
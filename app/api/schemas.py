@@ -1,10 +1,16 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
-from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Literal
 
-from app.db.models import RequestStatus, RiskLevel, UserRole
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+
+from app.db.models import PayoutBatchStatus, RequestStatus, RiskLevel, TxConfirmation, UserRole
+from app.services.tron_address import normalize_tron_address, normalize_tx_hash
+
+TronAddress = Annotated[str, AfterValidator(normalize_tron_address)]
+TxHash = Annotated[str, AfterValidator(normalize_tx_hash)]
 
 
 class RiskCategory(BaseModel):
@@ -13,7 +19,7 @@ class RiskCategory(BaseModel):
 
 
 class AmlCheckRequest(BaseModel):
-    address: str
+    address: TronAddress
     network: str = Field(pattern="^TRON$")
 
 
@@ -25,8 +31,21 @@ class AmlCheckResponse(BaseModel):
     checked_at: datetime
 
 
-class RequestCreate(BaseModel):
+class AddressRiskResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     address: str
+    network: str
+    check_id: uuid.UUID
+    provider: str
+    risk_score: float
+    risk_level: RiskLevel
+    checked_at: datetime
+    stale: bool = False
+
+
+class RequestCreate(BaseModel):
+    address: TronAddress
     network: str = Field(pattern="^TRON$")
     asset: str = Field(pattern="^USDT$")
     amount: Decimal
@@ -35,6 +54,69 @@ class RequestCreate(BaseModel):
     aml_check_id: uuid.UUID
 
 
+class ImportRow(BaseModel):
+    # Address is normalized for the whole file at once, not per row, so it stays a plain string here.
+    address: str
+    network: str = Field(default="TRON", pattern="^TRON$")
+    asset: str = Field(default="USDT", pattern="^USDT$")
+    # Bounds of payment_requests.amount NUMERIC(36,18): a row that does not fit fails alone, not its whole chunk.
+    amount: Decimal = Field(gt=0, max_digits=36, decimal_places=18)
+    comment: str | None = None
+    attachment_url: str | None = None
+
+
+class ImportRowResult(BaseModel):
+    line: int
+    status: Literal["created", "failed"]
+    request_id: uuid.UUID | None = None
+    request_no: str | None = None
+    aml_check_id: uuid.UUID | None = None
+    risk_level: RiskLevel | None = None
+    error: str | None = None
+
+
+class ImportReport(BaseModel):
+    created: int
+    failed: int
+    aml_checks_reused: int
+    aml_checks_run: int
+    rows: list[ImportRowResult]
+
+
+class PayoutBatchCreate(BaseModel):
+    # Omitted: every approved request not yet in a batch, oldest approval first, up to PAYOUT_BATCH_MAX_SIZE.
+    request_ids: list[uuid.UUID] | None = None
+
+
+class PayoutBatchResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    status: PayoutBatchStatus
+    created_by: int | None
+    item_count: int
+    total_amount: Decimal
+    paid_count: int = 0
+    created_at: datetime
+    settled_at: datetime | None
+
+
+class SettleRowResult(BaseModel):
+    line: int
+    request_no: str | None = None
+    status: Literal["settled", "already_settled", "failed"]
+    error: str | None = None
+
+
+class SettleReport(BaseModel):
+    batch_id: uuid.UUID
+    batch_status: PayoutBatchStatus
+    settled: int
+    already_settled: int
+    failed: int
+    rows: list[SettleRowResult]
+
+
 class RequestResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -50,16 +132,28 @@ class RequestResponse(BaseModel):
     aml_check_id: uuid.UUID
     status: RequestStatus
     tx_hash: str | None
+    tx_confirmation: TxConfirmation | None = None
+    tx_block_number: int | None = None
+    risk_escalated_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
 
+class RequestSearchHit(RequestResponse):
+    rank: float
+
+
+class RequestSearchResponse(BaseModel):
+    items: list[RequestSearchHit]
+    next_cursor: str | None
+
+
 class DecisionPayload(BaseModel):
     reason: str | None = None
 
 
 class MarkPaidPayload(BaseModel):
-    tx_hash: str
+    tx_hash: TxHash
 
 
 class StatusHistoryItem(BaseModel):
@@ -91,3 +185,70 @@ class UserResponse(BaseModel):
     telegram_id: int
     full_name: str
     role: UserRole
+
+
+class WalletCheckResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    address: str
+    network: str
+    provider: str
+    risk_score: float
+    risk_level: RiskLevel
+    categories: list[RiskCategory] = Field(validation_alias="categories_json")
+    checked_at: datetime
+
+
+class RequestDetail(RequestResponse):
+    aml_check: WalletCheckResponse | None = None
+    history: list[StatusHistoryItem] | None = None
+    creator: UserResponse | None = None
+    archived_at: datetime | None = None
+
+
+class StatusStat(BaseModel):
+    status: RequestStatus
+    request_count: int
+    total_amount: Decimal
+
+
+class DailyStatusStat(StatusStat):
+    day: date
+
+
+class CreatorStat(BaseModel):
+    creator_id: int
+    request_count: int
+    total_amount: Decimal
+
+
+class RiskLevelStat(BaseModel):
+    risk_level: RiskLevel
+    check_count: int
+
+
+class StatsResponse(BaseModel):
+    date_from: date
+    date_to: date
+    by_status: list[StatusStat]
+    by_day: list[DailyStatusStat]
+    by_creator: list[CreatorStat]
+    risk_levels: list[RiskLevelStat]
+
+
+class AuditLogEntry(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    actor_id: int | None
+    action: str
+    entity_type: str
+    entity_id: str
+    payload_json: dict
+    created_at: datetime
+
+
+class AuditLogPage(BaseModel):
+    items: list[AuditLogEntry]
+    next_cursor: str | None
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 try:
     from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -15,6 +16,75 @@ try:
         aml_http_api_key: str = ""
         aml_http_timeout_s: float = 20.0
         aml_http_check_path: str = "/check"
+        aml_denylist_path: str = ""
+        aml_allowlist_path: str = ""
+        aml_allowlist_risk_level: str = "low"
+        aml_allowlist_risk_score: float = 0.0
+        aml_list_reload_interval_s: float = 30.0
+        idempotency_ttl_s: float = 86400.0
+        idempotency_cache_ttl_s: float = 600.0
+        idempotency_wait_timeout_s: float = 30.0
+        idempotency_lease_s: float = 120.0
+        request_no_block_size: int = 50
+        db_pool_size: int = 5
+        db_max_overflow: int = 10
+        warmup_enabled: bool = True
+        warmup_db_connections: int = 5
+        warmup_retry_interval_s: float = 2.0
+        aml_circuit_failure_threshold: int = 5
+        aml_circuit_reset_s: float = 30.0
+        aml_rate_limit_per_s: float = 5.0
+        aml_rate_limit_burst: int = 5
+        aml_daily_quota: int = 0
+        aml_daily_quota_interactive_reserve: float = 0.1
+        aml_queue_timeout_interactive_s: float = 10.0
+        aml_queue_timeout_batch_s: float = 120.0
+        aml_queue_timeout_rescreen_s: float = 600.0
+        approval_policy_path: str = ""
+        approval_policy_reload_interval_s: float = 10.0
+        aml_check_max_age_h: float = 72.0
+        rescreen_max_age_h: float = 72.0
+        rescreen_batch_size: int = 500
+        rescreen_concurrency: int = 4
+        archive_after_days: int = 90
+        archive_batch_size: int = 1000
+        import_max_rows: int = 5000
+        import_max_bytes: int = 5_000_000
+        import_chunk_size: int = 500
+        import_aml_concurrency: int = 4
+        payout_batch_max_size: int = 1000
+        payout_settle_chunk_size: int = 500
+        tron_node_provider: str = "stub"
+        tron_node_url: str = "https://api.trongrid.io"
+        tron_node_api_key: str = ""
+        tron_node_timeout_s: float = 10.0
+        tron_node_info_path: str = "/walletsolidity/gettransactioninfobyid"
+        tron_node_rate_limit_per_s: float = 10.0
+        tron_node_rate_limit_burst: int = 10
+        tron_usdt_contract: str = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+        tx_confirm_batch_size: int = 200
+        tx_confirm_concurrency: int = 8
+        tx_confirm_recheck_s: float = 60.0
+        tx_confirm_not_found_after_h: float = 24.0
+        tx_confirm_cache_size: int = 10000
+        admission_enabled: bool = True
+        admission_max_in_flight: int = 15
+        admission_transition_limit: int = 8
+        admission_read_limit: int = 12
+        admission_screening_limit: int = 6
+        admission_bulk_limit: int = 1
+        admission_queue_size: int = 100
+        admission_default_budget_s: float = 30.0
+        trace_export_path: str = ""
+        trace_sample_rate: float = 0.05
+        trace_slow_ms: float = 1000.0
+        trace_export_batch_size: int = 200
+        trace_export_interval_s: float = 5.0
+        trace_export_max_bytes: int = 50_000_000
+        trace_export_backups: int = 5
+        ready_max_pool_utilization: float = 0.9
+        ready_max_db_p95_ms: float = 250.0
+        ready_max_provider_p95_ms: float = 10000.0
         bot_token: str = ""
         backend_base_url: str = "http://localhost:8000/api/v1"
 
@@ -31,8 +101,86 @@ except ModuleNotFoundError:
             self.aml_http_api_key = os.getenv("AML_HTTP_API_KEY", "")
             self.aml_http_timeout_s = float(os.getenv("AML_HTTP_TIMEOUT_S", "20"))
             self.aml_http_check_path = os.getenv("AML_HTTP_CHECK_PATH", "/check")
+            self.aml_denylist_path = os.getenv("AML_DENYLIST_PATH", "")
+            self.aml_allowlist_path = os.getenv("AML_ALLOWLIST_PATH", "")
+            self.aml_allowlist_risk_level = os.getenv("AML_ALLOWLIST_RISK_LEVEL", "low")
+            self.aml_allowlist_risk_score = float(os.getenv("AML_ALLOWLIST_RISK_SCORE", "0"))
+            self.aml_list_reload_interval_s = float(os.getenv("AML_LIST_RELOAD_INTERVAL_S", "30"))
+            self.idempotency_ttl_s = float(os.getenv("IDEMPOTENCY_TTL_S", "86400"))
+            self.idempotency_cache_ttl_s = float(os.getenv("IDEMPOTENCY_CACHE_TTL_S", "600"))
+            self.idempotency_wait_timeout_s = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT_S", "30"))
+            self.idempotency_lease_s = float(os.getenv("IDEMPOTENCY_LEASE_S", "120"))
+            self.request_no_block_size = int(os.getenv("REQUEST_NO_BLOCK_SIZE", "50"))
+            self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+            self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+            self.warmup_enabled = os.getenv("WARMUP_ENABLED", "true").lower() in {"1", "true", "yes"}
+            self.warmup_db_connections = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
+            self.warmup_retry_interval_s = float(os.getenv("WARMUP_RETRY_INTERVAL_S", "2"))
+            self.aml_circuit_failure_threshold = int(os.getenv("AML_CIRCUIT_FAILURE_THRESHOLD", "5"))
+            self.aml_circuit_reset_s = float(os.getenv("AML_CIRCUIT_RESET_S", "30"))
+            self.aml_rate_limit_per_s = float(os.getenv("AML_RATE_LIMIT_PER_S", "5"))
+            self.aml_rate_limit_burst = int(os.getenv("AML_RATE_LIMIT_BURST", "5"))
+            self.aml_daily_quota = int(os.getenv("AML_DAILY_QUOTA", "0"))
+            self.aml_daily_quota_interactive_reserve = float(os.getenv("AML_DAILY_QUOTA_INTERACTIVE_RESERVE", "0.1"))
+            self.aml_queue_timeout_interactive_s = float(os.getenv("AML_QUEUE_TIMEOUT_INTERACTIVE_S", "10"))
+            self.aml_queue_timeout_batch_s = float(os.getenv("AML_QUEUE_TIMEOUT_BATCH_S", "120"))
+            self.aml_queue_timeout_rescreen_s = float(os.getenv("AML_QUEUE_TIMEOUT_RESCREEN_S", "600"))
+            self.approval_policy_path = os.getenv("APPROVAL_POLICY_PATH", "")
+            self.approval_policy_reload_interval_s = float(os.getenv("APPROVAL_POLICY_RELOAD_INTERVAL_S", "10"))
+            self.aml_check_max_age_h = float(os.getenv("AML_CHECK_MAX_AGE_H", "72"))
+            self.rescreen_max_age_h = float(os.getenv("RESCREEN_MAX_AGE_H", "72"))
+            self.rescreen_batch_size = int(os.getenv("RESCREEN_BATCH_SIZE", "500"))
+            self.rescreen_concurrency = int(os.getenv("RESCREEN_CONCURRENCY", "4"))
+            self.archive_after_days = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+            self.archive_batch_size = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+            self.import_max_rows = int(os.getenv("IMPORT_MAX_ROWS", "5000"))
+            self.import_max_bytes = int(os.getenv("IMPORT_MAX_BYTES", "5000000"))
+            self.import_chunk_size = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+            self.import_aml_concurrency = int(os.getenv("IMPORT_AML_CONCURRENCY", "4"))
+            self.payout_batch_max_size = int(os.getenv("PAYOUT_BATCH_MAX_SIZE", "1000"))
+            self.payout_settle_chunk_size = int(os.getenv("PAYOUT_SETTLE_CHUNK_SIZE", "500"))
+            self.tron_node_provider = os.getenv("TRON_NODE_PROVIDER", "stub")
+            self.tron_node_url = os.getenv("TRON_NODE_URL", "https://api.trongrid.io")
+            self.tron_node_api_key = os.getenv("TRON_NODE_API_KEY", "")
+            self.tron_node_timeout_s = float(os.getenv("TRON_NODE_TIMEOUT_S", "10"))
+            self.tron_node_info_path = os.getenv("TRON_NODE_INFO_PATH", "/walletsolidity/gettransactioninfobyid")
+            self.tron_node_rate_limit_per_s = float(os.getenv("TRON_NODE_RATE_LIMIT_PER_S", "10"))
+            self.tron_node_rate_limit_burst = int(os.getenv("TRON_NODE_RATE_LIMIT_BURST", "10"))
+            self.tron_usdt_contract = os.getenv("TRON_USDT_CONTRACT", "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t")
+            self.tx_confirm_batch_size = int(os.getenv("TX_CONFIRM_BATCH_SIZE", "200"))
+            self.tx_confirm_concurrency = int(os.getenv("TX_CONFIRM_CONCURRENCY", "8"))
+            self.tx_confirm_recheck_s = float(os.getenv("TX_CONFIRM_RECHECK_S", "60"))
+            self.tx_confirm_not_found_after_h = float(os.getenv("TX_CONFIRM_NOT_FOUND_AFTER_H", "24"))
+            self.tx_confirm_cache_size = int(os.getenv("TX_CONFIRM_CACHE_SIZE", "10000"))
+            self.admission_enabled = os.getenv("ADMISSION_ENABLED", "true").lower() in {"1", "true", "yes"}
+            self.admission_max_in_flight = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "15"))
+            self.admission_transition_limit = int(os.getenv("ADMISSION_TRANSITION_LIMIT", "8"))
+            self.admission_read_limit = int(os.getenv("ADMISSION_READ_LIMIT", "12"))
+            self.admission_screening_limit = int(os.getenv("ADMISSION_SCREENING_LIMIT", "6"))
+            self.admission_bulk_limit = int(os.getenv("ADMISSION_BULK_LIMIT", "1"))
+            self.admission_queue_size = int(os.getenv("ADMISSION_QUEUE_SIZE", "100"))
+            self.admission_default_budget_s = float(os.getenv("ADMISSION_DEFAULT_BUDGET_S", "30"))
+            self.trace_export_path = os.getenv("TRACE_EXPORT_PATH", "")
+            self.trace_sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0.05"))
+            self.trace_slow_ms = float(os.getenv("TRACE_SLOW_MS", "1000"))
+            self.trace_export_batch_size = int(os.getenv("TRACE_EXPORT_BATCH_SIZE", "200"))
+            self.trace_export_interval_s = float(os.getenv("TRACE_EXPORT_INTERVAL_S", "5"))
+            self.trace_export_max_bytes = int(os.getenv("TRACE_EXPORT_MAX_BYTES", "50000000"))
+            self.trace_export_backups = int(os.getenv("TRACE_EXPORT_BACKUPS", "5"))
+            self.ready_max_pool_utilization = float(os.getenv("READY_MAX_POOL_UTILIZATION", "0.9"))
+            self.ready_max_db_p95_ms = float(os.getenv("READY_MAX_DB_P95_MS", "250"))
+            self.ready_max_provider_p95_ms = float(os.getenv("READY_MAX_PROVIDER_P95_MS", "10000"))
             self.bot_token = os.getenv("BOT_TOKEN", "")
             self.backend_base_url = os.getenv("BACKEND_BASE_URL", "http://localhost:8000/api/v1")
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+def __getattr__(name: str):
+    # `from app.config import settings` keeps working, but .env and the environment are read on first use.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
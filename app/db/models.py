@@ -1,8 +1,8 @@
 ﻿import enum
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Numeric, String, Text, func
+from sqlalchemy import JSON, BigInteger, Date, DateTime, Enum, ForeignKey, Numeric, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -30,6 +30,18 @@ class RequestStatus(str, enum.Enum):
     paid = "paid"
 
 
+class PayoutBatchStatus(str, enum.Enum):
+    open = "open"
+    settled = "settled"
+
+
+class TxConfirmation(str, enum.Enum):
+    confirmed = "confirmed"
+    mismatch = "mismatch"
+    failed = "failed"
+    not_found = "not_found"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -57,6 +69,18 @@ class WalletCheck(Base):
     checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+class WalletRiskLatest(Base):
+    __tablename__ = "wallet_risk_latest"
+
+    address: Mapped[str] = mapped_column(Text, primary_key=True)
+    network: Mapped[str] = mapped_column(Text, primary_key=True)
+    check_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("wallet_checks.id"), nullable=False)
+    provider: Mapped[str] = mapped_column(Text, nullable=False)
+    risk_score: Mapped[float] = mapped_column(Numeric(5, 2), nullable=False)
+    risk_level: Mapped[RiskLevel] = mapped_column(Enum(RiskLevel, name="risk_level"), nullable=False)
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class PaymentRequest(Base):
     __tablename__ = "payment_requests"
 
@@ -78,6 +102,12 @@ class PaymentRequest(Base):
     rejection_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
     tx_hash: Mapped[str | None] = mapped_column(Text, unique=True, nullable=True)
     paid_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    risk_escalated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    tx_confirmation: Mapped[TxConfirmation | None] = mapped_column(
+        Enum(TxConfirmation, name="tx_confirmation_status"), nullable=True
+    )
+    tx_block_number: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    tx_checked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -96,6 +126,77 @@ class StatusHistory(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+# Cold copies of terminal requests and their history, moved by app.services.archive. Same columns as the hot
+# tables plus archived_at, without foreign keys so archived rows never block user or check maintenance.
+class PaymentRequestArchive(Base):
+    __tablename__ = "payment_requests_archive"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    request_no: Mapped[str] = mapped_column(String(32), unique=True, nullable=False)
+    creator_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    address: Mapped[str] = mapped_column(Text, nullable=False)
+    network: Mapped[str] = mapped_column(String(32), nullable=False)
+    asset: Mapped[str] = mapped_column(String(32), nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(36, 18), nullable=False)
+    comment: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attachment_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    aml_check_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    status: Mapped[RequestStatus] = mapped_column(Enum(RequestStatus, name="request_status"), nullable=False)
+    approved_by: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    approved_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    rejection_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    tx_hash: Mapped[str | None] = mapped_column(Text, nullable=True)
+    paid_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    risk_escalated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    tx_confirmation: Mapped[TxConfirmation | None] = mapped_column(
+        Enum(TxConfirmation, name="tx_confirmation_status"), nullable=True
+    )
+    tx_block_number: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    tx_checked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StatusHistoryArchive(Base):
+    __tablename__ = "status_history_archive"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    request_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    old_status: Mapped[RequestStatus | None] = mapped_column(
+        Enum(RequestStatus, name="request_status"), nullable=True
+    )
+    new_status: Mapped[RequestStatus] = mapped_column(Enum(RequestStatus, name="request_status"), nullable=False)
+    actor_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class PayoutBatch(Base):
+    __tablename__ = "payout_batches"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status: Mapped[PayoutBatchStatus] = mapped_column(
+        Enum(PayoutBatchStatus, name="payout_batch_status"), default=PayoutBatchStatus.open, nullable=False
+    )
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    item_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    total_amount: Mapped[float] = mapped_column(Numeric(36, 18), default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    settled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class PayoutBatchItem(Base):
+    __tablename__ = "payout_batch_items"
+
+    # Keyed by request so a request can be in one batch only. No FK: archiving moves paid requests out of
+    # payment_requests, and the batch keeps its items.
+    request_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    batch_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("payout_batches.id", ondelete="CASCADE"), nullable=False)
+    request_no: Mapped[str] = mapped_column(String(32), nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(36, 18), nullable=False)
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -106,3 +207,49 @@ class AuditLog(Base):
     entity_id: Mapped[str] = mapped_column(String(128), nullable=False)
     payload_json: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class RequestStatsDaily(Base):
+    __tablename__ = "request_stats_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[RequestStatus] = mapped_column(Enum(RequestStatus, name="request_status"), primary_key=True)
+    creator_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    request_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_amount: Mapped[float] = mapped_column(Numeric(36, 18), default=0, nullable=False)
+
+
+class AmlRiskStatsDaily(Base):
+    __tablename__ = "aml_risk_stats_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    risk_level: Mapped[RiskLevel] = mapped_column(Enum(RiskLevel, name="risk_level"), primary_key=True)
+    check_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    actor_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    scope: Mapped[str] = mapped_column(Text, primary_key=True)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(Text, nullable=False)
+    response_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    claim_token: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+
+class RequestNoCounter(Base):
+    __tablename__ = "request_no_counters"
+
+    period: Mapped[str] = mapped_column(Text, primary_key=True)
+    next_value: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class AmlProviderQuota(Base):
+    __tablename__ = "aml_provider_quota"
+
+    provider: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    used: Mapped[int] = mapped_column(BigInteger, nullable=False)
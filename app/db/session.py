@@ -1,19 +1,48 @@
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from app.config import settings
+from app.config import get_settings
 
-try:
-    engine = create_async_engine(settings.database_url, future=True, pool_pre_ping=True)
-    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-except ModuleNotFoundError:
+engine: AsyncEngine | None = None
+SessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+
+def init_engine(database_url: str | None = None) -> AsyncEngine | None:
+    # Creating the engine imports the DB driver, so it is deferred until the app lifespan or first use.
+    global engine, SessionLocal
+    if engine is None:
+        settings = get_settings()
+        try:
+            engine = create_async_engine(
+                database_url or settings.database_url,
+                future=True,
+                pool_pre_ping=True,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+            )
+        except ModuleNotFoundError:
+            return None
+        SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return engine
+
+
+async def dispose_engine() -> None:
+    global engine, SessionLocal
+    if engine is not None:
+        await engine.dispose()
     engine = None
     SessionLocal = None
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    if SessionLocal is None:
+        init_engine()
     if SessionLocal is None:
         raise RuntimeError("Database driver is not installed. Install requirements.txt dependencies.")
-    async with SessionLocal() as session:
+    return SessionLocal
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_sessionmaker()() as session:
         yield session
@@ -1,16 +1,109 @@
-﻿from fastapi import FastAPI
+﻿import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-from app.api.routes_admin import router as admin_router
-from app.api.routes_aml import router as aml_router
-from app.api.routes_requests import router as requests_router
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
-app = FastAPI(title="TronSecure Compliance API", version="0.1.0")
+from app.config import get_settings
 
-app.include_router(aml_router, prefix="/api/v1")
-app.include_router(requests_router, prefix="/api/v1")
-app.include_router(admin_router, prefix="/api/v1")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    from app.db.session import dispose_engine, init_engine
+    from app.services.aml_provider import close_aml_provider, get_aml_provider
+    from app.services.health import instrument_engine
+    from app.services.tracing import close_tracer, get_tracer, instrument_engine_tracing
+    from app.services.warmup import warm_up
 
-@app.get("/health")
-async def health() -> dict[str, str]:
-    return {"status": "ok"}
+    settings = get_settings()
+    tracer = get_tracer()
+    engine = init_engine()
+    if engine is not None:
+        instrument_engine(engine)
+        if tracer is not None:
+            instrument_engine_tracing(engine)
+    flush_task = asyncio.create_task(tracer.run_flusher(settings.trace_export_interval_s)) if tracer is not None else None
+    app.state.engine = engine
+    provider = get_aml_provider()
+    app.state.ready = not settings.warmup_enabled
+    warmup_task = None
+    if settings.warmup_enabled:
+
+        async def run_warm_up() -> None:
+            await warm_up(engine, provider, settings.warmup_db_connections, settings.warmup_retry_interval_s)
+            app.state.ready = True
+
+        # Serve immediately; /health stays 503 until the pool and vendor connections are open.
+        warmup_task = asyncio.create_task(run_warm_up())
+    try:
+        yield
+    finally:
+        if warmup_task is not None:
+            warmup_task.cancel()
+        if flush_task is not None:
+            flush_task.cancel()
+        await close_aml_provider()
+        await dispose_engine()
+        close_tracer()
+
+
+def create_app() -> FastAPI:
+    from app.api.routes_admin import router as admin_router
+    from app.api.routes_aml import router as aml_router
+    from app.api.routes_audit import router as audit_router
+    from app.api.routes_export import router as export_router
+    from app.api.routes_payouts import router as payouts_router
+    from app.api.routes_requests import router as requests_router
+    from app.api.routes_stats import router as stats_router
+    from app.services.admission import AdmissionController, AdmissionMiddleware
+    from app.services.tracing import TracingMiddleware, get_tracer
+
+    app = FastAPI(title="TronSecure Compliance API", version="0.1.0", lifespan=lifespan)
+    app.state.ready = False
+    app.state.engine = None
+    app.state.admission = None
+    if get_settings().admission_enabled:
+        app.state.admission = AdmissionController.from_settings()
+        app.add_middleware(AdmissionMiddleware, controller=app.state.admission)
+    tracer = get_tracer()
+    if tracer is not None:
+        # Added last so it wraps admission control and the queue wait shows up in the request span.
+        app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    app.include_router(aml_router, prefix="/api/v1")
+    app.include_router(requests_router, prefix="/api/v1")
+    app.include_router(admin_router, prefix="/api/v1")
+    app.include_router(stats_router, prefix="/api/v1")
+    app.include_router(export_router, prefix="/api/v1")
+    app.include_router(payouts_router, prefix="/api/v1")
+    app.include_router(audit_router, prefix="/api/v1")
+
+    @app.get("/health")
+    async def health(request: Request) -> JSONResponse:
+        if not request.app.state.ready:
+            return JSONResponse({"status": "starting"}, status_code=503)
+        return JSONResponse({"status": "ok"})
+
+    @app.get("/ready")
+    async def ready(request: Request) -> JSONResponse:
+        from app.services.health import readiness
+
+        ok, body = readiness(request.app.state.ready, request.app.state.engine)
+        return JSONResponse(body, status_code=200 if ok else 503)
+
+    @app.get("/admission")
+    async def admission(request: Request) -> JSONResponse:
+        controller = request.app.state.admission
+        return JSONResponse(controller.snapshot() if controller is not None else {"enabled": False})
+
+    return app
+
+
+def __getattr__(name: str) -> FastAPI:
+    # Keeps `uvicorn app.main:app` working; `uvicorn --factory app.main:create_app` is preferred.
+    if name == "app":
+        app = create_app()
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,173 @@
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from collections.abc import Iterable
+
+from app.api.schemas import RiskCategory
+from app.config import get_settings
+from app.db.models import RiskLevel
+
+logger = logging.getLogger(__name__)
+
+# Index file layout (little-endian):
+#   header  magic[8] | count u64 | bloom_bits u64 | hashes u32 | reserved u32
+#   bloom   ceil(bloom_bits / 64) * 8 bytes
+#   keys    count * u64, sorted ascending
+_MAGIC = b"TSALIDX1"
+_HEADER = struct.Struct("<8sQQII")
+_BLOOM_BITS_PER_KEY = 10
+_BLOOM_HASHES = 7
+
+
+def address_key(address: str) -> int:
+    digest = hashlib.blake2b(address.strip().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _bloom_positions(key: int, bloom_bits: int, hashes: int) -> Iterable[int]:
+    h1 = key & 0xFFFFFFFF
+    h2 = (key >> 32) | 1
+    return ((h1 + i * h2) % bloom_bits for i in range(hashes))
+
+
+def write_address_index(addresses: Iterable[str], path: str) -> int:
+    keys = array("Q", sorted({address_key(address) for address in addresses if address.strip()}))
+    bloom_bits = max(64, len(keys) * _BLOOM_BITS_PER_KEY)
+    bloom = bytearray(((bloom_bits + 63) // 64) * 8)
+    for key in keys:
+        for bit in _bloom_positions(key, bloom_bits, _BLOOM_HASHES):
+            bloom[bit >> 3] |= 1 << (bit & 7)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, len(keys), bloom_bits, _BLOOM_HASHES, 0))
+        fh.write(bloom)
+        fh.write(keys.tobytes())
+    # Atomic swap so running workers pick up the new file on their next reload check.
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class AddressIndex:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._bloom_bits, self._hashes, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not an address index file")
+        self._bloom_offset = _HEADER.size
+        self._keys_offset = self._bloom_offset + ((self._bloom_bits + 63) // 64) * 8
+        if len(self._mm) < self._keys_offset + self.count * 8:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __contains__(self, address: str) -> bool:
+        if not self.count:
+            return False
+        key = address_key(address)
+        mm = self._mm
+        for bit in _bloom_positions(key, self._bloom_bits, self._hashes):
+            if not mm[self._bloom_offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = struct.unpack_from("<Q", mm, self._keys_offset + mid * 8)[0]
+            if value < key:
+                lo = mid + 1
+            elif value > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class ReloadingAddressIndex:
+    def __init__(self, path: str, check_interval_s: float) -> None:
+        self._path = path
+        self._check_interval_s = check_interval_s
+        self._next_check = 0.0
+        self._signature: tuple | None = None
+        self._index: AddressIndex | None = None
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self._check_interval_s
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            signature = None
+        else:
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        try:
+            index = AddressIndex(self._path) if signature else None
+        except (OSError, ValueError, struct.error) as exc:
+            # Caught mid-write or truncated: keep answering from the previous index. The signature is not taken,
+            # so the next interval tries again.
+            logger.error("Address list %s not reloaded: %s", self._path, exc)
+            return
+        old, self._index = self._index, index
+        self._signature = signature
+        if old is not None:
+            old.close()
+
+    def __contains__(self, address: str) -> bool:
+        self._maybe_reload()
+        return self._index is not None and address in self._index
+
+
+class AddressScreen:
+    def __init__(
+        self,
+        denylist: ReloadingAddressIndex | None,
+        allowlist: ReloadingAddressIndex | None,
+        allow_risk_level: RiskLevel = RiskLevel.low,
+        allow_risk_score: float = 0.0,
+    ) -> None:
+        self._denylist = denylist
+        self._allowlist = allowlist
+        self._allow_risk_level = allow_risk_level
+        self._allow_risk_score = allow_risk_score
+
+    def check(self, address: str, network: str) -> tuple[str, tuple[float, RiskLevel, list[RiskCategory], dict]] | None:
+        if self._denylist is not None and address in self._denylist:
+            categories = [RiskCategory(name="Sanctions", score=100.0)]
+            return "denylist", (100.0, RiskLevel.high, categories, self._report(address, network, "denylist", 100.0, RiskLevel.high))
+        if self._allowlist is not None and address in self._allowlist:
+            score, level = self._allow_risk_score, self._allow_risk_level
+            categories = [RiskCategory(name="Allowlist", score=score)]
+            return "allowlist", (score, level, categories, self._report(address, network, "allowlist", score, level))
+        return None
+
+    @staticmethod
+    def _report(address: str, network: str, source: str, score: float, level: RiskLevel) -> dict:
+        return {"address": address, "network": network, "source": source, "risk_score": score, "risk_level": level.value}
+
+
+_screen: AddressScreen | None = None
+
+
+def get_address_screen() -> AddressScreen:
+    global _screen
+    if _screen is None:
+        settings = get_settings()
+        interval = settings.aml_list_reload_interval_s
+        _screen = AddressScreen(
+            denylist=ReloadingAddressIndex(settings.aml_denylist_path, interval) if settings.aml_denylist_path else None,
+            allowlist=ReloadingAddressIndex(settings.aml_allowlist_path, interval) if settings.aml_allowlist_path else None,
+            allow_risk_level=RiskLevel(settings.aml_allowlist_risk_level),
+            allow_risk_score=settings.aml_allowlist_risk_score,
+        )
+    return _screen
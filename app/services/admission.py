@@ -0,0 +1,211 @@
+import asyncio
+import json
+import math
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from app.config import get_settings
+from app.services.health import LatencyWindow
+
+BUDGET_HEADER = b"x-request-timeout-ms"
+_TRANSITION_PATH = re.compile(r"^/api/v1/requests(/[^/]+/(submit|approve|reject|mark-paid))?$")
+_BULK_PATH = re.compile(r"^/api/v1/(requests/import|payout-batches(/[^/]+/settle)?)$")
+
+
+class RouteClass(IntEnum):
+    # Lower value is served first when requests of several classes are queued.
+    transition = 0
+    read = 1
+    screening = 2
+    bulk = 3
+
+
+def classify(method: str, path: str) -> RouteClass | None:
+    if not path.startswith("/api/v1/") or path.startswith("/api/v1/export/"):
+        # Health probes must never queue; exports stream for minutes and would pin a slot.
+        return None
+    if method == "POST" and path == "/api/v1/aml/check":
+        return RouteClass.screening
+    if method == "POST" and _BULK_PATH.match(path):
+        # Imports and settlements touch thousands of rows and may call the vendor; they get their own small class.
+        return RouteClass.bulk
+    if method == "POST" and _TRANSITION_PATH.match(path):
+        return RouteClass.transition
+    if method in {"GET", "HEAD"}:
+        return RouteClass.read
+    return None
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, message: str, retry_after_s: float) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after_s = retry_after_s
+
+
+@dataclass
+class ClassState:
+    limit: int
+    queue_size: int
+    in_flight: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    service_ms: float = 0.0
+    waiters: deque[asyncio.Future] = field(default_factory=deque)
+    queue_wait: LatencyWindow = field(default_factory=LatencyWindow)
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for future in self.waiters if not future.done())
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, limits: dict[RouteClass, int], queue_size: int, default_budget_s: float) -> None:
+        self.max_in_flight = max_in_flight
+        self.default_budget_s = default_budget_s
+        self._in_flight = 0
+        self._classes = {route_class: ClassState(limits[route_class], queue_size) for route_class in RouteClass}
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        settings = get_settings()
+        limits = {
+            RouteClass.transition: settings.admission_transition_limit,
+            RouteClass.read: settings.admission_read_limit,
+            RouteClass.screening: settings.admission_screening_limit,
+            RouteClass.bulk: settings.admission_bulk_limit,
+        }
+        return cls(settings.admission_max_in_flight, limits, settings.admission_queue_size, settings.admission_default_budget_s)
+
+    def _has_slot(self, state: ClassState) -> bool:
+        return self._in_flight < self.max_in_flight and state.in_flight < state.limit
+
+    def _grant(self, state: ClassState) -> None:
+        self._in_flight += 1
+        state.in_flight += 1
+        state.admitted += 1
+
+    def _dispatch(self) -> None:
+        for route_class in RouteClass:
+            state = self._classes[route_class]
+            while state.waiters and self._has_slot(state):
+                future = state.waiters.popleft()
+                if future.done():
+                    continue
+                self._grant(state)
+                future.set_result(None)
+
+    def expected_wait_s(self, route_class: RouteClass) -> float:
+        # Everything queued in this class or a higher-priority one is served first; each slot clears one
+        # request per average service time of this class.
+        state = self._classes[route_class]
+        ahead = sum(self._classes[other].queued for other in RouteClass if other <= route_class)
+        slots = max(1, min(state.limit, self.max_in_flight))
+        return (ahead + 1) * state.service_ms / 1000 / slots
+
+    async def acquire(self, route_class: RouteClass, budget_s: float | None = None) -> float:
+        state = self._classes[route_class]
+        if not state.queued and self._has_slot(state):
+            self._grant(state)
+            return time.monotonic()
+
+        budget_s = self.default_budget_s if budget_s is None else budget_s
+        if state.queued >= state.queue_size:
+            state.rejected += 1
+            raise AdmissionRejected(429, f"Too many queued {route_class.name} requests", self.expected_wait_s(route_class) or 1)
+        expected = self.expected_wait_s(route_class)
+        service_s = state.service_ms / 1000
+        if expected + service_s > budget_s:
+            # The answer would arrive after the client gave up; say so now instead of doing the work anyway.
+            state.rejected += 1
+            raise AdmissionRejected(503, f"Server busy, {route_class.name} queue wait exceeds the request budget", expected)
+
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.append(future)
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=max(0.001, budget_s - service_s))
+        except asyncio.TimeoutError as exc:
+            # _dispatch may have granted the slot just as the wait timed out; hand it back before rejecting.
+            if future.done() and not future.cancelled():
+                self.release(route_class, 0.0)
+            state.rejected += 1
+            raise AdmissionRejected(503, f"Server busy, {route_class.name} request timed out in queue", expected or 1) from exc
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(route_class, 0.0)
+            raise
+        started = time.monotonic()
+        state.queue_wait.record((started - queued_at) * 1000)
+        return started
+
+    def release(self, route_class: RouteClass, elapsed_ms: float) -> None:
+        state = self._classes[route_class]
+        self._in_flight -= 1
+        state.in_flight -= 1
+        if elapsed_ms:
+            state.service_ms = elapsed_ms if not state.service_ms else state.service_ms * 0.8 + elapsed_ms * 0.2
+        self._dispatch()
+
+    def snapshot(self) -> dict:
+        classes = {}
+        for route_class, state in self._classes.items():
+            wait_p95 = state.queue_wait.p95()
+            classes[route_class.name] = {
+                "in_flight": state.in_flight,
+                "limit": state.limit,
+                "queued": state.queued,
+                "queue_size": state.queue_size,
+                "admitted": state.admitted,
+                "rejected": state.rejected,
+                "avg_service_ms": round(state.service_ms, 1),
+                "queue_wait_p95_ms": round(wait_p95, 1) if wait_p95 is not None else None,
+            }
+        return {"in_flight": self._in_flight, "max_in_flight": self.max_in_flight, "classes": classes}
+
+
+def request_budget_s(headers: list[tuple[bytes, bytes]]) -> float | None:
+    for name, value in headers:
+        if name == BUDGET_HEADER:
+            try:
+                return max(0.0, float(value) / 1000)
+            except ValueError:
+                return None
+    return None
+
+
+class AdmissionMiddleware:
+    # Plain ASGI instead of BaseHTTPMiddleware so streamed responses pass through untouched and the slot is
+    # held until the last body chunk is sent.
+    def __init__(self, app, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send) -> None:
+        route_class = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            started = await self.controller.acquire(route_class, request_budget_s(scope["headers"]))
+        except AdmissionRejected as exc:
+            await _send_rejection(send, exc)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class, (time.monotonic() - started) * 1000)
+
+
+async def _send_rejection(send, exc: AdmissionRejected) -> None:
+    body = json.dumps({"detail": str(exc)}).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(exc.retry_after_s))).encode()),
+    ]
+    await send({"type": "http.response.start", "status": exc.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -1,11 +1,18 @@
 ﻿import random
-from typing import Protocol
-
-import httpx
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Protocol
 
 from app.api.schemas import RiskCategory
-from app.config import settings
+from app.config import get_settings
 from app.db.models import RiskLevel
+from app.services.health import CircuitBreaker, LatencyWindow, get_provider_circuit, provider_latency
+from app.services.rate_limit import DailyQuota, Priority, PriorityLimiter, RateLimitExceeded, TokenBucket, current_priority
+from app.services.tracing import KIND_CLIENT, span
+
+if TYPE_CHECKING:
+    import httpx
 
 
 class AmlProvider(Protocol):
@@ -14,10 +21,75 @@ class AmlProvider(Protocol):
     async def check(self, address: str, network: str) -> tuple[float, RiskLevel, list[RiskCategory], dict]:
         ...
 
+    async def warm_up(self) -> None:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class AmlProviderUnavailable(RuntimeError):
+    def __init__(self, message: str, retry_after_s: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class AmlProviderThrottled(Exception):
+    def __init__(self, retry_after_s: float) -> None:
+        super().__init__(f"AML provider throttled the request, retry after {retry_after_s:.1f}s")
+        self.retry_after_s = retry_after_s
+
+
+def parse_retry_after(value: str | None, default_s: float = 1.0) -> float:
+    if not value:
+        return default_s
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default_s
+
+
+def parse_provider_report(data: dict) -> tuple[float, RiskLevel, list[RiskCategory], dict]:
+    # Kept out of HttpAmlProvider.check so it can be benchmarked without a vendor. A non-object body still fails
+    # here and counts as a provider error rather than a clean result.
+    risk_score = float(data.get("risk_score", 0))
+    raw_level = str(data.get("risk_level", "low")).lower()
+    if raw_level not in {"low", "medium", "high"}:
+        if risk_score < 35:
+            raw_level = "low"
+        elif risk_score < 70:
+            raw_level = "medium"
+        else:
+            raw_level = "high"
+    risk_level = RiskLevel(raw_level)
+
+    raw_categories = data.get("categories", [])
+    categories: list[RiskCategory] = []
+    for entry in raw_categories:
+        try:
+            categories.append(RiskCategory(name=str(entry["name"]), score=float(entry["score"])))
+        except Exception:
+            continue
+
+    if not categories:
+        categories = [RiskCategory(name="General", score=risk_score)]
+
+    return risk_score, risk_level, categories, data
+
 
 class MockAmlProvider:
     provider_name = "mock"
 
+    async def warm_up(self) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
     async def check(self, address: str, network: str) -> tuple[float, RiskLevel, list[RiskCategory], dict]:
         seed = sum(ord(ch) for ch in address + network)
         random.seed(seed)
@@ -50,42 +122,117 @@ class HttpAmlProvider:
         self._api_key = api_key
         self._timeout = timeout_s
         self._check_path = check_path
+        self._client: "httpx.AsyncClient | None" = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        # httpx is only imported when the HTTP provider is in use; the client is kept for connection reuse.
+        if self._client is None:
+            import httpx
+
+            headers = {"Authorization": f"Bearer {self._api_key}"} if self._api_key else {}
+            self._client = httpx.AsyncClient(base_url=self._base_url, timeout=self._timeout, headers=headers)
+        return self._client
+
+    async def warm_up(self) -> None:
+        # Any response means DNS, TCP and TLS are done and the connection sits in the pool.
+        await self._get_client().head("/")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def check(self, address: str, network: str) -> tuple[float, RiskLevel, list[RiskCategory], dict]:
-        headers = {"Authorization": f"Bearer {self._api_key}"} if self._api_key else {}
         payload = {"address": address, "network": network}
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            response = await client.post(f"{self._base_url}{self._check_path}", json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-
-        risk_score = float(data.get("risk_score", 0))
-        raw_level = str(data.get("risk_level", "low")).lower()
-        if raw_level not in {"low", "medium", "high"}:
-            if risk_score < 35:
-                raw_level = "low"
-            elif risk_score < 70:
-                raw_level = "medium"
-            else:
-                raw_level = "high"
-        risk_level = RiskLevel(raw_level)
-
-        raw_categories = data.get("categories", [])
-        categories: list[RiskCategory] = []
-        for entry in raw_categories:
-            try:
-                categories.append(RiskCategory(name=str(entry["name"]), score=float(entry["score"])))
-            except Exception:
-                continue
-
-        if not categories:
-            categories = [RiskCategory(name="General", score=risk_score)]
-
-        raw_report = data if isinstance(data, dict) else {"raw": data}
-        return risk_score, risk_level, categories, raw_report
+        response = await self._get_client().post(self._check_path, json=payload)
+        if response.status_code == 429:
+            raise AmlProviderThrottled(parse_retry_after(response.headers.get("Retry-After")))
+        response.raise_for_status()
+        return parse_provider_report(response.json())
 
 
-def get_aml_provider() -> AmlProvider:
+class ProbedAmlProvider:
+    # Feeds provider latency and failures into /ready and stops calling a vendor that keeps failing.
+    def __init__(self, provider: AmlProvider, circuit: CircuitBreaker, latency: LatencyWindow) -> None:
+        self._provider = provider
+        self._circuit = circuit
+        self._latency = latency
+        self.provider_name = provider.provider_name
+
+    async def check(self, address: str, network: str) -> tuple[float, RiskLevel, list[RiskCategory], dict]:
+        if not self._circuit.allow():
+            raise AmlProviderUnavailable(f"AML provider '{self.provider_name}' is unavailable, retry later")
+        started = time.perf_counter()
+        try:
+            with span("aml.check", KIND_CLIENT, **{"aml.provider": self.provider_name, "aml.network": network}):
+                result = await self._provider.check(address, network)
+        except AmlProviderThrottled:
+            # A 429 means the vendor is up and answering; it is the rate limiter's job, not the circuit's.
+            self._circuit.record_success()
+            raise
+        except Exception:
+            self._circuit.record_failure()
+            raise
+        except BaseException:
+            self._circuit.release_trial()
+            raise
+        finally:
+            self._latency.record((time.perf_counter() - started) * 1000)
+        self._circuit.record_success()
+        return result
+
+    async def warm_up(self) -> None:
+        await self._provider.warm_up()
+
+    async def aclose(self) -> None:
+        await self._provider.aclose()
+
+
+class RateLimitedAmlProvider:
+    def __init__(
+        self,
+        provider: AmlProvider,
+        limiter: PriorityLimiter,
+        quota: DailyQuota | None,
+        queue_timeouts_s: dict[Priority, float],
+    ) -> None:
+        self._provider = provider
+        self._limiter = limiter
+        self._quota = quota
+        self._queue_timeouts_s = queue_timeouts_s
+        self.provider_name = provider.provider_name
+
+    async def check(self, address: str, network: str) -> tuple[float, RiskLevel, list[RiskCategory], dict]:
+        priority = current_priority()
+        deadline = time.monotonic() + self._queue_timeouts_s[priority]
+        quota_taken = self._quota is None
+        try:
+            while True:
+                with span("aml.rate_limit", **{"aml.priority": priority.name}):
+                    await self._limiter.acquire(priority, deadline - time.monotonic())
+                # Quota only after admission, so calls turned away by the queue deadline never spend it. Taken
+                # once per check: a retry after a 429 is the same vendor call.
+                if not quota_taken:
+                    await self._quota.consume(priority)
+                    quota_taken = True
+                try:
+                    return await self._provider.check(address, network)
+                except AmlProviderThrottled as exc:
+                    self._limiter.pause(exc.retry_after_s)
+                    if time.monotonic() + exc.retry_after_s > deadline:
+                        raise RateLimitExceeded(str(exc), retry_after_s=exc.retry_after_s) from exc
+        except RateLimitExceeded as exc:
+            raise AmlProviderUnavailable(str(exc), retry_after_s=exc.retry_after_s) from exc
+
+    async def warm_up(self) -> None:
+        await self._provider.warm_up()
+
+    async def aclose(self) -> None:
+        await self._provider.aclose()
+
+
+def build_aml_provider() -> AmlProvider:
+    settings = get_settings()
     provider_name = settings.aml_provider.lower().strip()
     if provider_name == "http":
         return HttpAmlProvider(
@@ -95,3 +242,34 @@ def get_aml_provider() -> AmlProvider:
             check_path=settings.aml_http_check_path,
         )
     return MockAmlProvider()
+
+
+_provider: AmlProvider | None = None
+
+
+def get_aml_provider() -> AmlProvider:
+    global _provider
+    if _provider is None:
+        settings = get_settings()
+        probed = ProbedAmlProvider(build_aml_provider(), get_provider_circuit(), provider_latency)
+        quota = None
+        if settings.aml_daily_quota > 0:
+            quota = DailyQuota(probed.provider_name, settings.aml_daily_quota, settings.aml_daily_quota_interactive_reserve)
+        _provider = RateLimitedAmlProvider(
+            probed,
+            PriorityLimiter(TokenBucket(settings.aml_rate_limit_per_s, settings.aml_rate_limit_burst)),
+            quota,
+            {
+                Priority.interactive: settings.aml_queue_timeout_interactive_s,
+                Priority.batch: settings.aml_queue_timeout_batch_s,
+                Priority.rescreen: settings.aml_queue_timeout_rescreen_s,
+            },
+        )
+    return _provider
+
+
+async def close_aml_provider() -> None:
+    global _provider
+    if _provider is not None:
+        await _provider.aclose()
+    _provider = None
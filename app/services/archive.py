@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import PaymentRequest, PaymentRequestArchive, RequestStatus, StatusHistory, StatusHistoryArchive
+
+TERMINAL_STATUSES = (RequestStatus.paid, RequestStatus.rejected)
+REQUEST_COLUMNS = [column.name for column in PaymentRequest.__table__.columns]
+HISTORY_COLUMNS = [column.name for column in StatusHistory.__table__.columns]
+
+
+@dataclass
+class ArchiveResult:
+    requests: int = 0
+    history: int = 0
+    batches: int = 0
+
+
+def build_candidates_query(archive_before: datetime, limit: int):
+    # Served by the partial index from migration 0009; SKIP LOCKED lets two archivers split the work.
+    return (
+        select(PaymentRequest.id)
+        .where(
+            PaymentRequest.status.in_(TERMINAL_STATUSES),
+            PaymentRequest.updated_at < archive_before,
+            # The confirmation worker only reads the hot table, so paid rows wait here until their tx_hash is verified.
+            or_(PaymentRequest.status == RequestStatus.rejected, PaymentRequest.tx_confirmation.is_not(None)),
+        )
+        .order_by(PaymentRequest.updated_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def build_move_statements(ids: list) -> list:
+    history = select(*(StatusHistory.__table__.c[name] for name in HISTORY_COLUMNS)).where(StatusHistory.request_id.in_(ids))
+    requests = select(*(PaymentRequest.__table__.c[name] for name in REQUEST_COLUMNS)).where(PaymentRequest.id.in_(ids))
+    return [
+        insert(StatusHistoryArchive).from_select(HISTORY_COLUMNS, history),
+        insert(PaymentRequestArchive).from_select(REQUEST_COLUMNS, requests),
+        # status_history rows go with the request through ON DELETE CASCADE.
+        delete(PaymentRequest).where(PaymentRequest.id.in_(ids)),
+    ]
+
+
+async def archive_batch(db: AsyncSession, archive_before: datetime, batch_size: int) -> tuple[int, int]:
+    ids = list((await db.execute(build_candidates_query(archive_before, batch_size))).scalars().all())
+    if not ids:
+        await db.rollback()
+        return 0, 0
+    copy_history, copy_requests, delete_requests = build_move_statements(ids)
+    history = (await db.execute(copy_history)).rowcount
+    await db.execute(copy_requests)
+    await db.execute(delete_requests)
+    # One transaction per batch: a request is always in exactly one of the two tables, and locks stay short.
+    await db.commit()
+    return len(ids), history
+
+
+async def archive_terminal_requests(db: AsyncSession, older_than: timedelta, batch_size: int) -> ArchiveResult:
+    archive_before = datetime.now(timezone.utc) - older_than
+    result = ArchiveResult()
+    while True:
+        requests, history = await archive_batch(db, archive_before, batch_size)
+        if not requests:
+            return result
+        result.requests += requests
+        result.history += history
+        result.batches += 1
+        if requests < batch_size:
+            return result
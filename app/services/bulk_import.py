@@ -0,0 +1,261 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from decimal import Decimal
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas import ImportReport, ImportRow, ImportRowResult
+from app.db.models import PaymentRequest, RequestStatus, RiskLevel, WalletRiskLatest
+from app.services.aml_provider import AmlProvider
+from app.services.rate_limit import Priority, use_priority
+from app.services.request_numbers import next_request_no
+from app.services.stats import bump_imported_stats
+from app.services.status_log import insert_status_logs
+from app.services.tron_address import normalize_tron_addresses
+from app.services.wallet_checks import is_stale, save_wallet_check, screen_address
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+IMPORT_REASON = "imported"
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ImportTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class ParsedRow:
+    line: int
+    row: ImportRow | None = None
+    error: str | None = None
+
+
+@dataclass
+class ResolvedCheck:
+    check_id: uuid.UUID
+    risk_level: RiskLevel
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[str]:
+    # utf-8-sig drops the BOM spreadsheet tools put in front of exported CSV files.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise ImportTooLarge(f"Upload is larger than {max_bytes} bytes")
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError("Upload is not valid UTF-8") from exc
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[str], required: tuple[str, ...] = ("address", "amount")
+) -> AsyncIterator[tuple[int, dict | str]]:
+    header: list[str] | None = None
+    record: list[str] = []
+    line_no = start = 0
+    async for line in lines:
+        line_no += 1
+        if not record:
+            start = line_no
+        record.append(line)
+        text = "\n".join(record)
+        # An odd number of quotes means a quoted field continues on the next line.
+        if text.count('"') % 2:
+            continue
+        record = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            missing = set(required) - set(header)
+            if missing:
+                raise ImportFormatError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+            continue
+        if len(values) != len(header):
+            yield start, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, {name: value.strip() or None for name, value in zip(header, values)}
+    if record:
+        yield start, "Unterminated quoted field"
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, f"Invalid JSON: {exc.msg}"
+            continue
+        yield line_no, value if isinstance(value, dict) else "Expected a JSON object"
+
+
+async def read_import_rows(chunks: AsyncIterator[bytes], fmt: str, max_bytes: int, max_rows: int) -> list[ParsedRow]:
+    parse = iter_csv_records if fmt == "csv" else iter_ndjson_records
+    rows: list[ParsedRow] = []
+    async for line, record in parse(iter_lines(chunks, max_bytes)):
+        if len(rows) >= max_rows:
+            raise ImportTooLarge(f"Upload has more than {max_rows} rows")
+        if isinstance(record, str):
+            rows.append(ParsedRow(line, error=record))
+            continue
+        try:
+            rows.append(ParsedRow(line, row=ImportRow.model_validate(record)))
+        except ValidationError as exc:
+            rows.append(ParsedRow(line, error="; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors())))
+
+    valid = [item for item in rows if item.row is not None]
+    normalized, errors = normalize_tron_addresses(item.row.address for item in valid)
+    for i, item in enumerate(valid):
+        if i in errors:
+            item.row, item.error = None, f"address: {errors[i]}"
+        else:
+            item.row.address = normalized[i]
+    return rows
+
+
+async def resolve_checks(
+    db: AsyncSession, keys: list[tuple[str, str]], provider: AmlProvider, concurrency: int
+) -> tuple[dict[tuple[str, str], ResolvedCheck | str], int]:
+    # Reuses the latest fresh check of each distinct address and screens only the rest, so a file paying the same
+    # wallet a hundred times costs at most one vendor call. Returns the check (or error) per key and the reuse count.
+    resolved: dict[tuple[str, str], ResolvedCheck | str] = {}
+    if keys:
+        stmt = select(WalletRiskLatest).where(tuple_(WalletRiskLatest.address, WalletRiskLatest.network).in_(keys))
+        for latest in (await db.execute(stmt)).scalars().all():
+            if not is_stale(latest.checked_at):
+                resolved[(latest.address, latest.network)] = ResolvedCheck(latest.check_id, latest.risk_level)
+    reused = len(resolved)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(key: tuple[str, str]):
+        async with semaphore:
+            try:
+                return key, await screen_address(key[0], key[1], provider)
+            except Exception as exc:
+                logger.warning("Import screening of %s on %s failed: %s", key[0], key[1], exc)
+                return key, exc
+
+    # Batch priority: interactive checks from the bot keep their share of the vendor rate limit during an import.
+    with use_priority(Priority.batch):
+        tasks = [asyncio.create_task(run_one(key)) for key in keys if key not in resolved]
+        for done in asyncio.as_completed(tasks):
+            key, screened = await done
+            if isinstance(screened, Exception):
+                resolved[key] = f"AML check failed: {screened}"
+                continue
+            provider_name, result = screened
+            check = await save_wallet_check(db, key[0], key[1], provider_name, result, checked_by=None)
+            await db.commit()
+            resolved[key] = ResolvedCheck(check.id, check.risk_level)
+    return resolved, reused
+
+
+async def insert_chunk(db: AsyncSession, items: list[tuple[ParsedRow, ResolvedCheck]], actor_id: int) -> list[ImportRowResult]:
+    requests, results = [], []
+    for parsed, check in items:
+        row = parsed.row
+        request_id, request_no = uuid.uuid4(), await next_request_no()
+        requests.append(
+            {
+                "id": request_id,
+                "request_no": request_no,
+                "creator_id": actor_id,
+                "address": row.address,
+                "network": row.network,
+                "asset": row.asset,
+                "amount": row.amount,
+                "comment": row.comment,
+                "attachment_url": row.attachment_url,
+                "aml_check_id": check.check_id,
+                "status": RequestStatus.draft,
+            }
+        )
+        results.append(
+            ImportRowResult(
+                line=parsed.line,
+                status="created",
+                request_id=request_id,
+                request_no=request_no,
+                aml_check_id=check.check_id,
+                risk_level=check.risk_level,
+            )
+        )
+    # One multi-row INSERT per table instead of a flush per ORM object.
+    await db.execute(insert(PaymentRequest).values(requests))
+    await insert_status_logs(db, [item["id"] for item in requests], None, RequestStatus.draft, actor_id, IMPORT_REASON)
+    await bump_imported_stats(db, actor_id, len(requests), sum((Decimal(item["amount"]) for item in requests), Decimal(0)))
+    await db.commit()
+    return results
+
+
+async def import_requests(
+    db: AsyncSession, rows: list[ParsedRow], actor_id: int, provider: AmlProvider, chunk_size: int, concurrency: int
+) -> ImportReport:
+    results: dict[int, ImportRowResult] = {
+        i: ImportRowResult(line=item.line, status="failed", error=item.error) for i, item in enumerate(rows) if item.row is None
+    }
+    keys = list(dict.fromkeys((item.row.address, item.row.network) for item in rows if item.row is not None))
+    resolved, reused = await resolve_checks(db, keys, provider, concurrency)
+
+    ready: list[tuple[int, ParsedRow, ResolvedCheck]] = []
+    for i, item in enumerate(rows):
+        if item.row is None:
+            continue
+        check = resolved[(item.row.address, item.row.network)]
+        if isinstance(check, str):
+            results[i] = ImportRowResult(line=item.line, status="failed", error=check)
+        else:
+            ready.append((i, item, check))
+
+    # Each chunk is its own transaction: a failure loses that chunk only, and locks are held briefly.
+    for start in range(0, len(ready), max(1, chunk_size)):
+        chunk = ready[start : start + chunk_size]
+        try:
+            created = await insert_chunk(db, [(item, check) for _, item, check in chunk], actor_id)
+        except SQLAlchemyError as exc:
+            await db.rollback()
+            logger.warning("Import chunk starting at line %s failed: %s", chunk[0][1].line, exc)
+            for i, item, _ in chunk:
+                results[i] = ImportRowResult(line=item.line, status="failed", error=f"Insert failed: {type(exc).__name__}")
+            continue
+        for (i, _, _), result in zip(chunk, created):
+            results[i] = result
+
+    report_rows = [results[i] for i in range(len(rows))]
+    created_count = sum(1 for item in report_rows if item.status == "created")
+    return ImportReport(
+        created=created_count,
+        failed=len(report_rows) - created_count,
+        aml_checks_reused=reused,
+        aml_checks_run=sum(1 for key in keys if not isinstance(resolved[key], str)) - reused,
+        rows=report_rows,
+    )
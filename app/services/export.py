@@ -0,0 +1,285 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import decode_time_cursor, encode_cursor
+from app.db.models import (
+    AuditLog,
+    PaymentRequest,
+    PaymentRequestArchive,
+    RequestStatus,
+    StatusHistory,
+    StatusHistoryArchive,
+    WalletCheck,
+)
+
+EXPORT_FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+DEFAULT_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str
+    kind: str  # str | int | float | decimal | datetime
+    expr: object
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    columns: list[ExportColumn]
+    created_at: object
+    row_id: object
+    id_type: type
+    status: object | None
+    join: tuple | None = None
+
+
+def _requests_dataset(model) -> ExportDataset:
+    return ExportDataset(
+        columns=[
+            ExportColumn("id", "str", model.id),
+            ExportColumn("request_no", "str", model.request_no),
+            ExportColumn("creator_id", "int", model.creator_id),
+            ExportColumn("address", "str", model.address),
+            ExportColumn("network", "str", model.network),
+            ExportColumn("asset", "str", model.asset),
+            ExportColumn("amount", "decimal", model.amount),
+            ExportColumn("status", "str", model.status),
+            ExportColumn("approved_by", "int", model.approved_by),
+            ExportColumn("approved_at", "datetime", model.approved_at),
+            ExportColumn("rejection_reason", "str", model.rejection_reason),
+            ExportColumn("tx_hash", "str", model.tx_hash),
+            ExportColumn("paid_at", "datetime", model.paid_at),
+            ExportColumn("created_at", "datetime", model.created_at),
+            ExportColumn("updated_at", "datetime", model.updated_at),
+            ExportColumn("aml_check_id", "str", WalletCheck.id),
+            ExportColumn("aml_provider", "str", WalletCheck.provider),
+            ExportColumn("aml_risk_score", "float", WalletCheck.risk_score),
+            ExportColumn("aml_risk_level", "str", WalletCheck.risk_level),
+            ExportColumn("aml_checked_at", "datetime", WalletCheck.checked_at),
+        ],
+        created_at=model.created_at,
+        row_id=model.id,
+        id_type=uuid.UUID,
+        status=model.status,
+        join=(WalletCheck, WalletCheck.id == model.aml_check_id),
+    )
+
+
+def _history_dataset(model, requests_model) -> ExportDataset:
+    return ExportDataset(
+        columns=[
+            ExportColumn("id", "int", model.id),
+            ExportColumn("request_id", "str", model.request_id),
+            ExportColumn("request_no", "str", requests_model.request_no),
+            ExportColumn("old_status", "str", model.old_status),
+            ExportColumn("new_status", "str", model.new_status),
+            ExportColumn("actor_id", "int", model.actor_id),
+            ExportColumn("reason", "str", model.reason),
+            ExportColumn("created_at", "datetime", model.created_at),
+        ],
+        created_at=model.created_at,
+        row_id=model.id,
+        id_type=int,
+        status=model.new_status,
+        join=(requests_model, requests_model.id == model.request_id),
+    )
+
+
+EXPORT_DATASETS: dict[str, ExportDataset] = {
+    "requests": _requests_dataset(PaymentRequest),
+    "history": _history_dataset(StatusHistory, PaymentRequest),
+    # Paid/rejected requests moved out of the hot tables by app.services.archive.
+    "requests_archive": _requests_dataset(PaymentRequestArchive),
+    "history_archive": _history_dataset(StatusHistoryArchive, PaymentRequestArchive),
+    "audit": ExportDataset(
+        columns=[
+            ExportColumn("id", "int", AuditLog.id),
+            ExportColumn("actor_id", "int", AuditLog.actor_id),
+            ExportColumn("action", "str", AuditLog.action),
+            ExportColumn("entity_type", "str", AuditLog.entity_type),
+            ExportColumn("entity_id", "str", AuditLog.entity_id),
+            ExportColumn("payload_json", "str", AuditLog.payload_json),
+            ExportColumn("created_at", "datetime", AuditLog.created_at),
+        ],
+        created_at=AuditLog.created_at,
+        row_id=AuditLog.id,
+        id_type=int,
+        status=None,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    status: RequestStatus | None = None
+    after: str | None = None
+
+
+def build_export_query(dataset_name: str, filters: ExportFilter) -> Select:
+    dataset = EXPORT_DATASETS[dataset_name]
+    stmt = select(*(column.expr.label(column.name) for column in dataset.columns))
+    if dataset.join is not None:
+        stmt = stmt.join(*dataset.join)
+
+    if filters.date_from is not None:
+        stmt = stmt.where(dataset.created_at >= filters.date_from)
+    if filters.date_to is not None:
+        stmt = stmt.where(dataset.created_at < filters.date_to)
+    if filters.status is not None:
+        if dataset.status is None:
+            raise ValueError(f"Dataset '{dataset_name}' cannot be filtered by status")
+        stmt = stmt.where(dataset.status == filters.status)
+    if filters.after:
+        created_at, raw_id = decode_time_cursor(filters.after)
+        try:
+            row_id = dataset.id_type(raw_id)
+        except ValueError as exc:
+            raise ValueError("Invalid cursor") from exc
+        stmt = stmt.where(tuple_(dataset.created_at, dataset.row_id) > tuple_(created_at, row_id))
+    return stmt.order_by(dataset.created_at.asc(), dataset.row_id.asc())
+
+
+def export_columns(dataset_name: str) -> list[str]:
+    return [column.name for column in EXPORT_DATASETS[dataset_name].columns] + ["cursor"]
+
+
+async def iter_export_chunks(
+    db: AsyncSession,
+    dataset_name: str,
+    filters: ExportFilter,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[list[dict]]:
+    stmt = build_export_query(dataset_name, filters).execution_options(yield_per=chunk_size)
+    # AsyncSession.stream() keeps a server-side cursor open, so only one chunk is ever held in memory.
+    result = await db.stream(stmt)
+    async for partition in result.mappings().partitions(chunk_size):
+        rows = []
+        for row in partition:
+            item = dict(row)
+            item["cursor"] = encode_cursor(item["created_at"], item["id"])
+            rows.append(item)
+        yield rows
+
+
+def _csv_value(value: object) -> object:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+async def write_csv(chunks: AsyncIterator[list[dict]], columns: list[str]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    async for rows in chunks:
+        for row in rows:
+            writer.writerow([_csv_value(row[name]) for name in columns])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(dataset_name: str):
+    import pyarrow as pa
+
+    types = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "decimal": pa.decimal128(38, 18),
+        "datetime": pa.timestamp("us", tz="UTC"),
+    }
+    fields = [pa.field(column.name, types[column.kind]) for column in EXPORT_DATASETS[dataset_name].columns]
+    return pa.schema(fields + [pa.field("cursor", pa.string())])
+
+
+def _arrow_value(value: object, kind: str) -> object:
+    if value is None:
+        return None
+    if kind == "str":
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value.value if hasattr(value, "value") else str(value)
+    if kind == "float":
+        return float(value)
+    if kind == "decimal":
+        return Decimal(value)
+    return value
+
+
+def require_parquet() -> None:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("Parquet export requires pyarrow. Install it with `pip install pyarrow`.") from exc
+
+
+async def write_parquet(chunks: AsyncIterator[list[dict]], dataset_name: str) -> AsyncIterator[bytes]:
+    require_parquet()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(dataset_name)
+    kinds = {column.name: column.kind for column in EXPORT_DATASETS[dataset_name].columns} | {"cursor": "str"}
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in chunks:
+            # Every chunk becomes its own row group, flushed to the client before the next one is read.
+            columns = {name: [_arrow_value(row[name], kind) for row in rows] for name, kind in kinds.items()}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(
+    chunks: AsyncIterator[list[dict]],
+    dataset_name: str,
+    fmt: str,
+) -> AsyncIterator[bytes]:
+    if fmt == "parquet":
+        return write_parquet(chunks, dataset_name)
+    return write_csv(chunks, export_columns(dataset_name))
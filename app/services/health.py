@@ -0,0 +1,153 @@
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import get_settings
+
+
+class LatencyWindow:
+    def __init__(self, window_s: float = 60.0, max_samples: int = 2048) -> None:
+        self.window_s = window_s
+        self._samples: deque[tuple[float, float]] = deque(maxlen=max_samples)
+
+    def record(self, elapsed_ms: float) -> None:
+        self._samples.append((time.monotonic(), elapsed_ms))
+
+    def p95(self) -> float | None:
+        cutoff = time.monotonic() - self.window_s
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        if not self._samples:
+            return None
+        values = sorted(elapsed for _, elapsed in self._samples)
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+
+class CircuitBreaker:
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout_s: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.closed
+        if time.monotonic() - self._opened_at >= self._reset_timeout_s:
+            return self.half_open
+        return self.open
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.closed:
+            return True
+        if state == self.half_open and not self._trial_in_flight:
+            # One trial call decides whether the circuit closes again or stays open for another period.
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        # The trial call ended without an answer (cancelled): let the next caller try instead of staying half-open.
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+db_latency = LatencyWindow()
+provider_latency = LatencyWindow()
+_provider_circuit: CircuitBreaker | None = None
+
+
+def get_provider_circuit() -> CircuitBreaker:
+    global _provider_circuit
+    if _provider_circuit is None:
+        settings = get_settings()
+        _provider_circuit = CircuitBreaker(settings.aml_circuit_failure_threshold, settings.aml_circuit_reset_s)
+    return _provider_circuit
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started_at"].pop()
+    db_latency.record((time.perf_counter() - started) * 1000)
+
+
+def _handle_error(exception_context) -> None:
+    # Failed statements (unique violations in import and settle chunks, say) never reach after_cursor_execute; pop
+    # their start here so the list on the pooled connection does not grow, and count the time they took too.
+    conn = exception_context.connection
+    started = conn.info.get("query_started_at") if conn is not None else None
+    if started:
+        db_latency.record((time.perf_counter() - started.pop()) * 1000)
+
+
+def pool_usage(engine: AsyncEngine | None) -> dict | None:
+    if engine is None:
+        return None
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return None
+    settings = get_settings()
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    in_use = pool.checkedout()
+    return {"in_use": in_use, "capacity": capacity, "utilization": round(in_use / capacity, 3) if capacity else 1.0}
+
+
+def readiness(warm: bool, engine: AsyncEngine | None) -> tuple[bool, dict]:
+    settings = get_settings()
+    db_p95 = db_latency.p95()
+    provider_p95 = provider_latency.p95()
+    circuit = get_provider_circuit().state
+    pool = pool_usage(engine)
+
+    reasons = []
+    if not warm:
+        reasons.append("warming_up")
+    if pool is not None and pool["utilization"] >= settings.ready_max_pool_utilization:
+        reasons.append("db_pool_saturated")
+    if db_p95 is not None and db_p95 > settings.ready_max_db_p95_ms:
+        reasons.append("db_slow")
+    if provider_p95 is not None and provider_p95 > settings.ready_max_provider_p95_ms:
+        reasons.append("provider_slow")
+    if circuit == CircuitBreaker.open:
+        reasons.append("provider_circuit_open")
+
+    body = {
+        "status": "unready" if reasons else "ready",
+        "reasons": reasons,
+        "db_pool": pool,
+        "db_p95_ms": round(db_p95, 1) if db_p95 is not None else None,
+        "provider_p95_ms": round(provider_p95, 1) if provider_p95 is not None else None,
+        "provider_circuit": circuit,
+    }
+    return not reasons, body
@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import TypeVar
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires_at: float
+    done: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+    response: dict | None = None
+
+
+def request_fingerprint(payload: BaseModel | None) -> str:
+    body = payload.model_dump_json() if payload is not None else ""
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _mismatch() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="Idempotency-Key was already used with a different request payload",
+    )
+
+
+class IdempotencyStore:
+    def __init__(
+        self, ttl_s: float, cache_ttl_s: float, wait_timeout_s: float, lease_s: float = 120.0, poll_interval_s: float = 0.2
+    ) -> None:
+        self._ttl_s = ttl_s
+        self._lease_s = lease_s
+        self._cache_ttl_s = cache_ttl_s
+        self._wait_timeout_s = wait_timeout_s
+        self._poll_interval_s = poll_interval_s
+        self._entries: dict[tuple[int, str, str], _Entry] = {}
+        self._next_prune = 0.0
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self._cache_ttl_s / 10
+        expired = [ident for ident, entry in self._entries.items() if entry.response is not None and entry.expires_at < now]
+        for ident in expired:
+            del self._entries[ident]
+
+    def _cached(self, ident: tuple[int, str, str]) -> _Entry | None:
+        entry = self._entries.get(ident)
+        if entry is not None and entry.response is not None and entry.expires_at < time.monotonic():
+            del self._entries[ident]
+            return None
+        return entry
+
+    async def _wait_local(self, entry: _Entry) -> dict:
+        try:
+            return await asyncio.wait_for(asyncio.shield(entry.done), timeout=self._wait_timeout_s)
+        except asyncio.TimeoutError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            ) from exc
+
+    async def _wait_remote(self, db: AsyncSession, ident: tuple[int, str, str], fingerprint: str) -> dict:
+        deadline = time.monotonic() + self._wait_timeout_s
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self._poll_interval_s)
+            row = await self._load(db, ident)
+            if row is None:
+                break
+            if row.fingerprint != fingerprint:
+                raise _mismatch()
+            if row.response_json is not None:
+                return row.response_json
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress",
+        )
+
+    async def _load(self, db: AsyncSession, ident: tuple[int, str, str]) -> IdempotencyKey | None:
+        actor_id, scope, key = ident
+        stmt = select(IdempotencyKey).where(
+            IdempotencyKey.actor_id == actor_id,
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at > func.now(),
+        )
+        # populate_existing: polling must see the response written by the other worker, not the identity-map copy.
+        stmt = stmt.execution_options(populate_existing=True)
+        return (await db.execute(stmt)).scalar_one_or_none()
+
+    async def _claim(self, db: AsyncSession, ident: tuple[int, str, str], fingerprint: str) -> uuid.UUID | None:
+        actor_id, scope, key = ident
+        token = uuid.uuid4()
+        # The lease has to outlast the slowest handler (queue wait, vendor timeout and retry, DB work), or a retry on
+        # another worker takes the key over mid-run. It still frees a key left behind by a crash well before the TTL;
+        # _store extends it to the TTL.
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self._lease_s)
+        values = {"fingerprint": fingerprint, "response_json": None, "expires_at": expires_at, "claim_token": token}
+        stmt = pg_insert(IdempotencyKey).values(actor_id=actor_id, scope=scope, key=key, **values)
+        # An expired row for the same key is taken over instead of blocking the key forever.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.actor_id, IdempotencyKey.scope, IdempotencyKey.key],
+            set_={**values, "created_at": func.now()},
+            where=IdempotencyKey.expires_at <= func.now(),
+        ).returning(IdempotencyKey.key)
+        claimed = (await db.execute(stmt)).scalar_one_or_none() is not None
+        await db.commit()
+        return token if claimed else None
+
+    def _held(self, ident: tuple[int, str, str], token: uuid.UUID):
+        actor_id, scope, key = ident
+        # Matching on the claim token: once our lease was taken over, the row belongs to the other run.
+        return (
+            IdempotencyKey.actor_id == actor_id,
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.claim_token == token,
+            IdempotencyKey.response_json.is_(None),
+        )
+
+    async def _release(self, db: AsyncSession, ident: tuple[int, str, str], token: uuid.UUID) -> None:
+        await db.rollback()
+        await db.execute(delete(IdempotencyKey).where(*self._held(ident, token)))
+        await db.commit()
+
+    async def _store(self, db: AsyncSession, ident: tuple[int, str, str], token: uuid.UUID, response: dict) -> None:
+        result = await db.execute(
+            update(IdempotencyKey)
+            .where(*self._held(ident, token))
+            .values(response_json=response, expires_at=datetime.now(timezone.utc) + timedelta(seconds=self._ttl_s))
+        )
+        await db.commit()
+        if result.rowcount == 0:
+            logger.warning("Idempotency lease for %s %s expired before the response was stored", ident[1], ident[2])
+
+    async def run(
+        self,
+        db: AsyncSession,
+        actor_id: int,
+        scope: str,
+        key: str,
+        payload: BaseModel | None,
+        response_model: type[ResponseT],
+        handler: Callable[[], Awaitable[ResponseT]],
+    ) -> ResponseT:
+        ident = (actor_id, scope, key)
+        fingerprint = request_fingerprint(payload)
+
+        entry = self._cached(ident)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise _mismatch()
+            if entry.response is not None:
+                return response_model.model_validate(entry.response)
+            return response_model.model_validate(await self._wait_local(entry))
+
+        # Register before the first await so concurrent duplicates in this worker wait on our execution.
+        self._prune()
+        entry = _Entry(fingerprint=fingerprint, expires_at=0.0)
+        self._entries[ident] = entry
+        try:
+            row = await self._load(db, ident)
+            if row is not None:
+                if row.fingerprint != fingerprint:
+                    raise _mismatch()
+                response = row.response_json if row.response_json is not None else await self._wait_remote(db, ident, fingerprint)
+            elif (token := await self._claim(db, ident, fingerprint)) is not None:
+                try:
+                    result = await handler()
+                except BaseException:
+                    await self._release(db, ident, token)
+                    raise
+                response = result.model_dump(mode="json")
+                await self._store(db, ident, token, response)
+            else:
+                response = await self._wait_remote(db, ident, fingerprint)
+        except BaseException as exc:
+            self._entries.pop(ident, None)
+            if not entry.done.done():
+                entry.done.set_exception(exc)
+                # Waiters re-raise it; mark it retrieved so an unawaited future does not log a warning.
+                entry.done.exception()
+            raise
+
+        entry.response = response
+        entry.expires_at = time.monotonic() + self._cache_ttl_s
+        entry.done.set_result(response)
+        return response_model.model_validate(response)
+
+
+_store: IdempotencyStore | None = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _store
+    if _store is None:
+        settings = get_settings()
+        _store = IdempotencyStore(
+            ttl_s=settings.idempotency_ttl_s,
+            cache_ttl_s=settings.idempotency_cache_ttl_s,
+            wait_timeout_s=settings.idempotency_wait_timeout_s,
+            lease_s=settings.idempotency_lease_s,
+        )
+    return _store
+
+
+async def run_idempotent(
+    db: AsyncSession,
+    key: str | None,
+    actor_id: int,
+    scope: str,
+    payload: BaseModel | None,
+    response_model: type[ResponseT],
+    handler: Callable[[], Awaitable[ResponseT]],
+) -> ResponseT:
+    if not key:
+        return await handler()
+    return await get_idempotency_store().run(db, actor_id, scope, key, payload, response_model, handler)
@@ -0,0 +1,282 @@
+import csv
+import io
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import Select, Text, column, exists, func, literal, select, union_all, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas import SettleReport, SettleRowResult
+from app.db.models import (
+    AuditLog,
+    PaymentRequest,
+    PaymentRequestArchive,
+    PayoutBatch,
+    PayoutBatchItem,
+    PayoutBatchStatus,
+    RequestStatus,
+)
+from app.services.bulk_import import ImportTooLarge, iter_csv_records, iter_lines, iter_ndjson_records
+from app.services.stats import bump_transition_stats
+from app.services.status_log import insert_status_logs
+from app.services.tron_address import normalize_tx_hash
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ("request_no", "address", "network", "asset", "amount")
+
+
+@dataclass
+class SettleLine:
+    line: int
+    request_no: str | None = None
+    tx_hash: str | None = None
+    error: str | None = None
+
+
+def build_candidates_query(batch_id: uuid.UUID, request_ids: list[uuid.UUID] | None, limit: int) -> Select:
+    stmt = select(
+        literal(batch_id, UUID(as_uuid=True)), PaymentRequest.id, PaymentRequest.request_no, PaymentRequest.amount
+    ).where(
+        PaymentRequest.status == RequestStatus.approved,
+        ~exists().where(PayoutBatchItem.request_id == PaymentRequest.id),
+    )
+    if request_ids is not None:
+        stmt = stmt.where(PaymentRequest.id.in_(request_ids))
+    return stmt.order_by(PaymentRequest.approved_at, PaymentRequest.id).limit(limit)
+
+
+async def create_batch(
+    db: AsyncSession, actor_id: int, request_ids: list[uuid.UUID] | None, max_size: int
+) -> PayoutBatch | None:
+    batch = PayoutBatch(id=uuid.uuid4(), status=PayoutBatchStatus.open, created_by=actor_id, item_count=0, total_amount=0)
+    db.add(batch)
+    await db.flush()
+    stmt = pg_insert(PayoutBatchItem).from_select(
+        ["batch_id", "request_id", "request_no", "amount"], build_candidates_query(batch.id, request_ids, max_size)
+    )
+    # Two batches built at the same time may pick the same request; the later insert skips it instead of failing.
+    stmt = stmt.on_conflict_do_nothing(index_elements=[PayoutBatchItem.request_id]).returning(PayoutBatchItem.amount)
+    amounts = (await db.execute(stmt)).scalars().all()
+    if not amounts:
+        await db.rollback()
+        return None
+    batch.item_count = len(amounts)
+    batch.total_amount = sum((Decimal(amount) for amount in amounts), Decimal(0))
+    db.add(
+        AuditLog(
+            actor_id=actor_id,
+            action="payout_batch_created",
+            entity_type="payout_batch",
+            entity_id=str(batch.id),
+            payload_json={"item_count": batch.item_count, "total_amount": str(batch.total_amount)},
+        )
+    )
+    await db.commit()
+    await db.refresh(batch)
+    return batch
+
+
+def build_paid_count_query(batch_id: uuid.UUID) -> Select:
+    # Paid requests are archived after a while, so they are counted in both tables.
+    counts = [
+        select(func.count())
+        .select_from(PayoutBatchItem)
+        .join(model, model.id == PayoutBatchItem.request_id)
+        .where(PayoutBatchItem.batch_id == batch_id, model.status == RequestStatus.paid)
+        .scalar_subquery()
+        for model in (PaymentRequest, PaymentRequestArchive)
+    ]
+    return select(counts[0] + counts[1])
+
+
+def build_export_query(batch_id: uuid.UUID) -> Select:
+    # Only what is still to be paid, so a re-export after a partial settlement does not pay anyone twice.
+    return (
+        select(PayoutBatchItem.request_no, PaymentRequest.address, PaymentRequest.network, PaymentRequest.asset, PayoutBatchItem.amount)
+        .join(PaymentRequest, PaymentRequest.id == PayoutBatchItem.request_id)
+        .where(PayoutBatchItem.batch_id == batch_id, PaymentRequest.status == RequestStatus.approved)
+        .order_by(PayoutBatchItem.request_no)
+    )
+
+
+def render_export_csv(rows) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(tuple(row) for row in rows)
+    return out.getvalue()
+
+
+async def read_settle_lines(chunks: AsyncIterator[bytes], fmt: str, max_bytes: int, max_rows: int) -> list[SettleLine]:
+    lines = iter_lines(chunks, max_bytes)
+    records = iter_csv_records(lines, required=("request_no", "tx_hash")) if fmt == "csv" else iter_ndjson_records(lines)
+    parsed: list[SettleLine] = []
+    seen_nos: set[str] = set()
+    seen_hashes: set[str] = set()
+    async for line, record in records:
+        if len(parsed) >= max_rows:
+            raise ImportTooLarge(f"Upload has more than {max_rows} rows")
+        if isinstance(record, str):
+            parsed.append(SettleLine(line, error=record))
+            continue
+        request_no = str(record.get("request_no") or "").strip()
+        raw_hash = str(record.get("tx_hash") or "").strip()
+        try:
+            tx_hash = normalize_tx_hash(raw_hash)
+            hash_error = None
+        except ValueError as exc:
+            tx_hash, hash_error = raw_hash, f"tx_hash: {exc}"
+        item = SettleLine(line, request_no or None, tx_hash or None)
+        if not request_no:
+            item.error = "request_no: missing"
+        elif hash_error is not None:
+            item.error = hash_error
+        elif request_no in seen_nos:
+            item.error = "Duplicate request_no in file"
+        elif tx_hash in seen_hashes:
+            item.error = "Duplicate tx_hash in file"
+        else:
+            seen_nos.add(request_no)
+            seen_hashes.add(tx_hash)
+        parsed.append(item)
+    return parsed
+
+
+def build_settle_lookup(batch_id: uuid.UUID, request_nos: list[str]) -> Select:
+    return (
+        select(PayoutBatchItem.request_no, PayoutBatchItem.request_id, PaymentRequest.status, PaymentRequest.tx_hash)
+        .outerjoin(PaymentRequest, PaymentRequest.id == PayoutBatchItem.request_id)
+        .where(PayoutBatchItem.batch_id == batch_id, PayoutBatchItem.request_no.in_(request_nos))
+    )
+
+
+def build_used_hashes_query(tx_hashes: list[str]):
+    # The unique index on payment_requests.tx_hash does not cover archived payouts, so both tables are checked.
+    return union_all(
+        select(PaymentRequest.tx_hash).where(PaymentRequest.tx_hash.in_(tx_hashes)),
+        select(PaymentRequestArchive.tx_hash).where(PaymentRequestArchive.tx_hash.in_(tx_hashes)),
+    )
+
+
+def build_settle_update(pairs: list[tuple[uuid.UUID, str]]):
+    paid = values(column("id", UUID(as_uuid=True)), column("tx_hash", Text), name="paid").data(pairs)
+    return (
+        update(PaymentRequest)
+        .where(PaymentRequest.id == paid.c.id, PaymentRequest.status == RequestStatus.approved)
+        .values(status=RequestStatus.paid, tx_hash=paid.c.tx_hash, paid_at=func.now(), updated_at=func.now())
+        .returning(PaymentRequest.id, PaymentRequest.creator_id, PaymentRequest.amount, PaymentRequest.created_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def settle_chunk(db: AsyncSession, batch_id: uuid.UUID, chunk: list[SettleLine], actor_id: int) -> list[SettleRowResult]:
+    found = {row.request_no: row for row in (await db.execute(build_settle_lookup(batch_id, [item.request_no for item in chunk]))).all()}
+    used = set((await db.execute(build_used_hashes_query([item.tx_hash for item in chunk]))).scalars().all())
+    results: list[SettleRowResult] = []
+    pending: list[tuple[int, uuid.UUID, str]] = []
+    for item in chunk:
+        row = found.get(item.request_no)
+        error = None
+        if row is None:
+            error = "Not in this batch"
+        elif row.status is None:
+            error = "Request has been archived"
+        elif row.status == RequestStatus.paid and row.tx_hash == item.tx_hash:
+            results.append(SettleRowResult(line=item.line, request_no=item.request_no, status="already_settled"))
+            continue
+        elif row.status == RequestStatus.paid:
+            error = "Already paid with another tx_hash"
+        elif row.status != RequestStatus.approved:
+            error = f"Request is {row.status.value}"
+        elif item.tx_hash in used:
+            error = "tx_hash already used by another request"
+        if error is not None:
+            results.append(SettleRowResult(line=item.line, request_no=item.request_no, status="failed", error=error))
+            continue
+        pending.append((len(results), row.request_id, item.tx_hash))
+        results.append(SettleRowResult(line=item.line, request_no=item.request_no, status="settled"))
+
+    if pending:
+        # One UPDATE ... FROM (VALUES ...) for the whole chunk; the status guard makes a concurrent transition win.
+        updated = (await db.execute(build_settle_update([(request_id, tx_hash) for _, request_id, tx_hash in pending]))).all()
+        updated_ids = {row.id for row in updated}
+        for index, request_id, _ in pending:
+            if request_id not in updated_ids:
+                results[index] = SettleRowResult(
+                    line=results[index].line, request_no=results[index].request_no, status="failed", error="Request changed while settling"
+                )
+        if updated:
+            reason = f"settled in payout batch {batch_id}"
+            await insert_status_logs(db, [row.id for row in updated], RequestStatus.approved, RequestStatus.paid, actor_id, reason)
+            await bump_transition_stats(db, updated, RequestStatus.approved, RequestStatus.paid)
+    await db.commit()
+    return results
+
+
+def build_close_batch(batch_id: uuid.UUID):
+    # A batch is settled once none of its requests is still waiting to be paid; rejected ones do not hold it open.
+    unpaid = exists().where(
+        PayoutBatchItem.batch_id == batch_id,
+        PaymentRequest.id == PayoutBatchItem.request_id,
+        PaymentRequest.status == RequestStatus.approved,
+    )
+    return (
+        update(PayoutBatch)
+        .where(PayoutBatch.id == batch_id, PayoutBatch.status == PayoutBatchStatus.open, ~unpaid)
+        .values(status=PayoutBatchStatus.settled, settled_at=func.now())
+        .returning(PayoutBatch.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def settle_batch(
+    db: AsyncSession, batch: PayoutBatch, lines: list[SettleLine], actor_id: int, chunk_size: int
+) -> SettleReport:
+    results: dict[int, SettleRowResult] = {
+        i: SettleRowResult(line=item.line, request_no=item.request_no, status="failed", error=item.error)
+        for i, item in enumerate(lines)
+        if item.error is not None
+    }
+    valid = [(i, item) for i, item in enumerate(lines) if item.error is None]
+    # One transaction per chunk: row locks are held briefly, and a failure only loses its own chunk.
+    for start in range(0, len(valid), max(1, chunk_size)):
+        chunk = valid[start : start + chunk_size]
+        try:
+            settled = await settle_chunk(db, batch.id, [item for _, item in chunk], actor_id)
+        except SQLAlchemyError as exc:
+            await db.rollback()
+            logger.warning("Settling payout batch %s failed at line %s: %s", batch.id, chunk[0][1].line, exc)
+            for i, item in chunk:
+                results[i] = SettleRowResult(line=item.line, request_no=item.request_no, status="failed", error=f"Settlement failed: {type(exc).__name__}")
+            continue
+        for (i, _), result in zip(chunk, settled):
+            results[i] = result
+
+    rows = [results[i] for i in range(len(lines))]
+    counts = {name: sum(1 for row in rows if row.status == name) for name in ("settled", "already_settled", "failed")}
+    closed = (await db.execute(build_close_batch(batch.id))).scalar_one_or_none()
+    db.add(
+        AuditLog(
+            actor_id=actor_id,
+            action="payout_batch_settled",
+            entity_type="payout_batch",
+            entity_id=str(batch.id),
+            payload_json=counts | {"closed": closed is not None},
+        )
+    )
+    await db.commit()
+    return SettleReport(
+        batch_id=batch.id,
+        batch_status=PayoutBatchStatus.settled if closed is not None else batch.status,
+        settled=counts["settled"],
+        already_settled=counts["already_settled"],
+        failed=counts["failed"],
+        rows=rows,
+    )
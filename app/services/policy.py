@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from app.config import get_settings
+from app.db.models import RiskLevel, UserRole
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+ANY_ASSET = "*"
+_RULE_FIELDS = {
+    "name",
+    "assets",
+    "min_amount",
+    "max_amount",
+    "risk_levels",
+    "max_risk_score",
+    "max_category_score",
+    "deny_categories",
+    "creator_roles",
+}
+
+
+class PolicyError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ApprovalFacts:
+    asset: str
+    amount: Decimal
+    risk_level: RiskLevel
+    risk_score: float
+    categories: tuple[tuple[str, float], ...]
+    creator_role: UserRole
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    name: str
+    min_amount: Decimal | None
+    max_amount: Decimal | None
+    max_risk_score: float | None
+    max_category_score: float | None
+    deny_categories: frozenset[str]
+
+    def matches(self, facts: ApprovalFacts) -> bool:
+        if self.max_amount is not None and facts.amount > self.max_amount:
+            return False
+        if self.min_amount is not None and facts.amount < self.min_amount:
+            return False
+        if self.max_risk_score is not None and facts.risk_score > self.max_risk_score:
+            return False
+        for name, score in facts.categories:
+            if self.max_category_score is not None and score > self.max_category_score:
+                return False
+            if score > 0 and name.lower() in self.deny_categories:
+                return False
+        return True
+
+
+def _decimal(rule_name: str, value) -> Decimal | None:
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation as exc:
+        raise PolicyError(f"rule {rule_name!r}: invalid amount {value!r}") from exc
+
+
+def _choices(rule_name: str, values, enum_cls, default=None) -> list:
+    if values is None:
+        return list(enum_cls) if default is None else list(default)
+    try:
+        return [enum_cls(value) for value in values]
+    except ValueError as exc:
+        raise PolicyError(f"rule {rule_name!r}: {exc}") from exc
+
+
+class ApprovalPolicy:
+    # Rules are expanded at compile time into (asset, risk_level, creator_role) -> ordered candidates, so a
+    # decision is one dict lookup plus a few comparisons against the rules that can still match.
+    def __init__(self, rules: list[dict]) -> None:
+        self.rule_names: list[str] = []
+        compiled: list[tuple[CompiledRule, list[str], list[RiskLevel], list[UserRole]]] = []
+        for index, raw in enumerate(rules):
+            if not isinstance(raw, dict):
+                raise PolicyError(f"rule #{index} must be an object")
+            name = str(raw.get("name") or f"rule-{index + 1}")
+            unknown = set(raw) - _RULE_FIELDS
+            if unknown:
+                raise PolicyError(f"rule {name!r}: unknown field(s) {', '.join(sorted(unknown))}")
+            rule = CompiledRule(
+                name=name,
+                min_amount=_decimal(name, raw.get("min_amount")),
+                max_amount=_decimal(name, raw.get("max_amount")),
+                max_risk_score=float(raw["max_risk_score"]) if raw.get("max_risk_score") is not None else None,
+                max_category_score=float(raw["max_category_score"]) if raw.get("max_category_score") is not None else None,
+                deny_categories=frozenset(str(category).lower() for category in raw.get("deny_categories", [])),
+            )
+            assets = [str(asset).upper() for asset in raw["assets"]] if raw.get("assets") else [ANY_ASSET]
+            # Auto-approval has to be opted into per risk level: an omitted list means low only, and a rule that lets
+            # high-risk checks through must also bound the score or deny categories.
+            levels = _choices(name, raw.get("risk_levels"), RiskLevel, default=[RiskLevel.low])
+            if RiskLevel.high in levels and rule.max_risk_score is None and not rule.deny_categories:
+                raise PolicyError(f"rule {name!r}: risk level 'high' needs max_risk_score or deny_categories")
+            compiled.append((rule, assets, levels, _choices(name, raw.get("creator_roles"), UserRole)))
+            self.rule_names.append(name)
+
+        known_assets = {asset for _, assets, _, _ in compiled for asset in assets}
+        table: dict[tuple[str, RiskLevel, UserRole], list[CompiledRule]] = {}
+        for rule, assets, levels, roles in compiled:
+            # Wildcard rules are copied into every concrete asset's slots so rule order is kept without a merge.
+            targets = known_assets if ANY_ASSET in assets else assets
+            for asset in targets:
+                for level in levels:
+                    for role in roles:
+                        table.setdefault((asset, level, role), []).append(rule)
+        self._table = {key: tuple(candidates) for key, candidates in table.items()}
+
+    def evaluate(self, facts: ApprovalFacts) -> str | None:
+        candidates = self._table.get((facts.asset.upper(), facts.risk_level, facts.creator_role))
+        if candidates is None:
+            candidates = self._table.get((ANY_ASSET, facts.risk_level, facts.creator_role), ())
+        for rule in candidates:
+            if rule.matches(facts):
+                return rule.name
+        return None
+
+    def __bool__(self) -> bool:
+        return bool(self._table)
+
+
+def load_policy(path: str) -> ApprovalPolicy:
+    with open(path, encoding="utf-8") as fh:
+        try:
+            data = json.load(fh)
+        except json.JSONDecodeError as exc:
+            raise PolicyError(f"{path}: {exc}") from exc
+    rules = data.get("rules") if isinstance(data, dict) else None
+    if not isinstance(rules, list):
+        raise PolicyError(f"{path}: expected an object with a 'rules' list")
+    return ApprovalPolicy(rules)
+
+
+class ReloadingPolicy:
+    def __init__(self, path: str, check_interval_s: float) -> None:
+        self._path = path
+        self._check_interval_s = check_interval_s
+        self._next_check = 0.0
+        self._signature: tuple | None = None
+        self._policy = ApprovalPolicy([])
+
+    def current(self) -> ApprovalPolicy:
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._policy
+        self._next_check = now + self._check_interval_s
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            signature = None
+        else:
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return self._policy
+        self._signature = signature
+        if signature is None:
+            self._policy = ApprovalPolicy([])
+            return self._policy
+        try:
+            self._policy = load_policy(self._path)
+        except (OSError, PolicyError) as exc:
+            # A broken edit keeps the last good rules instead of silently disabling or widening auto-approval.
+            logger.error("Approval policy %s not reloaded: %s", self._path, exc)
+        return self._policy
+
+
+_policy: ReloadingPolicy | None = None
+_disabled = ApprovalPolicy([])
+
+
+def get_approval_policy() -> ApprovalPolicy:
+    global _policy
+    settings = get_settings()
+    if not settings.approval_policy_path:
+        return _disabled
+    # current() may stat and re-read the policy file, so it is timed like the other per-request dependencies.
+    with span("dependency get_approval_policy"):
+        if _policy is None:
+            _policy = ReloadingPolicy(settings.approval_policy_path, settings.approval_policy_reload_interval_s)
+        return _policy.current()
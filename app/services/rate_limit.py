@@ -0,0 +1,192 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from enum import IntEnum
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db.models import AmlProviderQuota
+from app.db.session import get_sessionmaker
+
+
+class Priority(IntEnum):
+    interactive = 0
+    batch = 1
+    rescreen = 2
+
+
+_priority: ContextVar[Priority] = ContextVar("aml_priority", default=Priority.interactive)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def use_priority(priority: Priority) -> Iterator[None]:
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, message: str, retry_after_s: float) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, burst: int) -> None:
+        self.rate_per_s = rate_per_s
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate_per_s)
+        self._updated = max(self._updated, now)
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        pause = max(0.0, self._paused_until - now)
+        if self._tokens >= 1:
+            return pause
+        return pause + (1 - self._tokens) / self.rate_per_s
+
+    def take(self, now: float) -> bool:
+        if self.rate_per_s <= 0:
+            return True
+        if now < self._paused_until:
+            return False
+        self._refill(now)
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def pause(self, seconds: float) -> None:
+        # The vendor told us to back off: drop the burst and refill only after the pause.
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + seconds)
+
+
+class PriorityLimiter:
+    # In-process only: every worker and script has its own bucket and queue, so the configured rate is per process
+    # and priorities are not enforced across processes. Only the daily quota is shared, through Postgres.
+    def __init__(self, bucket: TokenBucket) -> None:
+        self._bucket = bucket
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def _queued_ahead(self, priority: Priority) -> int:
+        return sum(1 for waiter_priority, _, future in self._waiters if waiter_priority <= priority and not future.done())
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        if self._waiters:
+            delay = self._bucket.wait_time(time.monotonic())
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._bucket.take(now):
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+        self._schedule()
+
+    async def acquire(self, priority: Priority, timeout_s: float) -> None:
+        now = time.monotonic()
+        if not self._waiters and self._bucket.take(now):
+            return
+        # Estimate the wait from the bucket and everyone ahead of us; fail now rather than after the deadline.
+        rate = self._bucket.rate_per_s
+        expected = self._bucket.wait_time(now) + self._queued_ahead(priority) / rate
+        if expected > timeout_s:
+            raise RateLimitExceeded("AML provider rate limit queue is full, retry later", retry_after_s=expected)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._timer is None:
+            self._schedule()
+        try:
+            await asyncio.wait_for(future, timeout=timeout_s)
+        except asyncio.TimeoutError as exc:
+            raise RateLimitExceeded("AML provider rate limit queue is full, retry later", retry_after_s=timeout_s) from exc
+
+    def pause(self, seconds: float) -> None:
+        self._bucket.pause(seconds)
+        if self._waiters:
+            self._schedule()
+
+
+def seconds_until_utc_midnight(now: datetime | None = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return (tomorrow - now).total_seconds()
+
+
+async def consume_daily_quota(provider: str, day: date, limit: int) -> bool:
+    # The first call of the day takes the INSERT path, which the used < limit guard below does not cover.
+    if limit <= 0:
+        return False
+    stmt = pg_insert(AmlProviderQuota).values(provider=provider, day=day, used=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AmlProviderQuota.provider, AmlProviderQuota.day],
+        set_={"used": AmlProviderQuota.used + 1},
+        where=AmlProviderQuota.used < limit,
+    ).returning(AmlProviderQuota.used)
+    # Own short transaction: the counter is shared by every worker and must not wait on the caller's commit.
+    async with get_sessionmaker()() as session:
+        used = (await session.execute(stmt)).scalar_one_or_none()
+        await session.commit()
+    return used is not None
+
+
+ConsumeQuota = Callable[[str, date, int], Awaitable[bool]]
+
+
+class DailyQuota:
+    def __init__(
+        self,
+        provider: str,
+        limit: int,
+        interactive_reserve: float = 0.0,
+        consume: ConsumeQuota = consume_daily_quota,
+    ) -> None:
+        self._provider = provider
+        self._limit = limit
+        self._interactive_reserve = interactive_reserve
+        self._consume = consume
+
+    def limit_for(self, priority: Priority) -> int:
+        if priority == Priority.interactive:
+            return self._limit
+        # Background work stops early so the tail of the day's quota stays available for people waiting on a reply.
+        return int(self._limit * (1 - self._interactive_reserve))
+
+    async def consume(self, priority: Priority) -> None:
+        day = datetime.now(timezone.utc).date()
+        if not await self._consume(self._provider, day, self.limit_for(priority)):
+            raise RateLimitExceeded("AML provider daily quota is exhausted", retry_after_s=seconds_until_utc_midnight())
@@ -0,0 +1,64 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import get_settings
+from app.db.session import get_sessionmaker
+from app.db.models import RequestNoCounter
+
+ReserveBlock = Callable[[str, int], Awaitable[int]]
+
+
+def build_request_no(sequence: int, now: datetime | None = None) -> str:
+    now = now or datetime.utcnow()
+    return f"PAY-{now:%Y%m}-{sequence:06d}"
+
+
+async def reserve_block(period: str, size: int) -> int:
+    stmt = pg_insert(RequestNoCounter).values(period=period, next_value=1 + size)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RequestNoCounter.period],
+        set_={"next_value": RequestNoCounter.next_value + size},
+    ).returning(RequestNoCounter.next_value)
+    # Own short transaction: a block must stay reserved even if the request that triggered it rolls back,
+    # otherwise another worker could be handed the numbers this worker still holds in memory.
+    async with get_sessionmaker()() as session:
+        end = (await session.execute(stmt)).scalar_one()
+        await session.commit()
+    return end
+
+
+class RequestNumberAllocator:
+    # Hi/lo allocation: one counter-row UPDATE reserves `block_size` numbers for this worker, and the next
+    # `block_size` creates are served from memory. Numbers never repeat; across workers they are increasing
+    # per block rather than strictly in creation order, and numbers left in a block at shutdown are skipped.
+    def __init__(self, block_size: int, reserve: ReserveBlock = reserve_block) -> None:
+        self._block_size = block_size
+        self._reserve = reserve
+        self._blocks: dict[str, tuple[int, int]] = {}
+        self._lock = asyncio.Lock()
+
+    async def next(self, now: datetime | None = None) -> str:
+        now = now or datetime.utcnow()
+        period = f"{now:%Y%m}"
+        async with self._lock:
+            value, end = self._blocks.get(period, (0, 0))
+            if value >= end:
+                end = await self._reserve(period, self._block_size)
+                value = end - self._block_size
+                # Blocks of past months are never needed again.
+                self._blocks = {}
+            self._blocks[period] = (value + 1, end)
+        return build_request_no(value, now)
+
+
+_allocator: RequestNumberAllocator | None = None
+
+
+async def next_request_no() -> str:
+    global _allocator
+    if _allocator is None:
+        _allocator = RequestNumberAllocator(get_settings().request_no_block_size)
+    return await _allocator.next()
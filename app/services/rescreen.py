@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import AuditLog, PaymentRequest, RequestStatus, RiskLevel, WalletCheck
+from app.services.aml_provider import AmlProvider
+from app.services.rate_limit import Priority, use_priority
+from app.services.wallet_checks import CheckResult, save_wallet_check, screen_address
+
+logger = logging.getLogger(__name__)
+
+RESCREEN_STATUSES = (RequestStatus.pending, RequestStatus.approved)
+RISK_RANK = {RiskLevel.low: 0, RiskLevel.medium: 1, RiskLevel.high: 2}
+
+
+@dataclass
+class RescreenResult:
+    requests: int = 0
+    addresses: int = 0
+    checked: int = 0
+    failed: int = 0
+    escalated: int = 0
+
+
+def build_stale_query(stale_before: datetime, limit: int):
+    return (
+        select(PaymentRequest, WalletCheck)
+        .join(WalletCheck, WalletCheck.id == PaymentRequest.aml_check_id)
+        .where(PaymentRequest.status.in_(RESCREEN_STATUSES), WalletCheck.checked_at < stale_before)
+        .order_by(WalletCheck.checked_at, PaymentRequest.id)
+        .limit(limit)
+    )
+
+
+async def _link_check(
+    db: AsyncSession, targets: list[tuple[PaymentRequest, WalletCheck]], provider_name: str, result: CheckResult
+) -> int:
+    address, network = targets[0][0].address, targets[0][0].network
+    # The vendor call can take a while: lock the rows and keep only those still in flight, so a request paid or
+    # rejected in the meantime is neither relinked nor escalated.
+    locked = (
+        select(PaymentRequest.id)
+        .where(PaymentRequest.id.in_([request.id for request, _ in targets]), PaymentRequest.status.in_(RESCREEN_STATUSES))
+        .order_by(PaymentRequest.id)
+        .with_for_update()
+    )
+    live_ids = set((await db.execute(locked)).scalars().all())
+    check = await save_wallet_check(db, address, network, provider_name, result, checked_by=None)
+    escalated = 0
+    now = datetime.now(timezone.utc)
+    for request, old_check in targets:
+        if request.id not in live_ids:
+            continue
+        request.aml_check_id = check.id
+        if RISK_RANK[check.risk_level] <= RISK_RANK[old_check.risk_level]:
+            continue
+        request.risk_escalated_at = now
+        escalated += 1
+        db.add(
+            AuditLog(
+                actor_id=None,
+                action="request_risk_escalated",
+                entity_type="payment_request",
+                entity_id=str(request.id),
+                payload_json={
+                    "old_check_id": str(old_check.id),
+                    "new_check_id": str(check.id),
+                    "old_risk_level": old_check.risk_level.value,
+                    "new_risk_level": check.risk_level.value,
+                },
+            )
+        )
+    # Commit per address so each fresh check is linked as soon as it arrives, not when the whole batch is done.
+    await db.commit()
+    return escalated
+
+
+async def rescreen_stale(
+    db: AsyncSession,
+    provider: AmlProvider,
+    max_age: timedelta,
+    limit: int,
+    concurrency: int,
+) -> RescreenResult:
+    stale_before = datetime.now(timezone.utc) - max_age
+    rows = (await db.execute(build_stale_query(stale_before, limit))).all()
+    groups: dict[tuple[str, str], list[tuple[PaymentRequest, WalletCheck]]] = {}
+    for request, check in rows:
+        groups.setdefault((request.address, request.network), []).append((request, check))
+
+    result = RescreenResult(requests=len(rows), addresses=len(groups))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(key: tuple[str, str]):
+        async with semaphore:
+            try:
+                return key, await screen_address(key[0], key[1], provider)
+            except Exception as exc:
+                logger.warning("Re-screening %s on %s failed: %s", key[0], key[1], exc)
+                return key, None
+
+    # Vendor calls run concurrently at rescreen priority, behind interactive and batch checks;
+    # DB writes stay in this loop because the session is not safe for concurrent use.
+    with use_priority(Priority.rescreen):
+        tasks = [asyncio.create_task(run_one(key)) for key in groups]
+        for done in asyncio.as_completed(tasks):
+            key, screened = await done
+            if screened is None:
+                result.failed += 1
+                continue
+            provider_name, check_result = screened
+            result.escalated += await _link_check(db, groups[key], provider_name, check_result)
+            result.checked += 1
+    return result
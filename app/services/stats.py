@@ -0,0 +1,127 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import Date, cast, delete, func, insert, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import (
+    AmlRiskStatsDaily,
+    PaymentRequest,
+    PaymentRequestArchive,
+    RequestStatsDaily,
+    RequestStatus,
+    RiskLevel,
+    WalletCheck,
+)
+
+
+def _utc_day(value: datetime | None) -> date:
+    if value is None:
+        return datetime.utcnow().date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+async def bump_request_stats(
+    db: AsyncSession,
+    request: PaymentRequest,
+    old_status: RequestStatus | None,
+    new_status: RequestStatus,
+) -> None:
+    day = _utc_day(request.created_at)
+    amount = Decimal(request.amount)
+    rows = [{"day": day, "status": new_status, "creator_id": request.creator_id, "request_count": 1, "total_amount": amount}]
+    if old_status is not None:
+        rows.append({"day": day, "status": old_status, "creator_id": request.creator_id, "request_count": -1, "total_amount": -amount})
+    # Touch rollup rows in a fixed order so concurrent transitions cannot deadlock on them.
+    rows.sort(key=lambda row: row["status"].value)
+    await _apply_request_stats(db, rows)
+
+
+async def bump_imported_stats(db: AsyncSession, creator_id: int, count: int, total_amount: Decimal) -> None:
+    # A whole import chunk lands in one rollup row: same day, creator and draft status.
+    row = {"day": _utc_day(None), "status": RequestStatus.draft, "creator_id": creator_id, "request_count": count, "total_amount": total_amount}
+    await _apply_request_stats(db, [row])
+
+
+async def bump_transition_stats(
+    db: AsyncSession, requests: list, old_status: RequestStatus, new_status: RequestStatus
+) -> None:
+    # Many requests moving between the same two statuses, folded into one row per (day, creator, status).
+    totals: dict[tuple[date, RequestStatus, int], list] = {}
+    for request in requests:
+        day, amount = _utc_day(request.created_at), Decimal(request.amount)
+        for status, sign in ((new_status, 1), (old_status, -1)):
+            bucket = totals.setdefault((day, status, request.creator_id), [0, Decimal(0)])
+            bucket[0] += sign
+            bucket[1] += sign * amount
+    if not totals:
+        return
+    rows = [
+        {"day": day, "status": status, "creator_id": creator_id, "request_count": count, "total_amount": total}
+        for (day, status, creator_id), (count, total) in sorted(totals.items(), key=lambda item: (item[0][0], item[0][1].value, item[0][2]))
+    ]
+    await _apply_request_stats(db, rows)
+
+
+async def _apply_request_stats(db: AsyncSession, rows: list[dict]) -> None:
+    stmt = pg_insert(RequestStatsDaily).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RequestStatsDaily.day, RequestStatsDaily.status, RequestStatsDaily.creator_id],
+        set_={
+            "request_count": RequestStatsDaily.request_count + stmt.excluded.request_count,
+            "total_amount": RequestStatsDaily.total_amount + stmt.excluded.total_amount,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def bump_risk_stats(db: AsyncSession, risk_level: RiskLevel, checked_at: datetime | None = None) -> None:
+    stmt = pg_insert(AmlRiskStatsDaily).values(day=_utc_day(checked_at), risk_level=risk_level, check_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AmlRiskStatsDaily.day, AmlRiskStatsDaily.risk_level],
+        set_={"check_count": AmlRiskStatsDaily.check_count + stmt.excluded.check_count},
+    )
+    await db.execute(stmt)
+
+
+async def reconcile_stats(db: AsyncSession, since: date) -> None:
+    # Blocks incremental bumps for the duration of the rebuild so the recomputed buckets are exact.
+    await db.execute(text("LOCK TABLE request_stats_daily, aml_risk_stats_daily IN SHARE ROW EXCLUSIVE MODE"))
+
+    # Archived requests still count towards their creation day, so the rebuild reads both tables;
+    # Postgres pushes the day filter below into each branch of the UNION ALL.
+    requests = union_all(
+        *(
+            select(
+                cast(func.timezone("UTC", model.created_at), Date).label("day"),
+                model.status.label("status"),
+                model.creator_id.label("creator_id"),
+                model.amount.label("amount"),
+            )
+            for model in (PaymentRequest, PaymentRequestArchive)
+        )
+    ).subquery()
+    await db.execute(delete(RequestStatsDaily).where(RequestStatsDaily.day >= since))
+    await db.execute(
+        insert(RequestStatsDaily).from_select(
+            ["day", "status", "creator_id", "request_count", "total_amount"],
+            select(requests.c.day, requests.c.status, requests.c.creator_id, func.count(), func.sum(requests.c.amount))
+            .where(requests.c.day >= since)
+            .group_by(requests.c.day, requests.c.status, requests.c.creator_id),
+        )
+    )
+
+    check_day = cast(func.timezone("UTC", WalletCheck.checked_at), Date)
+    await db.execute(delete(AmlRiskStatsDaily).where(AmlRiskStatsDaily.day >= since))
+    await db.execute(
+        insert(AmlRiskStatsDaily).from_select(
+            ["day", "risk_level", "check_count"],
+            select(check_day, WalletCheck.risk_level, func.count())
+            .where(check_day >= since)
+            .group_by(check_day, WalletCheck.risk_level),
+        )
+    )
+    await db.commit()
@@ -0,0 +1,34 @@
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import AuditLog, RequestStatus, StatusHistory
+
+
+async def insert_status_logs(
+    db: AsyncSession,
+    request_ids: list[uuid.UUID],
+    old_status: RequestStatus | None,
+    new_status: RequestStatus,
+    actor_id: int | None,
+    reason: str | None,
+) -> None:
+    # Set-based counterpart of routes_requests.log_status: the same history and audit rows, one INSERT per table.
+    payload = {"old_status": old_status.value if old_status else None, "new_status": new_status.value, "reason": reason}
+    history = [
+        {"request_id": request_id, "old_status": old_status, "new_status": new_status, "actor_id": actor_id, "reason": reason}
+        for request_id in request_ids
+    ]
+    audit = [
+        {
+            "actor_id": actor_id,
+            "action": "request_status_changed",
+            "entity_type": "payment_request",
+            "entity_id": str(request_id),
+            "payload_json": payload,
+        }
+        for request_id in request_ids
+    ]
+    await db.execute(insert(StatusHistory).values(history))
+    await db.execute(insert(AuditLog).values(audit))
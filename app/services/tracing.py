@@ -0,0 +1,361 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+SERVICE_NAME = "tronsecure-api"
+TRACEPARENT_HEADER = b"traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+# OTLP span kinds: 1 internal, 2 server, 3 client.
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    force_sample: bool = False
+    spans: list["Span"] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    trace: Trace
+    name: str
+    span_id: str
+    parent_id: str | None
+    kind: int = KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict:
+        item = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            item["parentSpanId"] = self.parent_id
+        return item
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_current: ContextVar[Span | None] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    match = _TRACEPARENT.match(value or "")
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+
+
+def start_span(name: str, kind: int = KIND_INTERNAL, parent: Span | None = None, **attributes) -> Span | None:
+    parent = parent or _current.get()
+    if parent is None:
+        # Outside a traced request (scripts, warm-up) spans are not recorded at all.
+        return None
+    return Span(parent.trace, name, secrets.token_hex(8), parent.span_id, kind, attributes=attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes) -> Iterator[Span | None]:
+    current = start_span(name, kind, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+class SpanExporter:
+    # Spans are buffered in memory and written as one OTLP/JSON ExportTraceServiceRequest per line, the format the
+    # OpenTelemetry collector's file exporter writes and its otlpjsonfile receiver reads back.
+    def __init__(self, path: str, batch_size: int, max_bytes: int, backups: int, max_buffer: int = 10_000) -> None:
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: list[Span] = []
+        self._lock = threading.Lock()
+        self._flushing = False
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def add(self, spans: list[Span]) -> None:
+        with self._lock:
+            if len(self._buffer) + len(spans) > self.max_buffer:
+                # Never let a stuck disk grow memory without bound; tracing is best effort.
+                self.dropped += len(spans)
+                return
+            self._buffer.extend(spans)
+            full = len(self._buffer) >= self.batch_size and not self._flushing
+            if full:
+                self._flushing = True
+        if full:
+            asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def flush(self) -> int:
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        try:
+            if spans:
+                record = logging.LogRecord(__name__, logging.INFO, __file__, 0, json.dumps(export_payload(spans)), None, None)
+                self._handler.handle(record)
+            return len(spans)
+        finally:
+            with self._lock:
+                self._flushing = False
+
+    def close(self) -> None:
+        self.flush()
+        self._handler.close()
+
+
+def export_payload(spans: list[Span]) -> dict:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [item.to_otlp() for item in spans]}],
+            }
+        ]
+    }
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter, sample_rate: float, slow_ms: float) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    def start_request(self, name: str, traceparent: str | None, **attributes) -> Span:
+        parsed = parse_traceparent(traceparent)
+        trace_id, parent_id, sampled = parsed if parsed else (secrets.token_hex(16), None, False)
+        trace = Trace(trace_id, force_sample=sampled)
+        return Span(trace, name, secrets.token_hex(8), parent_id, KIND_SERVER, attributes=attributes)
+
+    def should_export(self, root: Span) -> bool:
+        # Decided when the request ends, so every slow request is kept whatever the sampling rate.
+        return root.trace.force_sample or root.duration_ms >= self.slow_ms or random.random() < self.sample_rate
+
+    def finish_request(self, root: Span) -> None:
+        root.end()
+        if self.should_export(root):
+            self.exporter.add(root.trace.spans)
+
+    async def run_flusher(self, interval_s: float) -> None:
+        while True:
+            await asyncio.sleep(interval_s)
+            await asyncio.to_thread(self.exporter.flush)
+
+
+_tracer: Tracer | None = None
+
+
+def get_tracer() -> Tracer | None:
+    global _tracer
+    settings = get_settings()
+    if not settings.trace_export_path:
+        return None
+    if _tracer is None:
+        exporter = SpanExporter(
+            settings.trace_export_path,
+            settings.trace_export_batch_size,
+            settings.trace_export_max_bytes,
+            settings.trace_export_backups,
+        )
+        _tracer = Tracer(exporter, settings.trace_sample_rate, settings.trace_slow_ms)
+    return _tracer
+
+
+def close_tracer() -> None:
+    global _tracer
+    if _tracer is not None:
+        _tracer.exporter.close()
+    _tracer = None
+
+
+class TracingMiddleware:
+    def __init__(self, app, tracer: Tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        traceparent = headers.get(TRACEPARENT_HEADER, b"").decode("latin-1") or None
+        root = self.tracer.start_request(
+            f"{scope['method']} {scope['path']}", traceparent, **{"http.method": scope["method"], "http.target": scope["path"]}
+        )
+        token = _current.set(root)
+
+        async def send_with_status(message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    root.error = f"HTTP {message['status']}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException as exc:
+            root.error = type(exc).__name__
+            raise
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                # Name by template so /requests/{request_id}/approve groups across ids.
+                root.name = f"{scope['method']} {route.path}"
+            self.tracer.finish_request(root)
+
+
+def instrument_engine_tracing(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+    # Session hooks are class-wide, so a re-created engine must not register them a second time.
+    if not event.contains(Session, "before_commit", _before_commit):
+        event.listen(Session, "do_orm_execute", _before_orm_execute)
+        event.listen(Session, "before_flush", _before_flush)
+        event.listen(Session, "after_begin", _after_begin)
+        event.listen(Session, "after_transaction_end", _after_transaction_end)
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_soft_rollback", _after_rollback)
+
+
+def _sql_operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+
+
+# The event hooks run inside SQLAlchemy's greenlet, which shares the request task's context, so current_span()
+# still points at the request or dependency span that issued the statement.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    child = start_span(f"db {_sql_operation(statement)}", KIND_CLIENT, **{"db.system": "postgresql", "db.statement": statement[:2000]})
+    conn.info.setdefault("trace_spans", []).append(child)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    spans = conn.info.get("trace_spans")
+    child = spans.pop() if spans else None
+    if child is not None:
+        child.attributes["db.rowcount"] = cursor.rowcount
+        child.end()
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    child = spans.pop() if spans else None
+    if child is not None:
+        child.error = type(exception_context.original_exception).__name__
+        child.end()
+
+
+# A session only checks a connection out of the pool for its first statement or flush. "db CHECKOUT" runs from
+# there until the transaction has begun on the connection, so pool waits show up on their own instead of inside
+# the first query, and handlers that never touch the database never take a connection.
+def _start_checkout(session) -> None:
+    if "trace_checkout" in session.info or session.info.get("trace_connected"):
+        return
+    child = start_span("db CHECKOUT", KIND_CLIENT)
+    if child is not None:
+        session.info["trace_checkout"] = child
+
+
+def _before_orm_execute(orm_execute_state) -> None:
+    _start_checkout(orm_execute_state.session)
+
+
+def _before_flush(session, flush_context, instances) -> None:
+    _start_checkout(session)
+
+
+def _after_begin(session, transaction, connection) -> None:
+    session.info["trace_connected"] = True
+    child = session.info.pop("trace_checkout", None)
+    if child is not None:
+        child.end()
+
+
+def _after_transaction_end(session, transaction) -> None:
+    if transaction.parent is not None:
+        return
+    # Commit and rollback hand the connection back, so the next statement checks one out again.
+    session.info.pop("trace_connected", None)
+    child = session.info.pop("trace_checkout", None)
+    if child is not None:
+        child.error = "no connection"
+        child.end()
+
+
+def _before_commit(session) -> None:
+    session.info["trace_commit"] = start_span("db COMMIT", KIND_CLIENT)
+
+
+def _after_commit(session) -> None:
+    child = session.info.pop("trace_commit", None)
+    if child is not None:
+        child.end()
+
+
+def _after_rollback(session, previous_transaction) -> None:
+    child = session.info.pop("trace_commit", None)
+    if child is not None:
+        child.error = "rollback"
+        child.end()
@@ -0,0 +1,114 @@
+import hashlib
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+
+_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_ALPHABET_INDEX = {ch: i for i, ch in enumerate(_ALPHABET)}
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+TX_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+TRON_ADDRESS_PREFIX = 0x41
+_PAYLOAD_SIZE = 21  # prefix byte + 20-byte account id
+_CHECKSUM_SIZE = 4
+
+
+class InvalidTronAddress(ValueError):
+    pass
+
+
+def _checksum(payload: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:_CHECKSUM_SIZE]
+
+
+def _b58encode(data: bytes) -> str:
+    num = int.from_bytes(data, "big")
+    out = []
+    while num:
+        num, rem = divmod(num, 58)
+        out.append(_ALPHABET[rem])
+    pad = len(data) - len(data.lstrip(b"\0"))
+    return "1" * pad + "".join(reversed(out))
+
+
+def _b58decode(value: str) -> bytes:
+    num = 0
+    for ch in value:
+        digit = _ALPHABET_INDEX.get(ch)
+        if digit is None:
+            raise InvalidTronAddress(f"Invalid base58 character {ch!r}")
+        num = num * 58 + digit
+    size = _PAYLOAD_SIZE + _CHECKSUM_SIZE
+    if num >> (size * 8):
+        raise InvalidTronAddress("Address is too long")
+    return num.to_bytes(size, "big")
+
+
+def _payload_from_base58(value: str) -> bytes:
+    if len(value) != 34:
+        raise InvalidTronAddress("Base58 TRON address must be 34 characters")
+    raw = _b58decode(value)
+    payload, checksum = raw[:_PAYLOAD_SIZE], raw[_PAYLOAD_SIZE:]
+    if _checksum(payload) != checksum:
+        raise InvalidTronAddress("Address checksum mismatch")
+    return payload
+
+
+def _payload_from_hex(value: str) -> bytes:
+    digits = value[2:] if value[:2] in ("0x", "0X") else value
+    if not digits or not set(digits) <= _HEX_DIGITS:
+        raise InvalidTronAddress("Address is neither base58 nor hex")
+    if len(digits) == 40:
+        return bytes([TRON_ADDRESS_PREFIX]) + bytes.fromhex(digits)
+    if len(digits) == 42:
+        return bytes.fromhex(digits)
+    raise InvalidTronAddress("Hex TRON address must be 40 or 42 hex digits")
+
+
+@lru_cache(maxsize=65536)
+def normalize_tron_address(value: str) -> str:
+    raw = value.strip()
+    if raw.startswith("T") and len(raw) == 34:
+        payload = _payload_from_base58(raw)
+        if payload[0] == TRON_ADDRESS_PREFIX:
+            # Base58 is canonical already: a valid checksum means re-encoding would return the same string.
+            return raw
+    else:
+        payload = _payload_from_hex(raw)
+    if payload[0] != TRON_ADDRESS_PREFIX:
+        raise InvalidTronAddress("Address does not carry the TRON 0x41 prefix")
+    return _b58encode(payload + _checksum(payload))
+
+
+def tron_address_to_hex(value: str) -> str:
+    return _payload_from_base58(normalize_tron_address(value)).hex()
+
+
+def normalize_tron_addresses(values: Iterable[str]) -> tuple[list[str | None], dict[int, str]]:
+    # Canonical addresses in input order (None where invalid) plus the error per invalid index.
+    # Each distinct input is decoded once, so repeated rows in an import cost a dict lookup.
+    decoded: dict[str, str | InvalidTronAddress] = {}
+    normalized: list[str | None] = []
+    errors: dict[int, str] = {}
+    for i, value in enumerate(values):
+        result = decoded.get(value)
+        if result is None:
+            try:
+                result = normalize_tron_address(value)
+            except InvalidTronAddress as exc:
+                result = exc
+            decoded[value] = result
+        if isinstance(result, InvalidTronAddress):
+            normalized.append(None)
+            errors[i] = str(result)
+        else:
+            normalized.append(result)
+    return normalized, errors
+
+
+def normalize_tx_hash(value: str) -> str:
+    # Lowercase without 0x, so the same transaction always hits the unique index the same way.
+    digits = value.strip().lower().removeprefix("0x")
+    if not TX_HASH_PATTERN.match(digits):
+        raise ValueError("expected 64 hex characters")
+    return digits
@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Protocol
+
+from app.config import get_settings
+from app.services.aml_provider import parse_retry_after
+from app.services.tron_address import InvalidTronAddress, normalize_tron_address
+
+# keccak256("Transfer(address,address,uint256)"), the first topic of every TRC20 transfer event.
+TRANSFER_TOPIC = "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+USDT_DECIMALS = 6
+
+
+class TronNodeThrottled(Exception):
+    def __init__(self, retry_after_s: float) -> None:
+        super().__init__(f"TRON node asked to retry after {retry_after_s:.1f}s")
+        self.retry_after_s = retry_after_s
+
+
+@dataclass(frozen=True)
+class TokenTransfer:
+    contract: str
+    to_address: str
+    amount: Decimal
+
+
+@dataclass(frozen=True)
+class TronTransaction:
+    tx_hash: str
+    success: bool
+    block_number: int
+    transfers: tuple[TokenTransfer, ...] = ()
+
+
+def parse_transaction_info(tx_hash: str, data: dict, decimals: int = USDT_DECIMALS) -> TronTransaction | None:
+    # The node answers {} for a transaction it does not know (yet).
+    if not data or "blockNumber" not in data:
+        return None
+    transfers = []
+    for log in data.get("log") or []:
+        topics = log.get("topics") or []
+        if len(topics) != 3 or topics[0] != TRANSFER_TOPIC:
+            continue
+        try:
+            contract = normalize_tron_address(str(log["address"])[-40:])
+            to_address = normalize_tron_address(topics[2][-40:])
+            amount = Decimal(int(log.get("data") or "0", 16)).scaleb(-decimals)
+        except (KeyError, ValueError, InvalidTronAddress):
+            continue
+        transfers.append(TokenTransfer(contract, to_address, amount))
+    success = (data.get("receipt") or {}).get("result") == "SUCCESS"
+    return TronTransaction(tx_hash, success, int(data["blockNumber"]), tuple(transfers))
+
+
+class TronNodeClient(Protocol):
+    # Only an authoritative client's "unknown transaction" may become a terminal not_found verdict.
+    authoritative: bool
+
+    async def get_transaction(self, tx_hash: str) -> TronTransaction | None:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class StubTronNodeClient:
+    # Stands in for the node in tests and local runs: knows only what was registered with add(). It is not
+    # authoritative unless a test says so, because it knows no real transactions.
+    def __init__(self, authoritative: bool = False) -> None:
+        self.authoritative = authoritative
+        self.transactions: dict[str, TronTransaction] = {}
+        self.lookups: list[str] = []
+
+    def add(self, transaction: TronTransaction) -> None:
+        self.transactions[transaction.tx_hash] = transaction
+
+    async def get_transaction(self, tx_hash: str) -> TronTransaction | None:
+        self.lookups.append(tx_hash)
+        return self.transactions.get(tx_hash)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class HttpTronNodeClient:
+    authoritative = True
+
+    def __init__(self, base_url: str, api_key: str, timeout_s: float, info_path: str) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._api_key = api_key
+        self._timeout = timeout_s
+        self._info_path = info_path
+        self._client: "httpx.AsyncClient | None" = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+
+            headers = {"TRON-PRO-API-KEY": self._api_key} if self._api_key else {}
+            self._client = httpx.AsyncClient(base_url=self._base_url, timeout=self._timeout, headers=headers)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_transaction(self, tx_hash: str) -> TronTransaction | None:
+        response = await self._get_client().post(self._info_path, json={"value": tx_hash})
+        if response.status_code == 429:
+            raise TronNodeThrottled(parse_retry_after(response.headers.get("Retry-After")))
+        response.raise_for_status()
+        return parse_transaction_info(tx_hash, response.json())
+
+
+def build_tron_node_client() -> TronNodeClient:
+    settings = get_settings()
+    if settings.tron_node_provider.lower().strip() == "http":
+        return HttpTronNodeClient(
+            base_url=settings.tron_node_url,
+            api_key=settings.tron_node_api_key,
+            timeout_s=settings.tron_node_timeout_s,
+            info_path=settings.tron_node_info_path,
+        )
+    return StubTronNodeClient()
+
+
+_client: TronNodeClient | None = None
+
+
+def get_tron_node_client() -> TronNodeClient:
+    global _client
+    if _client is None:
+        _client = build_tron_node_client()
+    return _client
+
+
+async def close_tron_node_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Enum, column, func, insert, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.models import AuditLog, PaymentRequest, RequestStatus, TxConfirmation
+from app.services.rate_limit import Priority, PriorityLimiter, RateLimitExceeded, TokenBucket
+from app.services.tron_node import TronNodeClient, TronNodeThrottled, TronTransaction
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_QUEUE_TIMEOUT_S = 300.0
+
+
+@dataclass
+class ConfirmationResult:
+    checked: int = 0
+    confirmed: int = 0
+    mismatched: int = 0
+    failed: int = 0
+    not_found: int = 0
+    pending: int = 0
+    errors: int = 0
+    cached: int = 0
+
+
+class SolidifiedCache:
+    # Transactions the node returned from its solidified view are final, so they never need a second lookup:
+    # a batch whose write failed, or a worker restarted on the same rows, is answered from memory.
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max(1, max_size)
+        self._items: OrderedDict[str, TronTransaction] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, tx_hash: str) -> TronTransaction | None:
+        transaction = self._items.get(tx_hash)
+        if transaction is not None:
+            self._items.move_to_end(tx_hash)
+        return transaction
+
+    def add(self, transaction: TronTransaction) -> None:
+        self._items[transaction.tx_hash] = transaction
+        self._items.move_to_end(transaction.tx_hash)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+
+def build_node_limiter() -> PriorityLimiter:
+    settings = get_settings()
+    return PriorityLimiter(TokenBucket(settings.tron_node_rate_limit_per_s, settings.tron_node_rate_limit_burst))
+
+
+def build_unconfirmed_query(recheck_before: datetime, limit: int):
+    # Served by the partial index from migration 0012; rows looked up recently wait for the next round.
+    return (
+        select(PaymentRequest.id, PaymentRequest.address, PaymentRequest.amount, PaymentRequest.tx_hash, PaymentRequest.paid_at)
+        .where(
+            PaymentRequest.status == RequestStatus.paid,
+            PaymentRequest.tx_confirmation.is_(None),
+            PaymentRequest.tx_hash.is_not(None),
+            or_(PaymentRequest.tx_checked_at.is_(None), PaymentRequest.tx_checked_at < recheck_before),
+        )
+        .order_by(PaymentRequest.tx_checked_at.asc().nulls_first(), PaymentRequest.paid_at)
+        .limit(limit)
+    )
+
+
+def verify_transaction(row, transaction: TronTransaction, usdt_contract: str) -> TxConfirmation:
+    if not transaction.success:
+        return TxConfirmation.failed
+    amount = Decimal(row.amount)
+    for transfer in transaction.transfers:
+        if transfer.contract == usdt_contract and transfer.to_address == row.address and transfer.amount == amount:
+            return TxConfirmation.confirmed
+    return TxConfirmation.mismatch
+
+
+def build_confirmation_update(outcomes: list[tuple[uuid.UUID, TxConfirmation | None, int | None]]):
+    checked = values(
+        column("id", UUID(as_uuid=True)),
+        column("confirmation", Enum(TxConfirmation, name="tx_confirmation_status")),
+        column("block_number", BigInteger),
+        name="checked",
+    ).data(outcomes)
+    # A NULL confirmation only moves tx_checked_at, which sends the row to the back of the queue until the next recheck.
+    return (
+        update(PaymentRequest)
+        .where(
+            PaymentRequest.id == checked.c.id,
+            PaymentRequest.status == RequestStatus.paid,
+            PaymentRequest.tx_confirmation.is_(None),
+        )
+        .values(tx_confirmation=checked.c.confirmation, tx_block_number=checked.c.block_number, tx_checked_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def confirm_paid_requests(
+    db: AsyncSession,
+    client: TronNodeClient,
+    limiter: PriorityLimiter,
+    cache: SolidifiedCache,
+    limit: int,
+    concurrency: int,
+    recheck_after: timedelta,
+    not_found_after: timedelta,
+    usdt_contract: str,
+) -> ConfirmationResult:
+    now = datetime.now(timezone.utc)
+    rows = (await db.execute(build_unconfirmed_query(now - recheck_after, limit))).all()
+    result = ConfirmationResult(checked=len(rows))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def lookup(row):
+        transaction = cache.get(row.tx_hash)
+        if transaction is not None:
+            result.cached += 1
+            return row, transaction
+        async with semaphore:
+            try:
+                await limiter.acquire(Priority.batch, LOOKUP_QUEUE_TIMEOUT_S)
+                transaction = await client.get_transaction(row.tx_hash)
+            except TronNodeThrottled as exc:
+                limiter.pause(exc.retry_after_s)
+                return row, exc
+            except RateLimitExceeded as exc:
+                return row, exc
+            except Exception as exc:
+                logger.warning("TRON node lookup of %s failed: %s", row.tx_hash, exc)
+                return row, exc
+        if transaction is not None:
+            cache.add(transaction)
+        return row, transaction
+
+    outcomes: list[tuple[uuid.UUID, TxConfirmation | None, int | None]] = []
+    flagged: list[dict] = []
+    for row, transaction in await asyncio.gather(*(lookup(row) for row in rows)):
+        if isinstance(transaction, (TronNodeThrottled, RateLimitExceeded)):
+            # Our own back-pressure, not a problem with the transaction: leave the row where it is in the queue.
+            result.errors += 1
+            continue
+        if isinstance(transaction, Exception):
+            result.errors += 1
+            outcomes.append((row.id, None, None))
+            continue
+        if transaction is None:
+            if client.authoritative and row.paid_at is not None and row.paid_at < now - not_found_after:
+                outcome, block_number = TxConfirmation.not_found, None
+            else:
+                result.pending += 1
+                outcomes.append((row.id, None, None))
+                continue
+        else:
+            outcome, block_number = verify_transaction(row, transaction, usdt_contract), transaction.block_number
+        outcomes.append((row.id, outcome, block_number))
+        if outcome == TxConfirmation.confirmed:
+            result.confirmed += 1
+            continue
+        if outcome == TxConfirmation.mismatch:
+            result.mismatched += 1
+        elif outcome == TxConfirmation.failed:
+            result.failed += 1
+        else:
+            result.not_found += 1
+        flagged.append(
+            {
+                "actor_id": None,
+                "action": f"request_tx_{outcome.value}",
+                "entity_type": "payment_request",
+                "entity_id": str(row.id),
+                "payload_json": {"tx_hash": row.tx_hash, "block_number": block_number},
+            }
+        )
+
+    # One UPDATE ... FROM (VALUES ...) for the whole batch; mark_paid never waits on any of this.
+    if outcomes:
+        await db.execute(build_confirmation_update(outcomes))
+    if flagged:
+        await db.execute(insert(AuditLog).values(flagged))
+    await db.commit()
+    return result
@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas import RiskCategory
+from app.config import get_settings
+from app.db.models import RiskLevel, WalletCheck, WalletRiskLatest
+from app.services.address_lists import get_address_screen
+from app.services.aml_provider import AmlProvider
+from app.services.stats import bump_risk_stats
+
+CheckResult = tuple[float, RiskLevel, list[RiskCategory], dict]
+
+
+async def screen_address(address: str, network: str, provider: AmlProvider) -> tuple[str, CheckResult]:
+    screened = get_address_screen().check(address, network)
+    if screened is not None:
+        return screened
+    return provider.provider_name, await provider.check(address, network)
+
+
+async def save_wallet_check(
+    db: AsyncSession, address: str, network: str, provider_name: str, result: CheckResult, checked_by: int | None
+) -> WalletCheck:
+    risk_score, risk_level, categories, raw_report = result
+    # Id assigned here so callers can link requests to the check before it is flushed.
+    check = WalletCheck(
+        id=uuid.uuid4(),
+        address=address,
+        network=network,
+        provider=provider_name,
+        risk_score=risk_score,
+        risk_level=risk_level,
+        categories_json=[c.model_dump() for c in categories],
+        raw_report_json=raw_report,
+        checked_by=checked_by,
+    )
+    db.add(check)
+    # The latest row references the check, so it has to be written first.
+    await db.flush()
+    await db.execute(build_latest_upsert(check))
+    await bump_risk_stats(db, risk_level)
+    return check
+
+
+def build_latest_upsert(check: WalletCheck):
+    # now() is the transaction start, the same value the check row got as its checked_at default.
+    values = dict(
+        address=check.address,
+        network=check.network,
+        check_id=check.id,
+        provider=check.provider,
+        risk_score=check.risk_score,
+        risk_level=check.risk_level,
+        checked_at=func.now(),
+    )
+    stmt = pg_insert(WalletRiskLatest).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[WalletRiskLatest.address, WalletRiskLatest.network],
+        set_={key: stmt.excluded[key] for key in values if key not in ("address", "network")},
+        # A slower transaction that started earlier must not overwrite a newer result.
+        where=WalletRiskLatest.checked_at <= stmt.excluded.checked_at,
+    )
+
+
+def build_latest_query(address: str, network: str):
+    return select(WalletRiskLatest).where(WalletRiskLatest.address == address, WalletRiskLatest.network == network)
+
+
+def is_stale(checked_at: datetime, now: datetime | None = None) -> bool:
+    max_age_h = get_settings().aml_check_max_age_h
+    if max_age_h <= 0:
+        return False
+    return checked_at < (now or datetime.now(timezone.utc)) - timedelta(hours=max_age_h)
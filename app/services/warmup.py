@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.aml_provider import AmlProvider
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_db(engine: AsyncEngine, connections: int) -> None:
+    # Hold all connections at once so the pool really opens `connections` of them instead of reusing one.
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(max(1, connections))))
+
+
+async def warm_up(engine: AsyncEngine | None, provider: AmlProvider, connections: int, retry_interval_s: float) -> None:
+    if engine is not None:
+        while True:
+            try:
+                await warm_up_db(engine, connections)
+                break
+            except Exception as exc:
+                logger.warning("Database warm-up failed, retrying in %.1fs: %s", retry_interval_s, exc)
+                await asyncio.sleep(retry_interval_s)
+    try:
+        await provider.warm_up()
+    except Exception as exc:
+        # A slow or unreachable vendor must not keep the API out of rotation; checks will surface the error.
+        logger.warning("AML provider warm-up failed: %s", exc)
@@ -0,0 +1,33 @@
+import json
+import os
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def load_baseline(section: str) -> dict[str, float]:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding="utf-8") as fh:
+        return json.load(fh).get(section, {})
+
+
+def write_baseline(section: str, results: dict[str, float]) -> None:
+    data = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as fh:
+            data = json.load(fh)
+    data[section] = {name: round(value, 1) for name, value in results.items()}
+    with open(BASELINE_PATH, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def format_result(name: str, value: float, unit: str, baseline: dict[str, float]) -> str:
+    line = f"{name:>26}: {value:10.1f} {unit}"
+    if name in baseline:
+        line += f"  (baseline {baseline[name]:.1f}, {value - baseline[name]:+.1f})"
+    return line
+
+
+def unit_for(name: str) -> str:
+    return {"_ns": "ns", "_us": "us", "_ms": "ms"}.get(name[-3:], "")
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from benchmarks.baseline import format_result, load_baseline, write_baseline
+
+ADDRESS = "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"
+BENCH_ENV = {
+    "AML_PROVIDER": "mock",
+    # The vendor limiter and quota would throttle a tight loop; they are measured by their own tests.
+    "AML_RATE_LIMIT_PER_S": "0",
+    "AML_DAILY_QUOTA": "0",
+    "WARMUP_ENABLED": "false",
+    "TRACE_EXPORT_PATH": "",
+}
+
+
+async def _timed(samples: dict[str, list[float]], name: str, call, expected: int):
+    started = time.perf_counter()
+    response = await call()
+    samples.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+    if response.status_code != expected:
+        raise RuntimeError(f"{name}: expected {expected}, got {response.status_code}: {response.text}")
+    return response
+
+
+async def run_async(database_url: str, iterations: int) -> dict[str, float]:
+    import httpx
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.db.models import User, UserRole
+    from app.db.session import dispose_engine, get_db, init_engine
+    from app.main import create_app
+
+    engine = init_engine(database_url)
+    app = create_app()
+    samples: dict[str, list[float]] = {}
+    async with engine.connect() as conn:
+        # Everything runs inside one outer transaction that is rolled back, so the local DB is left as it was.
+        outer = await conn.begin()
+        maker = async_sessionmaker(bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint")
+
+        async def bench_db():
+            async with maker() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = bench_db
+        telegram_id = random.randint(10**12, 10**13)
+        async with maker() as session:
+            session.add(User(telegram_id=telegram_id, full_name="bench", role=UserRole.admin))
+            await session.commit()
+        headers = {"X-Telegram-Id": str(telegram_id)}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for _ in range(iterations):
+                check = await _timed(
+                    samples, "aml_check_ms", lambda: client.post("/api/v1/aml/check", json={"address": ADDRESS, "network": "TRON"}), 200
+                )
+                payload = {"address": ADDRESS, "network": "TRON", "asset": "USDT", "amount": "10", "aml_check_id": check.json()["check_id"]}
+                created = await _timed(samples, "create_request_ms", lambda: client.post("/api/v1/requests", json=payload), 201)
+                path = f"/api/v1/requests/{created.json()['id']}"
+                detail = await _timed(samples, "get_request_ms", lambda: client.get(path), 200)
+                await _timed(samples, "get_request_expand_ms", lambda: client.get(path, params={"expand": "aml_check,history,creator"}), 200)
+                etag = detail.headers["ETag"]
+                await _timed(samples, "get_request_304_ms", lambda: client.get(path, headers={"If-None-Match": etag}), 304)
+                await _timed(samples, "submit_ms", lambda: client.post(f"{path}/submit"), 200)
+                await _timed(samples, "approve_ms", lambda: client.post(f"{path}/approve"), 200)
+        await outer.rollback()
+    await dispose_engine()
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def run(database_url: str | None = None, iterations: int = 50) -> dict[str, float]:
+    database_url = database_url or os.getenv("TEST_DATABASE_URL")
+    if not database_url:
+        return {}
+    os.environ.update(BENCH_ENV)
+    from app.config import get_settings
+
+    get_settings.cache_clear()
+    return asyncio.run(run_async(database_url, iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", help="Migrated local Postgres (defaults to TEST_DATABASE_URL)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--write-baseline", action="store_true")
+    args = parser.parse_args()
+    results = run(args.database_url, args.iterations)
+    if not results:
+        raise SystemExit("No database: pass --database-url or set TEST_DATABASE_URL")
+    baseline = load_baseline("api")
+    for name, value in results.items():
+        print(format_result(name, value, "ms", baseline))
+    if args.write_baseline:
+        write_baseline("api", results)
@@ -0,0 +1,113 @@
+import argparse
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+from app.api.routes_requests import ensure_transition
+from app.api.schemas import AmlCheckResponse, RequestCreate, RequestDetail, RiskCategory
+from app.db.models import RequestStatus, RiskLevel
+from app.services.aml_provider import parse_provider_report
+from app.services.request_numbers import build_request_no
+from benchmarks.baseline import format_result, load_baseline, write_baseline
+
+ADDRESS = "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"
+NOW = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+def _ns_per_op(fn, loops: int, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter_ns() - start) / loops)
+    # The fastest repeat is the one least disturbed by GC pauses and other processes.
+    return min(samples)
+
+
+def _rejected_transition() -> None:
+    try:
+        ensure_transition(RequestStatus.paid, RequestStatus.pending)
+    except HTTPException:
+        pass
+
+
+def sample_request_row() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        request_no="PAY-202610-000001",
+        creator_id=101,
+        address=ADDRESS,
+        network="TRON",
+        asset="USDT",
+        amount=Decimal("125.50"),
+        comment="Invoice 2026-10",
+        attachment_url=None,
+        aml_check_id=uuid.uuid4(),
+        status=RequestStatus.approved,
+        approved_by=7,
+        approved_at=NOW,
+        tx_hash=None,
+        risk_escalated_at=None,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def sample_vendor_report() -> dict:
+    return {
+        "address": ADDRESS,
+        "network": "TRON",
+        "risk_score": 41.25,
+        "risk_level": "medium",
+        "categories": [{"name": name, "score": score} for name, score in (("Sanctions", 2.5), ("Scam", 38.0), ("Mixer", 11.0))],
+    }
+
+
+def run(loops: int = 20000, repeats: int = 5) -> dict[str, float]:
+    row = sample_request_row()
+    report = sample_vendor_report()
+    create_payload = {
+        "address": ADDRESS,
+        "network": "TRON",
+        "asset": "USDT",
+        "amount": "125.50",
+        "comment": "Invoice 2026-10",
+        "aml_check_id": str(uuid.uuid4()),
+    }
+    check_response = AmlCheckResponse(
+        check_id=uuid.uuid4(),
+        risk_score=41.25,
+        risk_level=RiskLevel.medium,
+        categories=[RiskCategory(name="Scam", score=38.0)],
+        checked_at=NOW,
+    )
+    benches = {
+        "ensure_transition_ns": lambda: ensure_transition(RequestStatus.pending, RequestStatus.approved),
+        "ensure_transition_reject_ns": _rejected_transition,
+        "request_create_validate_ns": lambda: RequestCreate.model_validate(create_payload),
+        "request_detail_from_row_ns": lambda: RequestDetail.model_validate(row),
+        "request_detail_dump_json_ns": lambda: RequestDetail.model_validate(row).model_dump_json(exclude_unset=True),
+        "aml_response_dump_json_ns": check_response.model_dump_json,
+        "parse_provider_report_ns": lambda: parse_provider_report(report),
+        "build_request_no_ns": lambda: build_request_no(1234, NOW),
+    }
+    return {name: _ns_per_op(fn, loops, repeats) for name, fn in benches.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loops", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--write-baseline", action="store_true")
+    args = parser.parse_args()
+    results = run(args.loops, args.repeats)
+    baseline = load_baseline("hot_paths")
+    for name, value in results.items():
+        print(format_result(name, value, "ns/op", baseline))
+    if args.write_baseline:
+        write_baseline("hot_paths", results)
@@ -0,0 +1,96 @@
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from app.db.models import RiskLevel, UserRole
+from app.services.policy import ApprovalFacts, ApprovalPolicy
+from benchmarks.baseline import format_result, load_baseline, write_baseline
+
+ASSETS = ["USDT", "USDC", "TRX", "BTT"]
+CATEGORIES = ["General", "Scam", "Sanctions", "Gambling", "Mixer"]
+
+
+def sample_rules(count: int, rng: random.Random) -> list[dict]:
+    rules = []
+    for i in range(count):
+        rule = {"name": f"rule-{i}", "max_amount": str(rng.choice([20, 100, 500, 1000]))}
+        if rng.random() < 0.8:
+            rule["assets"] = rng.sample(ASSETS, rng.randint(1, 2))
+        rule["risk_levels"] = rng.sample([level.value for level in RiskLevel], rng.randint(1, 2))
+        if rng.random() < 0.5:
+            rule["creator_roles"] = rng.sample([role.value for role in UserRole], rng.randint(1, 3))
+        if "high" in rule["risk_levels"] or rng.random() < 0.5:
+            rule["deny_categories"] = rng.sample(CATEGORIES[1:], 2)
+        rules.append(rule)
+    return rules
+
+
+def sample_facts(count: int, rng: random.Random) -> list[ApprovalFacts]:
+    return [
+        ApprovalFacts(
+            asset=rng.choice(ASSETS),
+            amount=Decimal(rng.randint(1, 2000)),
+            risk_level=rng.choice(list(RiskLevel)),
+            risk_score=rng.uniform(0, 100),
+            categories=tuple((name, rng.uniform(0, 60)) for name in rng.sample(CATEGORIES, 2)),
+            creator_role=rng.choice(list(UserRole)),
+        )
+        for _ in range(count)
+    ]
+
+
+def linear_evaluate(rules: list[dict], facts: ApprovalFacts) -> str | None:
+    # Reference: interpret the raw rules on every call, as a naive engine would.
+    for rule in rules:
+        if "assets" in rule and facts.asset not in rule["assets"]:
+            continue
+        if facts.risk_level.value not in rule["risk_levels"]:
+            continue
+        if "creator_roles" in rule and facts.creator_role.value not in rule["creator_roles"]:
+            continue
+        if facts.amount > Decimal(rule["max_amount"]):
+            continue
+        deny = {name.lower() for name in rule.get("deny_categories", [])}
+        if any(score > 0 and name.lower() in deny for name, score in facts.categories):
+            continue
+        return rule["name"]
+    return None
+
+
+def _per_decision_ns(fn, facts: list[ApprovalFacts]) -> float:
+    start = time.perf_counter_ns()
+    for item in facts:
+        fn(item)
+    return (time.perf_counter_ns() - start) / len(facts)
+
+
+def run(rule_count: int, decisions: int) -> dict[str, float]:
+    rng = random.Random(42)
+    rules = sample_rules(rule_count, rng)
+    facts = sample_facts(decisions, rng)
+
+    start = time.perf_counter_ns()
+    policy = ApprovalPolicy(rules)
+    compile_us = (time.perf_counter_ns() - start) / 1000
+
+    assert all(policy.evaluate(item) == linear_evaluate(rules, item) for item in facts[:1000])
+    return {
+        "compile_us": compile_us,
+        "compiled_ns": _per_decision_ns(policy.evaluate, facts),
+        "linear_ns": _per_decision_ns(lambda item: linear_evaluate(rules, item), facts),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--decisions", type=int, default=20000)
+    parser.add_argument("--write-baseline", action="store_true")
+    args = parser.parse_args()
+    results = run(args.rules, args.decisions)
+    baseline = load_baseline("policy")
+    for name, value in results.items():
+        print(format_result(name, value, "us" if name.endswith("_us") else "ns/decision", baseline))
+    if args.write_baseline:
+        write_baseline("policy", results)
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.baseline import BASELINE_PATH, format_result, load_baseline, write_baseline
+
+
+def _child() -> None:
+    import asyncio
+
+    start = time.perf_counter()
+    import app.main
+
+    imported = time.perf_counter()
+    app = app.main.create_app()
+    created = time.perf_counter()
+
+    # Bench harness only; imported after the timed section so it does not count towards app import time.
+    import httpx
+
+    async def first_request() -> float:
+        started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                while (await client.get("/health")).status_code != 200:
+                    await asyncio.sleep(0.005)
+                return time.perf_counter() - started
+
+    first = asyncio.run(first_request())
+    result = {
+        "import_ms": (imported - start) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "first_request_ms": first * 1000,
+    }
+    result["time_to_first_request_ms"] = sum(result.values())
+    print(json.dumps(result))
+
+
+def run(runs: int, database_url: str | None) -> dict[str, float]:
+    env = dict(os.environ)
+    # Without a database the warm-up would retry forever, so it is only exercised against a real one.
+    env["WARMUP_ENABLED"] = "true" if database_url else "false"
+    if database_url:
+        env["DATABASE_URL"] = database_url
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {name: statistics.median(sample[name] for sample in samples) for name in samples[0]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--database-url", help="Include DB pool warm-up against this database")
+    parser.add_argument("--write-baseline", action="store_true", help=f"Store the results in {BASELINE_PATH}")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child()
+        sys.exit(0)
+
+    results = run(args.runs, args.database_url)
+    baseline = load_baseline("startup")
+    for name, value in results.items():
+        print(format_result(name, value, "ms", baseline))
+    if args.write_baseline:
+        write_baseline("startup", results)
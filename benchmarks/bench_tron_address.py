@@ -0,0 +1,46 @@
+import argparse
+import hashlib
+import time
+
+from app.services.tron_address import normalize_tron_address, normalize_tron_addresses, tron_address_to_hex
+
+
+def sample_addresses(count: int) -> list[str]:
+    addresses = []
+    for i in range(count):
+        payload = bytes([0x41]) + hashlib.sha256(i.to_bytes(8, "little")).digest()[:20]
+        addresses.append(payload.hex())
+    return [normalize_tron_address(value) for value in addresses]
+
+
+def _per_address_ns(fn, values: list[str]) -> float:
+    start = time.perf_counter_ns()
+    fn(values)
+    return (time.perf_counter_ns() - start) / len(values)
+
+
+def run(count: int) -> dict[str, float]:
+    addresses = sample_addresses(count)
+    hex_forms = [tron_address_to_hex(address) for address in addresses]
+
+    def single(values: list[str]) -> None:
+        for value in values:
+            normalize_tron_address(value)
+
+    normalize_tron_address.cache_clear()
+    results = {"base58_cold_ns": _per_address_ns(single, addresses)}
+    results["base58_cached_ns"] = _per_address_ns(single, addresses)
+    normalize_tron_address.cache_clear()
+    results["hex_cold_ns"] = _per_address_ns(single, hex_forms)
+    normalize_tron_address.cache_clear()
+    # Bulk imports repeat addresses heavily; model that with every address appearing ten times.
+    results["batch_10x_dup_ns"] = _per_address_ns(lambda values: normalize_tron_addresses(values), addresses * 10)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+    for name, value in run(args.count).items():
+        print(f"{name:>20}: {value:8.0f} ns/address")
@@ -0,0 +1,85 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+from benchmarks import bench_api, bench_hot_paths, bench_policy, bench_startup, bench_tron_address
+from benchmarks.baseline import BASELINE_PATH, format_result, load_baseline, unit_for, write_baseline
+
+DEFAULT_SUITES = ("hot_paths", "policy", "tron_address", "api")
+
+
+def run_suite(name: str, database_url: str | None) -> dict[str, float]:
+    if name == "hot_paths":
+        return bench_hot_paths.run()
+    if name == "policy":
+        return bench_policy.run(rule_count=200, decisions=20000)
+    if name == "tron_address":
+        return bench_tron_address.run(count=20000)
+    if name == "api":
+        return bench_api.run(database_url)
+    if name == "startup":
+        return bench_startup.run(runs=5, database_url=database_url)
+    raise ValueError(f"Unknown suite {name!r}")
+
+
+def find_regressions(results: dict[str, dict[str, float]], threshold: float) -> list[dict]:
+    # Every metric is a time, so only slower-than-baseline counts; metrics without a baseline are reported, not judged.
+    regressions = []
+    for suite, metrics in results.items():
+        baseline = load_baseline(suite)
+        for name, value in metrics.items():
+            reference = baseline.get(name)
+            if reference and value > reference * (1 + threshold):
+                regressions.append({"suite": suite, "metric": name, "baseline": reference, "value": round(value, 1), "ratio": round(value / reference, 3)})
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suites and compare them with the committed baseline")
+    parser.add_argument("--suites", default=",".join(DEFAULT_SUITES), help="Comma-separated; also available: startup")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing, 0.2 = 20%%")
+    parser.add_argument("--database-url", help="Migrated local Postgres for the api/startup suites (default TEST_DATABASE_URL)")
+    parser.add_argument("--write-baseline", action="store_true", help=f"Store the results in {BASELINE_PATH}")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    skipped = []
+    for suite in (part.strip() for part in args.suites.split(",") if part.strip()):
+        metrics = run_suite(suite, args.database_url)
+        if not metrics:
+            skipped.append(suite)
+            print(f"[{suite}] skipped (no database)")
+            continue
+        results[suite] = metrics
+        baseline = load_baseline(suite)
+        print(f"[{suite}]")
+        for name, value in metrics.items():
+            print(format_result(name, value, unit_for(name), baseline))
+
+    regressions = [] if args.write_baseline else find_regressions(results, args.threshold)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "threshold": args.threshold,
+        "results": {suite: {name: round(value, 1) for name, value in metrics.items()} for suite, metrics in results.items()},
+        "skipped": skipped,
+        "regressions": regressions,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+    if args.write_baseline:
+        for suite, metrics in results.items():
+            write_baseline(suite, metrics)
+        return 0
+    for item in regressions:
+        print(f"REGRESSION {item['suite']}.{item['metric']}: {item['value']} vs baseline {item['baseline']} (x{item['ratio']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
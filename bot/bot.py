@@ -1,12 +1,37 @@
 import asyncio
+import hashlib
+import html
+import logging
 import os
+import re
+import secrets
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 
 import httpx
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.error import TelegramError
+from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
 
 BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://localhost:8000/api/v1")
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
+# Below the 20 s client timeout so the backend sheds a request it cannot answer in time instead of queueing it.
+REQUEST_BUDGET_MS = 15000
+MAX_ADDRESSES_PER_CHECK = int(os.getenv("BOT_MAX_ADDRESSES_PER_CHECK", "50"))
+USER_SCREENING_CONCURRENCY = int(os.getenv("BOT_USER_SCREENING_CONCURRENCY", "4"))
+MAX_ADDRESS_FILE_BYTES = 64 * 1024
+# Telegram throttles edits of one message to roughly one per second.
+SUMMARY_EDIT_INTERVAL_S = 1.0
+TELEGRAM_MAX_MESSAGE_CHARS = 4096
+SUMMARY_ERROR_CHARS = 60
+TRON_ADDRESS_PATTERN = re.compile(r"\bT[1-9A-HJ-NP-Za-km-z]{33}\b")
+BOT_MAX_IN_FLIGHT = int(os.getenv("BOT_MAX_IN_FLIGHT", "8"))
+BOT_USER_MAX_IN_FLIGHT = int(os.getenv("BOT_USER_MAX_IN_FLIGHT", "1"))
+BOT_USER_MAX_QUEUED = int(os.getenv("BOT_USER_MAX_QUEUED", "5"))
+BOT_BACKEND_CONCURRENCY = int(os.getenv("BOT_BACKEND_CONCURRENCY", "8"))
+
+logger = logging.getLogger(__name__)
 
 
 def build_headers(update: Update) -> dict[str, str]:
@@ -14,23 +39,247 @@ def build_headers(update: Update) -> dict[str, str]:
     if not user:
         return {}
     # Production mode: backend resolves role by telegram_id from users table.
-    return {"X-Telegram-Id": str(user.id)}
+    return {"X-Telegram-Id": str(user.id), "X-Request-Timeout-Ms": str(REQUEST_BUDGET_MS), "traceparent": build_traceparent(update)}
+
+
+def build_traceparent(update: Update) -> str:
+    # One trace id per Telegram update, so every backend call made while handling it lands in the same trace.
+    update_id = getattr(update, "update_id", None)
+    if update_id is None:
+        trace_id = secrets.token_hex(16)
+    else:
+        trace_id = hashlib.sha256(f"tg-update-{update_id}".encode()).hexdigest()[:32]
+    # Sampled flag off: the backend applies its own rate and keeps slow requests anyway.
+    return f"00-{trace_id}-{secrets.token_hex(8)}-00"
+
+
+def build_idempotency_headers(update: Update) -> dict[str, str]:
+    message = update.message
+    message_id = getattr(message, "message_id", None)
+    chat_id = getattr(message, "chat_id", None)
+    if message_id is None or chat_id is None:
+        return {}
+    # Redelivered Telegram updates reuse the message id, so the backend replays instead of creating twice.
+    return {"Idempotency-Key": f"tg-{chat_id}-{message_id}"}
+
+
+class EtagCache:
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[str, dict | list]] = OrderedDict()
+
+    def get(self, key: tuple[str, str]) -> tuple[str, dict | list] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple[str, str], etag: str, data: dict | list) -> None:
+        self._entries[key] = (etag, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+etag_cache = EtagCache()
+
+
+async def get_json(client: httpx.AsyncClient, url: str, headers: dict[str, str]) -> tuple[int, dict | list | None, str]:
+    # Keyed per Telegram user; the backend still checks the role before answering 304.
+    key = (headers.get("X-Telegram-Id", ""), url)
+    cached = etag_cache.get(key)
+    if cached is not None:
+        headers = headers | {"If-None-Match": cached[0]}
+    response = await client.get(url, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        return 200, cached[1], ""
+    if response.status_code != 200:
+        return response.status_code, None, response.text
+    data = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        etag_cache.put(key, etag, data)
+    return 200, data, ""
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    await update.message.reply_text("Bot ready. /aml_check <address> /new_request <address> <amount> <aml_check_id>")
+    await update.message.reply_text(
+        "Bot ready. /aml_check <address...> /new_request <address> <amount> <aml_check_id> /request <request_id>"
+    )
+
+
+def extract_addresses(text: str | None) -> list[str]:
+    return TRON_ADDRESS_PATTERN.findall(text or "")
+
+
+async def read_address_file(document) -> str:
+    if document.file_size and document.file_size > MAX_ADDRESS_FILE_BYTES:
+        raise ValueError(f"File is larger than {MAX_ADDRESS_FILE_BYTES // 1024} KB")
+    telegram_file = await document.get_file()
+    return bytes(await telegram_file.download_as_bytearray()).decode("utf-8", errors="replace")
+
+
+async def collect_addresses(update: Update, context: ContextTypes.DEFAULT_TYPE) -> tuple[list[str], bool]:
+    # Returns the addresses and whether they were typed as command arguments (the legacy single-address form).
+    args = [part for arg in context.args or [] for part in arg.split(",") if part]
+    from_args = bool(args)
+    candidates = args
+    if not candidates:
+        message = update.message
+        for source in (message, getattr(message, "reply_to_message", None)):
+            if source is None:
+                continue
+            if getattr(source, "document", None) is not None:
+                candidates += extract_addresses(await read_address_file(source.document))
+            if source is not message:
+                candidates += extract_addresses(getattr(source, "text", None) or getattr(source, "caption", None))
+            if candidates:
+                break
+    return list(dict.fromkeys(candidates)), from_args
+
+
+_user_screening_slots: dict[int, asyncio.Semaphore] = {}
+
+
+def user_screening_slots(user_id: int) -> asyncio.Semaphore:
+    # Shared by all of a user's checks so two pasted lists do not double their load on the backend.
+    if user_id not in _user_screening_slots:
+        _user_screening_slots[user_id] = asyncio.Semaphore(USER_SCREENING_CONCURRENCY)
+    return _user_screening_slots[user_id]
+
+
+_backend_slots: asyncio.Semaphore | None = None
+
+
+def backend_slots() -> asyncio.Semaphore:
+    # Caps the fan-out of multi-address checks across all users; single calls are already bounded by the scheduler.
+    global _backend_slots
+    if _backend_slots is None:
+        _backend_slots = asyncio.Semaphore(BOT_BACKEND_CONCURRENCY)
+    return _backend_slots
+
+
+def describe_error(response: httpx.Response) -> str:
+    try:
+        detail = response.json().get("detail")
+    except (ValueError, AttributeError):
+        detail = None
+    if not isinstance(detail, str):
+        detail = response.text[:80] or f"HTTP {response.status_code}"
+    retry_after = response.headers.get("Retry-After")
+    return f"{detail} (retry in {retry_after}s)" if retry_after else detail
+
+
+async def screen_one(client: httpx.AsyncClient, update: Update, address: str) -> dict:
+    idempotency = build_idempotency_headers(update)
+    if idempotency:
+        idempotency = {"Idempotency-Key": f"{idempotency['Idempotency-Key']}-{address}"}
+    async with user_screening_slots(update.effective_user.id), backend_slots():
+        try:
+            response = await client.post(
+                f"{BACKEND_BASE_URL}/aml/check",
+                json={"address": address, "network": "TRON"},
+                headers=build_headers(update) | idempotency,
+            )
+        except httpx.HTTPError as exc:
+            return {"address": address, "error": type(exc).__name__}
+    if response.status_code != 200:
+        return {"address": address, "error": describe_error(response)}
+    return {"address": address} | response.json()
+
+
+def _summary_rows(addresses: list[str], results: dict[str, dict], check_ids: bool) -> list[str]:
+    rows = []
+    for address in addresses:
+        item = results.get(address)
+        if item is None:
+            rows.append(f"{address} ...")
+        elif "error" in item:
+            rows.append(f"{address} ERROR {item['error'][:SUMMARY_ERROR_CHARS]}")
+        else:
+            row = f"{address} {item['risk_level']:<6} {float(item['risk_score']):>6.2f}"
+            rows.append(f"{row}\n  check_id={item['check_id']}" if check_ids else row)
+    return rows
+
+
+def render_summary(addresses: list[str], results: dict[str, dict]) -> str:
+    done = len(results)
+    filled = round(10 * done / len(addresses))
+    counts = {level: sum(1 for item in results.values() if item.get("risk_level") == level) for level in ("high", "medium", "low")}
+    errors = sum(1 for item in results.values() if "error" in item)
+    header = f"AML check {done}/{len(addresses)} [{'#' * filled}{'.' * (10 - filled)}]"
+    totals = f"high={counts['high']} medium={counts['medium']} low={counts['low']} errors={errors}"
+
+    def compose(rows: list[str]) -> str:
+        return f"{html.escape(header)}\n{html.escape(totals)}\n<pre>{html.escape(chr(10).join(rows))}</pre>"
+
+    # Telegram rejects messages over 4096 characters: drop the check_id lines first, then cut the table.
+    for check_ids in (True, False):
+        rows = _summary_rows(addresses, results, check_ids)
+        text = compose(rows)
+        if len(text) <= TELEGRAM_MAX_MESSAGE_CHARS:
+            return text
+    hidden = 0
+    while rows and len(text) > TELEGRAM_MAX_MESSAGE_CHARS:
+        rows.pop()
+        hidden += 1
+        text = compose(rows + [f"... {hidden} more"])
+    return text
+
+
+class SummaryMessage:
+    def __init__(self, message) -> None:
+        self._message = message
+        self._last_edit = 0.0
+        self._last_text = ""
+
+    async def update(self, text: str, final: bool = False) -> None:
+        now = time.monotonic()
+        if text == self._last_text or (not final and now - self._last_edit < SUMMARY_EDIT_INTERVAL_S):
+            return
+        self._last_edit = now
+        self._last_text = text
+        try:
+            await self._message.edit_text(text, parse_mode="HTML")
+        except TelegramError as exc:
+            # A failed edit only loses this refresh; the caller keeps collecting results for the next one.
+            logger.warning("Editing the AML summary failed: %s", exc)
 
 
 async def aml_check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if len(context.args) < 1:
-        await update.message.reply_text("Usage: /aml_check <tron_address>")
+    try:
+        addresses, from_args = await collect_addresses(update, context)
+    except ValueError as exc:
+        await update.message.reply_text(f"AML error: {exc}")
+        return
+    if not addresses:
+        await update.message.reply_text(
+            "Usage: /aml_check <tron_address> [more addresses...], or reply with /aml_check to a message or .txt file"
+        )
+        return
+    if from_args and len(addresses) == 1:
+        await aml_check_single(update, addresses[0])
+        return
+    if len(addresses) > MAX_ADDRESSES_PER_CHECK:
+        await update.message.reply_text(f"Too many addresses: {len(addresses)} (max {MAX_ADDRESSES_PER_CHECK} per check)")
         return
-    address = context.args[0]
+
+    results: dict[str, dict] = {}
+    summary = SummaryMessage(await update.message.reply_text(render_summary(addresses, results), parse_mode="HTML"))
+    async with httpx.AsyncClient(timeout=20) as client:
+        tasks = [asyncio.create_task(screen_one(client, update, address)) for address in addresses]
+        for done in asyncio.as_completed(tasks):
+            item = await done
+            results[item["address"]] = item
+            await summary.update(render_summary(addresses, results), final=len(results) == len(addresses))
+
+
+async def aml_check_single(update: Update, address: str) -> None:
     async with httpx.AsyncClient(timeout=20) as client:
         response = await client.post(
             f"{BACKEND_BASE_URL}/aml/check",
             json={"address": address, "network": "TRON"},
-            headers=build_headers(update),
+            headers=build_headers(update) | build_idempotency_headers(update),
         )
     if response.status_code != 200:
         await update.message.reply_text(f"AML error: {response.text}")
@@ -55,7 +304,11 @@ async def new_request(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         "aml_check_id": aml_check_id,
     }
     async with httpx.AsyncClient(timeout=20) as client:
-        response = await client.post(f"{BACKEND_BASE_URL}/requests", json=payload, headers=build_headers(update))
+        response = await client.post(
+            f"{BACKEND_BASE_URL}/requests",
+            json=payload,
+            headers=build_headers(update) | build_idempotency_headers(update),
+        )
     if response.status_code not in (200, 201):
         await update.message.reply_text(f"Create request error: {response.text}")
         return
@@ -63,13 +316,148 @@ async def new_request(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     await update.message.reply_text(f"Created: {data['request_no']} status={data['status']}")
 
 
+async def request_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if len(context.args) < 1:
+        await update.message.reply_text("Usage: /request <request_id>")
+        return
+    async with httpx.AsyncClient(timeout=20) as client:
+        status_code, data, text = await get_json(
+            client, f"{BACKEND_BASE_URL}/requests/{context.args[0]}?expand=history", build_headers(update)
+        )
+    if status_code != 200:
+        await update.message.reply_text(f"Request error: {text}")
+        return
+    lines = [f"{data['request_no']} status={data['status']}", f"amount={data['amount']} {data['asset']}"]
+    if data.get("history"):
+        last = data["history"][-1]
+        lines.append(f"last change: {last['new_status']} at {last['created_at']} ({last['reason'] or '-'})")
+    await update.message.reply_text("\n".join(lines))
+
+
+@dataclass
+class Job:
+    key: tuple
+    handler: object
+    update: Update
+    context: ContextTypes.DEFAULT_TYPE
+
+
+def command_key(update: Update) -> tuple:
+    message = update.message
+    text = " ".join((getattr(message, "text", None) or getattr(message, "caption", None) or "").split())
+    replied = getattr(message, "reply_to_message", None)
+    document = getattr(message, "document", None)
+    return (
+        update.effective_user.id,
+        text,
+        getattr(replied, "message_id", None),
+        getattr(document, "file_unique_id", None),
+    )
+
+
+class CommandScheduler:
+    # Commands that call the backend go through here instead of running straight from PTB. Each user has a small
+    # in-flight allowance and a bounded queue; free global slots are handed out round-robin across users, so one
+    # user pasting twenty commands waits behind themselves, not in front of everyone else.
+    def __init__(self, max_in_flight: int, user_max_in_flight: int, user_max_queued: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.user_max_in_flight = user_max_in_flight
+        self.user_max_queued = user_max_queued
+        self._in_flight = 0
+        self._user_in_flight: dict[int, int] = {}
+        self._queues: OrderedDict[int, deque[Job]] = OrderedDict()
+        self._pending: set[tuple] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    def wrap(self, handler):
+        async def scheduled(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+            await self.submit(Job(command_key(update), handler, update, context))
+
+        return scheduled
+
+    def _can_start(self, user_id: int) -> bool:
+        return self._in_flight < self.max_in_flight and self._user_in_flight.get(user_id, 0) < self.user_max_in_flight
+
+    def position(self, user_id: int) -> int:
+        # A job at index k of its user's queue runs after up to k jobs of every other queued user.
+        own = len(self._queues[user_id])
+        others = sum(min(len(queue), own) for other, queue in self._queues.items() if other != user_id)
+        return own + others
+
+    async def submit(self, job: Job) -> None:
+        user_id = job.key[0]
+        if job.key in self._pending:
+            await job.update.message.reply_text("The same command is already queued or running.")
+            return
+        if not self._queues.get(user_id) and self._can_start(user_id):
+            self._start(job)
+            return
+        queue = self._queues.setdefault(user_id, deque())
+        if len(queue) >= self.user_max_queued:
+            await job.update.message.reply_text(f"Too many pending commands ({len(queue)}). Wait for them to finish.")
+            return
+        queue.append(job)
+        self._pending.add(job.key)
+        await job.update.message.reply_text(f"Queued, position {self.position(user_id)}.")
+
+    def _start(self, job: Job) -> None:
+        user_id = job.key[0]
+        self._in_flight += 1
+        self._user_in_flight[user_id] = self._user_in_flight.get(user_id, 0) + 1
+        self._pending.add(job.key)
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: Job) -> None:
+        user_id = job.key[0]
+        try:
+            await job.handler(job.update, job.context)
+        except Exception:
+            logger.exception("Command failed for user %s", user_id)
+        finally:
+            self._in_flight -= 1
+            self._user_in_flight[user_id] -= 1
+            if not self._user_in_flight[user_id]:
+                del self._user_in_flight[user_id]
+            self._pending.discard(job.key)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        progressed = True
+        while progressed and self._in_flight < self.max_in_flight:
+            progressed = False
+            for user_id in list(self._queues):
+                if not self._can_start(user_id):
+                    continue
+                queue = self._queues.pop(user_id)
+                self._start(queue.popleft())
+                if queue:
+                    # Back of the rotation, behind every other waiting user.
+                    self._queues[user_id] = queue
+                progressed = True
+                if self._in_flight >= self.max_in_flight:
+                    break
+
+    async def drain(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+
+scheduler = CommandScheduler(BOT_MAX_IN_FLIGHT, BOT_USER_MAX_IN_FLIGHT, BOT_USER_MAX_QUEUED)
+
+
 async def main() -> None:
     if not BOT_TOKEN:
         raise RuntimeError("Set BOT_TOKEN environment variable")
     app = Application.builder().token(BOT_TOKEN).build()
     app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("aml_check", aml_check))
-    app.add_handler(CommandHandler("new_request", new_request))
+    app.add_handler(CommandHandler("aml_check", scheduler.wrap(aml_check)))
+    # A file sent with "/aml_check" as its caption; CommandHandler only looks at message text.
+    aml_file_filter = filters.Document.ALL & filters.CaptionRegex(r"^/aml_check(@\w+)?(\s|$)")
+    app.add_handler(MessageHandler(aml_file_filter, scheduler.wrap(aml_check)))
+    app.add_handler(CommandHandler("new_request", scheduler.wrap(new_request)))
+    app.add_handler(CommandHandler("request", scheduler.wrap(request_info)))
     await app.initialize()
     await app.start()
     await app.updater.start_polling()
@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.config import get_settings
+from app.db.session import dispose_engine, get_sessionmaker
+from app.services.archive import archive_terminal_requests
+
+
+async def run(days: int, batch_size: int) -> None:
+    async with get_sessionmaker()() as session:
+        result = await archive_terminal_requests(session, timedelta(days=days), batch_size)
+    print(f"Archived {result.requests} requests and {result.history} history rows in {result.batches} batches")
+
+
+async def main(days: int, batch_size: int, interval_s: float) -> None:
+    try:
+        while True:
+            await run(days, batch_size)
+            if interval_s <= 0:
+                break
+            await asyncio.sleep(interval_s)
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=settings.archive_after_days)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 = run once)")
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.batch_size, args.interval))
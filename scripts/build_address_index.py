@@ -0,0 +1,25 @@
+import argparse
+import sys
+
+from app.services.address_lists import write_address_index
+from app.services.tron_address import normalize_tron_addresses
+
+
+def read_addresses(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as fh:
+        lines = (line.split("#", 1)[0].strip() for line in fh)
+        return [line for line in lines if line]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a one-address-per-line list into an mmap-able index file")
+    parser.add_argument("source", help="Text file with one address per line ('#' starts a comment)")
+    parser.add_argument("output", help="Index file referenced by AML_DENYLIST_PATH / AML_ALLOWLIST_PATH")
+    args = parser.parse_args()
+    raw = read_addresses(args.source)
+    # Lists store the canonical base58 form, the same one API payloads are normalized to.
+    addresses, errors = normalize_tron_addresses(raw)
+    for i, error in errors.items():
+        print(f"skipped {raw[i]!r}: {error}", file=sys.stderr)
+    count = write_address_index((address for address in addresses if address), args.output)
+    print(f"Indexed {count} addresses into {args.output}")
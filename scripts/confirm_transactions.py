@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.config import get_settings
+from app.db.session import get_sessionmaker
+from app.services.tron_node import close_tron_node_client, get_tron_node_client
+from app.services.tx_confirmation import SolidifiedCache, build_node_limiter, confirm_paid_requests
+
+
+async def run(batch_size: int, concurrency: int, cache: SolidifiedCache, limiter) -> int:
+    settings = get_settings()
+    async with get_sessionmaker()() as session:
+        result = await confirm_paid_requests(
+            session,
+            get_tron_node_client(),
+            limiter,
+            cache,
+            batch_size,
+            concurrency,
+            timedelta(seconds=settings.tx_confirm_recheck_s),
+            timedelta(hours=settings.tx_confirm_not_found_after_h),
+            settings.tron_usdt_contract,
+        )
+    print(
+        f"Checked {result.checked} paid requests: {result.confirmed} confirmed, {result.mismatched} mismatched, "
+        f"{result.failed} failed on chain, {result.not_found} not found, {result.pending} pending, "
+        f"{result.errors} lookup errors, {result.cached} from cache"
+    )
+    return result.checked
+
+
+async def main(batch_size: int, concurrency: int, interval_s: float) -> None:
+    if not get_tron_node_client().authoritative:
+        # The stub knows no transactions; running it would only churn tx_checked_at on every paid request.
+        raise SystemExit("TRON_NODE_PROVIDER is not 'http'; refusing to confirm transactions against the stub node")
+    # The cache and the limiter live as long as the process, so repeated rounds share them.
+    cache = SolidifiedCache(get_settings().tx_confirm_cache_size)
+    limiter = build_node_limiter()
+    try:
+        while True:
+            checked = await run(batch_size, concurrency, cache, limiter)
+            if interval_s <= 0:
+                break
+            # A full batch means there is a backlog; go again right away instead of sleeping.
+            if checked < batch_size:
+                await asyncio.sleep(interval_s)
+    finally:
+        await close_tron_node_client()
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=settings.tx_confirm_batch_size)
+    parser.add_argument("--concurrency", type=int, default=settings.tx_confirm_concurrency)
+    parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 = run once)")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.concurrency, args.interval))
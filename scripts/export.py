@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from app.db.models import RequestStatus
+from app.db.session import get_sessionmaker
+from app.services.export import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    ExportFilter,
+    build_export_query,
+    iter_export_chunks,
+    stream_export,
+)
+
+
+async def _tracking_cursor(chunks, state: dict):
+    async for rows in chunks:
+        if rows:
+            state["cursor"] = rows[-1]["cursor"]
+        yield rows
+
+
+async def run(dataset: str, fmt: str, filters: ExportFilter, chunk_size: int, output: str) -> None:
+    state = {"cursor": filters.after}
+    async with get_sessionmaker()() as session:
+        chunks = _tracking_cursor(iter_export_chunks(session, dataset, filters, chunk_size), state)
+        with open(output, "wb") as fh:
+            async for data in stream_export(chunks, dataset, fmt):
+                fh.write(data)
+    # Pass this value back as --after to continue an interrupted or incremental export.
+    print(f"last_cursor={state['cursor'] or ''}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dataset", choices=sorted(EXPORT_DATASETS))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--from", dest="date_from", type=datetime.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=datetime.fromisoformat)
+    parser.add_argument("--status", type=RequestStatus)
+    parser.add_argument("--after", help="Resume after this cursor")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    export_filter = ExportFilter(date_from=args.date_from, date_to=args.date_to, status=args.status, after=args.after)
+    try:
+        build_export_query(args.dataset, export_filter)
+    except ValueError as exc:
+        parser.error(str(exc))
+    asyncio.run(run(args.dataset, args.format, export_filter, args.chunk_size, args.output))
@@ -0,0 +1,30 @@
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from app.db.session import get_sessionmaker
+from app.services.stats import reconcile_stats
+
+
+async def run(days: int) -> None:
+    since = datetime.utcnow().date() - timedelta(days=days)
+    async with get_sessionmaker()() as session:
+        await reconcile_stats(session, since)
+    print(f"Stats rollups rebuilt since {since.isoformat()}")
+
+
+async def run_forever(days: int, interval_s: float) -> None:
+    while True:
+        await run(days)
+        await asyncio.sleep(interval_s)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7, help="Rebuild buckets for the last N days")
+    parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 = run once)")
+    args = parser.parse_args()
+    if args.interval > 0:
+        asyncio.run(run_forever(args.days, args.interval))
+    else:
+        asyncio.run(run(args.days))
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.config import get_settings
+from app.db.session import get_sessionmaker
+from app.services.aml_provider import close_aml_provider, get_aml_provider
+from app.services.rescreen import rescreen_stale
+
+
+async def run(max_age_h: float, batch_size: int, concurrency: int) -> None:
+    async with get_sessionmaker()() as session:
+        result = await rescreen_stale(session, get_aml_provider(), timedelta(hours=max_age_h), batch_size, concurrency)
+    print(
+        f"Re-screened {result.checked}/{result.addresses} addresses for {result.requests} requests, "
+        f"{result.escalated} escalated, {result.failed} failed"
+    )
+
+
+async def main(max_age_h: float, batch_size: int, concurrency: int, interval_s: float) -> None:
+    try:
+        while True:
+            await run(max_age_h, batch_size, concurrency)
+            if interval_s <= 0:
+                break
+            await asyncio.sleep(interval_s)
+    finally:
+        await close_aml_provider()
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-age-hours", type=float, default=settings.rescreen_max_age_h)
+    parser.add_argument("--batch-size", type=int, default=settings.rescreen_batch_size)
+    parser.add_argument("--concurrency", type=int, default=settings.rescreen_concurrency)
+    parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 = run once)")
+    args = parser.parse_args()
+    asyncio.run(main(args.max_age_hours, args.batch_size, args.concurrency, args.interval))
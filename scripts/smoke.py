@@ -12,7 +12,7 @@ async def run(base_url: str) -> None:
 
         aml = await client.post(
             "/api/v1/aml/check",
-            json={"address": "TVjsMockAddress001", "network": "TRON"},
+            json={"address": "TFdmunXgDcvwVo9pkfktDc2m4DHqTYmsE1", "network": "TRON"},
             headers=headers,
         )
         aml.raise_for_status()
@@ -21,7 +21,7 @@ async def run(base_url: str) -> None:
         create = await client.post(
             "/api/v1/requests",
             json={
-                "address": "TVjsMockAddress001",
+                "address": "TFdmunXgDcvwVo9pkfktDc2m4DHqTYmsE1",
                 "network": "TRON",
                 "asset": "USDT",
                 "amount": "150.00",
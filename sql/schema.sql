@@ -1,4 +1,5 @@
 ﻿CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 DO $$
 BEGIN
@@ -11,6 +12,12 @@ BEGIN
     IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'request_status') THEN
         CREATE TYPE request_status AS ENUM ('draft', 'pending', 'approved', 'rejected', 'paid');
     END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'payout_batch_status') THEN
+        CREATE TYPE payout_batch_status AS ENUM ('open', 'settled');
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'tx_confirmation_status') THEN
+        CREATE TYPE tx_confirmation_status AS ENUM ('confirmed', 'mismatch', 'failed', 'not_found');
+    END IF;
 END
 $$;
 
@@ -37,6 +44,17 @@ CREATE TABLE IF NOT EXISTS wallet_checks (
     checked_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+CREATE TABLE IF NOT EXISTS wallet_risk_latest (
+    address TEXT NOT NULL,
+    network TEXT NOT NULL,
+    check_id UUID NOT NULL REFERENCES wallet_checks(id),
+    provider TEXT NOT NULL,
+    risk_score NUMERIC(5,2) NOT NULL,
+    risk_level risk_level NOT NULL,
+    checked_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (address, network)
+);
+
 CREATE TABLE IF NOT EXISTS payment_requests (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     request_no TEXT NOT NULL UNIQUE,
@@ -54,6 +72,10 @@ CREATE TABLE IF NOT EXISTS payment_requests (
     rejection_reason TEXT,
     tx_hash TEXT UNIQUE,
     paid_at TIMESTAMPTZ,
+    risk_escalated_at TIMESTAMPTZ,
+    tx_confirmation tx_confirmation_status,
+    tx_block_number BIGINT,
+    tx_checked_at TIMESTAMPTZ,
     created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
@@ -68,6 +90,42 @@ CREATE TABLE IF NOT EXISTS status_history (
     created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+CREATE TABLE IF NOT EXISTS payment_requests_archive (
+    id UUID PRIMARY KEY,
+    request_no TEXT NOT NULL UNIQUE,
+    creator_id BIGINT NOT NULL,
+    address TEXT NOT NULL,
+    network TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    amount NUMERIC(36,18) NOT NULL,
+    comment TEXT,
+    attachment_url TEXT,
+    aml_check_id UUID NOT NULL,
+    status request_status NOT NULL,
+    approved_by BIGINT,
+    approved_at TIMESTAMPTZ,
+    rejection_reason TEXT,
+    tx_hash TEXT UNIQUE,
+    paid_at TIMESTAMPTZ,
+    risk_escalated_at TIMESTAMPTZ,
+    tx_confirmation tx_confirmation_status,
+    tx_block_number BIGINT,
+    tx_checked_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS status_history_archive (
+    id BIGINT PRIMARY KEY,
+    request_id UUID NOT NULL,
+    old_status request_status,
+    new_status request_status NOT NULL,
+    actor_id BIGINT,
+    reason TEXT,
+    created_at TIMESTAMPTZ NOT NULL
+);
+
 CREATE TABLE IF NOT EXISTS audit_logs (
     id BIGSERIAL PRIMARY KEY,
     actor_id BIGINT REFERENCES users(id) ON DELETE SET NULL,
@@ -78,11 +136,83 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+CREATE TABLE IF NOT EXISTS request_stats_daily (
+    day DATE NOT NULL,
+    status request_status NOT NULL,
+    creator_id BIGINT NOT NULL,
+    request_count BIGINT NOT NULL DEFAULT 0,
+    total_amount NUMERIC(36,18) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status, creator_id)
+);
+
+CREATE TABLE IF NOT EXISTS aml_risk_stats_daily (
+    day DATE NOT NULL,
+    risk_level risk_level NOT NULL,
+    check_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, risk_level)
+);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    actor_id BIGINT NOT NULL,
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    response_json JSONB,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    claim_token UUID,
+    PRIMARY KEY (actor_id, scope, key)
+);
+
+CREATE TABLE IF NOT EXISTS request_no_counters (
+    period TEXT PRIMARY KEY,
+    next_value BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS aml_provider_quota (
+    provider VARCHAR(64) NOT NULL,
+    day DATE NOT NULL,
+    used BIGINT NOT NULL,
+    PRIMARY KEY (provider, day)
+);
+
+CREATE TABLE IF NOT EXISTS payout_batches (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    status payout_batch_status NOT NULL DEFAULT 'open',
+    created_by BIGINT REFERENCES users(id) ON DELETE SET NULL,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    total_amount NUMERIC(36,18) NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    settled_at TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS payout_batch_items (
+    request_id UUID PRIMARY KEY,
+    batch_id UUID NOT NULL REFERENCES payout_batches(id) ON DELETE CASCADE,
+    request_no TEXT NOT NULL,
+    amount NUMERIC(36,18) NOT NULL
+);
+
 CREATE INDEX IF NOT EXISTS idx_payment_requests_status ON payment_requests(status);
 CREATE INDEX IF NOT EXISTS idx_payment_requests_creator ON payment_requests(creator_id);
 CREATE INDEX IF NOT EXISTS idx_wallet_checks_address_network ON wallet_checks(address, network);
-CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at ON audit_logs(created_at);
-CREATE INDEX IF NOT EXISTS idx_status_history_request_id ON status_history(request_id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_id ON audit_logs(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_entity_created_at_id ON audit_logs(entity_type, entity_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_actor_created_at_id ON audit_logs(actor_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_action_created_at_id ON audit_logs(action, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_status_history_request_id_id ON status_history(request_id, id);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_id_updated_at ON payment_requests(id) INCLUDE (updated_at);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_address_trgm ON payment_requests USING gin (address gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_request_no_trgm ON payment_requests USING gin (request_no gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_comment_fts ON payment_requests USING gin (to_tsvector('simple', coalesce(comment, '')));
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_terminal_updated_at ON payment_requests(updated_at) WHERE status IN ('paid', 'rejected');
+CREATE INDEX IF NOT EXISTS idx_payment_requests_created_at_id ON payment_requests(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_archive_created_at_id ON payment_requests_archive(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_archive_status_created_at_id ON payment_requests_archive(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_status_history_archive_request_id_id ON status_history_archive(request_id, id);
+CREATE INDEX IF NOT EXISTS idx_payout_batch_items_batch_id_request_no ON payout_batch_items(batch_id, request_no);
+CREATE INDEX IF NOT EXISTS idx_payment_requests_tx_unconfirmed ON payment_requests(tx_checked_at NULLS FIRST, paid_at) WHERE status = 'paid' AND tx_confirmation IS NULL;
 
 CREATE OR REPLACE FUNCTION set_updated_at()
 RETURNS TRIGGER AS $$
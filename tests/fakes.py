@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+
+from app.api.schemas import RiskCategory
+from app.db.models import RequestStatus, RiskLevel, UserRole
+
+
+class FakeExecResult:
+    def __init__(self, value):
+        self._value = value
+        self.rowcount = value if isinstance(value, int) else 0
+
+    def scalar_one_or_none(self):
+        return self._value
+
+    def one_or_none(self):
+        return self._value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._value or []
+
+
+class FakeSession:
+    def __init__(self, execute_results):
+        self._results = list(execute_results)
+        self.added = []
+        self.executed = []
+
+    async def execute(self, stmt):
+        self.executed.append(stmt)
+        value = self._results.pop(0) if self._results else None
+        return FakeExecResult(value)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        return None
+
+    async def commit(self):
+        return None
+
+    async def rollback(self):
+        return None
+
+    async def refresh(self, obj):
+        now = datetime.now(timezone.utc)
+        if getattr(obj, "id", None) is None:
+            obj.id = uuid4()
+        if getattr(obj, "created_at", None) is None:
+            obj.created_at = now
+        if getattr(obj, "updated_at", None) is None:
+            obj.updated_at = now
+        if getattr(obj, "checked_at", None) is None:
+            obj.checked_at = now
+
+
+class FakeProvider:
+    provider_name = "mock"
+
+    async def check(self, address: str, network: str):
+        categories = [RiskCategory(name="General", score=12.5)]
+        return 12.5, RiskLevel.low, categories, {
+            "address": address,
+            "network": network,
+            "risk_score": 12.5,
+            "risk_level": "low",
+            "categories": [{"name": "General", "score": 12.5}],
+        }
+
+
+def fake_payment(**overrides):
+    now = datetime.now(timezone.utc)
+    values = dict(
+        id=uuid4(),
+        status=RequestStatus.draft,
+        approved_by=None,
+        approved_at=None,
+        created_at=now,
+        updated_at=now,
+        request_no="PAY-202602-AAAA",
+        creator_id=101,
+        address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC",
+        network="TRON",
+        asset="USDT",
+        amount=Decimal("10.0"),
+        comment=None,
+        attachment_url=None,
+        aml_check_id=uuid4(),
+        tx_hash=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def asgi_get(db: FakeSession, path: str, headers: dict | None = None, role: UserRole = UserRole.head) -> httpx.Response:
+    from app.api.deps import get_actor_role
+    from app.db.session import get_db
+    from app.main import create_app
+
+    app = create_app()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_actor_role] = lambda: role
+
+    async def call():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+
+    return asyncio.run(call())
@@ -0,0 +1,89 @@
+import asyncio
+import os
+
+from app.api.routes_aml import run_aml_check
+from app.api.schemas import AmlCheckRequest
+from app.db.models import RiskLevel, UserRole
+from app.services.address_lists import AddressIndex, AddressScreen, ReloadingAddressIndex, write_address_index
+from tests.fakes import FakeSession
+
+
+def test_index_lookup(tmp_path) -> None:
+    path = str(tmp_path / "deny.idx")
+    listed = [f"TListed{i:05d}" for i in range(2000)]
+    assert write_address_index(listed + ["  ", listed[0]], path) == 2000
+
+    index = AddressIndex(path)
+    assert all(address in index for address in listed)
+    assert sum(f"TClean{i:05d}" in index for i in range(2000)) == 0
+    index.close()
+
+
+def test_index_reloads_when_file_is_replaced(tmp_path) -> None:
+    path = str(tmp_path / "deny.idx")
+    reloading = ReloadingAddressIndex(path, check_interval_s=0)
+    assert "TFirst" not in reloading
+
+    write_address_index(["TFirst"], path)
+    assert "TFirst" in reloading
+
+    write_address_index(["TSecond"], path)
+    os.utime(path, ns=(1, 1))
+    assert "TSecond" in reloading
+    assert "TFirst" not in reloading
+
+
+def test_broken_replacement_keeps_previous_index_until_fixed(tmp_path) -> None:
+    path = str(tmp_path / "deny.idx")
+    write_address_index(["TFirst"], path)
+    reloading = ReloadingAddressIndex(path, check_interval_s=0)
+    assert "TFirst" in reloading
+
+    with open(path, "rb") as fh:
+        data = fh.read()
+    # Each broken copy is a new file moved into place; rewriting the mapped file itself would fault the old index.
+    for i, broken in enumerate((b"", data[:20], data[:-4])):
+        with open(f"{path}.{i}", "wb") as fh:
+            fh.write(broken)
+        os.replace(f"{path}.{i}", path)
+        assert "TFirst" in reloading
+
+    write_address_index(["TSecond"], path)
+    assert "TSecond" in reloading
+    assert "TFirst" not in reloading
+
+
+def test_screen_prefers_denylist(tmp_path) -> None:
+    deny, allow = str(tmp_path / "deny.idx"), str(tmp_path / "allow.idx")
+    write_address_index(["TBoth", "TBad"], deny)
+    write_address_index(["TBoth", "TGood"], allow)
+    screen = AddressScreen(ReloadingAddressIndex(deny, 0), ReloadingAddressIndex(allow, 0), RiskLevel.medium, 40.0)
+
+    provider, (score, level, _categories, report) = screen.check("TBoth", "TRON")
+    assert (provider, score, level) == ("denylist", 100.0, RiskLevel.high)
+    assert report["source"] == "denylist"
+
+    provider, (score, level, _categories, _report) = screen.check("TGood", "TRON")
+    assert (provider, score, level) == ("allowlist", 40.0, RiskLevel.medium)
+    assert screen.check("TUnknown", "TRON") is None
+
+
+class FailingProvider:
+    provider_name = "http"
+
+    async def check(self, address: str, network: str):
+        raise AssertionError("vendor must not be called for listed addresses")
+
+
+def test_run_aml_check_skips_vendor_for_denylisted(monkeypatch, tmp_path) -> None:
+    path = str(tmp_path / "deny.idx")
+    write_address_index(["TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"], path)
+    monkeypatch.setattr("app.services.wallet_checks.get_address_screen", lambda: AddressScreen(ReloadingAddressIndex(path, 0), None))
+    monkeypatch.setattr("app.api.routes_aml.get_aml_provider", lambda: FailingProvider())
+    fake_db = FakeSession([])
+
+    res = asyncio.run(
+        run_aml_check(payload=AmlCheckRequest(address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC", network="TRON"), db=fake_db, actor_id=1, actor_role=UserRole.analyst)
+    )
+    assert res.risk_level == RiskLevel.high
+    assert fake_db.added[0].provider == "denylist"
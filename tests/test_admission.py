@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected, RouteClass, classify, request_budget_s
+from tests.fakes import FakeSession, asgi_get, fake_payment
+
+
+def controller(max_in_flight: int = 1, limit: int = 1, queue_size: int = 10) -> AdmissionController:
+    return AdmissionController(max_in_flight, {route_class: limit for route_class in RouteClass}, queue_size, default_budget_s=5)
+
+
+def test_classify_routes():
+    assert classify("POST", "/api/v1/aml/check") == RouteClass.screening
+    assert classify("POST", "/api/v1/requests") == RouteClass.transition
+    assert classify("POST", "/api/v1/requests/abc/approve") == RouteClass.transition
+    assert classify("GET", "/api/v1/requests/abc") == RouteClass.read
+    assert classify("POST", "/api/v1/requests/import") == RouteClass.bulk
+    assert classify("POST", "/api/v1/payout-batches/abc/settle") == RouteClass.bulk
+    assert classify("POST", "/api/v1/payout-batches") == RouteClass.bulk
+    assert classify("GET", "/api/v1/payout-batches/abc/export") == RouteClass.read
+    assert classify("GET", "/api/v1/export/requests") is None
+    assert classify("GET", "/health") is None
+
+
+def test_budget_header_is_milliseconds():
+    assert request_budget_s([(b"x-request-timeout-ms", b"1500")]) == 1.5
+    assert request_budget_s([(b"x-request-timeout-ms", b"soon")]) is None
+    assert request_budget_s([]) is None
+
+
+def test_transitions_are_served_before_queued_screening():
+    async def scenario():
+        admission = AdmissionController(1, {route_class: 1 for route_class in RouteClass}, 10, 5)
+        await admission.acquire(RouteClass.read)
+        order = []
+
+        async def run(route_class):
+            await admission.acquire(route_class)
+            order.append(route_class)
+            admission.release(route_class, 1)
+
+        screening = asyncio.create_task(run(RouteClass.screening))
+        await asyncio.sleep(0)
+        transition = asyncio.create_task(run(RouteClass.transition))
+        await asyncio.sleep(0)
+        admission.release(RouteClass.read, 1)
+        await asyncio.gather(screening, transition)
+        return order
+
+    assert asyncio.run(scenario()) == [RouteClass.transition, RouteClass.screening]
+
+
+def test_full_queue_is_rejected_with_429():
+    async def scenario():
+        admission = controller(queue_size=1)
+        await admission.acquire(RouteClass.screening)
+        waiter = asyncio.create_task(admission.acquire(RouteClass.screening))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            await admission.acquire(RouteClass.screening)
+        waiter.cancel()
+        return exc.value
+
+    assert asyncio.run(scenario()).status_code == 429
+
+
+def test_rejects_fast_when_wait_exceeds_budget():
+    async def scenario():
+        admission = controller()
+        await admission.acquire(RouteClass.screening)
+        admission.release(RouteClass.screening, 2000)
+        await admission.acquire(RouteClass.screening)
+        with pytest.raises(AdmissionRejected) as exc:
+            await admission.acquire(RouteClass.screening, budget_s=1)
+        return exc.value, admission.snapshot()
+
+    error, snapshot = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert error.retry_after_s == pytest.approx(2)
+    assert snapshot["classes"]["screening"]["rejected"] == 1
+    assert snapshot["classes"]["screening"]["queued"] == 0
+
+
+def test_queue_timeout_is_503():
+    async def scenario():
+        admission = controller()
+        await admission.acquire(RouteClass.read)
+        with pytest.raises(AdmissionRejected) as exc:
+            await admission.acquire(RouteClass.read, budget_s=0.01)
+        admission.release(RouteClass.read, 1)
+        return exc.value, admission.snapshot()
+
+    error, snapshot = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert snapshot["in_flight"] == 0
+
+
+def test_slot_granted_as_the_wait_times_out_is_released(monkeypatch):
+    from app.services import admission as admission_module
+
+    async def scenario():
+        admission = controller()
+        await admission.acquire(RouteClass.read)
+
+        async def racing_wait_for(future, timeout):
+            # The holder finishes and _dispatch grants the waiter in the same tick the timeout fires.
+            admission.release(RouteClass.read, 1)
+            assert future.done()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(admission_module.asyncio, "wait_for", racing_wait_for)
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire(RouteClass.read, budget_s=1)
+        return admission.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["in_flight"] == 0
+    assert snapshot["classes"]["read"]["in_flight"] == 0
+
+
+def test_middleware_sheds_and_exposes_metrics(monkeypatch):
+    from app.services import admission as admission_module
+
+    shed = AdmissionController(0, {route_class: 0 for route_class in RouteClass}, 0, 5)
+    monkeypatch.setattr(admission_module.AdmissionController, "from_settings", classmethod(lambda cls: shed))
+    item = fake_payment()
+    response = asgi_get(FakeSession([item]), f"/api/v1/requests/{item.id}")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+    metrics = asgi_get(FakeSession([]), "/admission")
+    assert metrics.status_code == 200
+    assert metrics.json()["classes"]["read"]["rejected"] == 1
@@ -1,7 +1,7 @@
 import asyncio
 
 from app.db.models import RiskLevel
-from app.services.aml_provider import MockAmlProvider
+from app.services.aml_provider import MockAmlProvider, parse_provider_report
 
 
 def test_mock_aml_provider_is_deterministic() -> None:
@@ -13,3 +13,16 @@ def test_mock_aml_provider_is_deterministic() -> None:
     assert a[1] == b[1]
     assert a[2][0].name == "Sanctions"
     assert a[1] in {RiskLevel.low, RiskLevel.medium, RiskLevel.high}
+
+
+def test_parse_provider_report_derives_level_and_skips_bad_categories() -> None:
+    score, level, categories, raw = parse_provider_report(
+        {"risk_score": "72.5", "risk_level": "severe", "categories": [{"name": "Scam", "score": 40}, {"name": "x"}]}
+    )
+    assert (score, level) == (72.5, RiskLevel.high)
+    assert [(c.name, c.score) for c in categories] == [("Scam", 40.0)]
+    assert raw["risk_level"] == "severe"
+
+    _, level, categories, _ = parse_provider_report({"risk_score": 10})
+    assert level == RiskLevel.low
+    assert categories[0].name == "General"
@@ -6,75 +6,20 @@ from uuid import uuid4
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
 
 from app.api.routes_aml import run_aml_check
-from app.api.routes_requests import approve_request, create_request, submit_request
-from app.api.schemas import AmlCheckRequest, RequestCreate, RiskCategory
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.routes_requests import approve_request, build_search_query, create_request, search_requests, submit_request
+from app.api.schemas import AmlCheckRequest, RequestCreate
 from app.db.models import RequestStatus, RiskLevel, UserRole
-
-
-class FakeExecResult:
-    def __init__(self, value):
-        self._value = value
-
-    def scalar_one_or_none(self):
-        return self._value
-
-    def scalars(self):
-        return self
-
-    def all(self):
-        return self._value or []
-
-
-class FakeSession:
-    def __init__(self, execute_results):
-        self._results = list(execute_results)
-        self.added = []
-
-    async def execute(self, _stmt):
-        value = self._results.pop(0) if self._results else None
-        return FakeExecResult(value)
-
-    def add(self, obj):
-        self.added.append(obj)
-
-    async def flush(self):
-        return None
-
-    async def commit(self):
-        return None
-
-    async def refresh(self, obj):
-        now = datetime.now(timezone.utc)
-        if getattr(obj, "id", None) is None:
-            obj.id = uuid4()
-        if getattr(obj, "created_at", None) is None:
-            obj.created_at = now
-        if getattr(obj, "updated_at", None) is None:
-            obj.updated_at = now
-        if getattr(obj, "checked_at", None) is None:
-            obj.checked_at = now
-
-
-class FakeProvider:
-    provider_name = "mock"
-
-    async def check(self, address: str, network: str):
-        categories = [RiskCategory(name="General", score=12.5)]
-        return 12.5, RiskLevel.low, categories, {
-            "address": address,
-            "network": network,
-            "risk_score": 12.5,
-            "risk_level": "low",
-            "categories": [{"name": "General", "score": 12.5}],
-        }
+from tests.fakes import FakeProvider, FakeSession, fake_payment
 
 
 def test_run_aml_check_success(monkeypatch) -> None:
     fake_db = FakeSession([])
     monkeypatch.setattr("app.api.routes_aml.get_aml_provider", lambda: FakeProvider())
-    payload = AmlCheckRequest(address="TVjs1", network="TRON")
+    payload = AmlCheckRequest(address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC", network="TRON")
 
     res = asyncio.run(run_aml_check(payload=payload, db=fake_db, actor_id=101, actor_role=UserRole.manager))
     assert res.risk_level == RiskLevel.low
@@ -83,7 +28,7 @@ def test_run_aml_check_success(monkeypatch) -> None:
 def test_create_request_requires_aml_check() -> None:
     fake_db = FakeSession([None])
     payload = RequestCreate(
-        address="TVjs1",
+        address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC",
         network="TRON",
         asset="USDT",
         amount=Decimal("10.0"),
@@ -95,20 +40,25 @@ def test_create_request_requires_aml_check() -> None:
     assert exc.value.status_code == 404
 
 
-def test_create_request_success() -> None:
-    wallet_check = SimpleNamespace(id=uuid4())
-    fake_db = FakeSession([wallet_check])
+def test_create_request_success(monkeypatch) -> None:
+    async def fake_request_no() -> str:
+        return "PAY-202602-000001"
+
+    monkeypatch.setattr("app.api.routes_requests.next_request_no", fake_request_no)
+    latest = SimpleNamespace(check_id=uuid4(), checked_at=datetime.now(timezone.utc))
+    fake_db = FakeSession([latest])
     payload = RequestCreate(
-        address="TVjs1",
+        address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC",
         network="TRON",
         asset="USDT",
         amount=Decimal("10.0"),
-        aml_check_id=wallet_check.id,
+        aml_check_id=latest.check_id,
         comment="test",
     )
 
     res = asyncio.run(create_request(payload=payload, db=fake_db, actor_id=101, actor_role=UserRole.manager))
     assert res.status == RequestStatus.draft
+    assert res.request_no == "PAY-202602-000001"
     assert Decimal(res.amount) == Decimal("10.0")
 
 
@@ -128,7 +78,7 @@ def test_approve_invalid_transition() -> None:
         updated_at=datetime.now(timezone.utc),
         request_no="PAY-202602-AAAA",
         creator_id=101,
-        address="TVjs1",
+        address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC",
         network="TRON",
         asset="USDT",
         amount=Decimal("10.0"),
@@ -142,3 +92,35 @@ def test_approve_invalid_transition() -> None:
     with pytest.raises(HTTPException) as exc:
         asyncio.run(approve_request(request_id=payment.id, payload=None, db=fake_db, actor_id=500, actor_role=UserRole.head))
     assert exc.value.status_code == 409
+
+
+def test_search_query_uses_trigram_and_fulltext_predicates() -> None:
+    sql = str(build_search_query("PAY-2026", 20).compile(dialect=postgresql.dialect()))
+
+    assert "payment_requests.address %%> " in sql
+    assert "payment_requests.request_no ILIKE" in sql
+    assert "to_tsvector('simple'::regconfig, coalesce(payment_requests.comment, '')) @@" in sql
+    assert "ORDER BY rank DESC, payment_requests.id DESC" in sql
+
+
+def test_search_requests_returns_next_cursor() -> None:
+    rows = [(fake_payment(), 0.9), (fake_payment(), 0.8), (fake_payment(), 0.7)]
+    fake_db = FakeSession([rows])
+
+    res = asyncio.run(search_requests(q="TVjs", limit=2, after=None, db=fake_db, actor_role=UserRole.analyst))
+    assert [hit.rank for hit in res.items] == [0.9, 0.8]
+    assert decode_cursor(res.next_cursor, 2) == ["0.8", str(res.items[-1].id)]
+
+
+def test_search_requests_last_page_has_no_cursor() -> None:
+    fake_db = FakeSession([[(fake_payment(), 0.4)]])
+
+    res = asyncio.run(search_requests(q="TVjs", limit=2, after=None, db=fake_db, actor_role=UserRole.analyst))
+    assert len(res.items) == 1
+    assert res.next_cursor is None
+
+
+def test_search_requests_rejects_bad_cursor() -> None:
+    with pytest.raises(HTTPException) as exc:
+        build_search_query("TVjs", 20, after=encode_cursor("high", "not-a-uuid"))
+    assert exc.value.status_code == 400
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import RequestStatus
+from app.services.archive import archive_terminal_requests, build_candidates_query, build_move_statements
+from app.services.export import ExportFilter, build_export_query
+from tests.fakes import FakeSession, asgi_get, fake_payment
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_candidates_query_locks_terminal_requests_oldest_first():
+    sql = compile_sql(build_candidates_query(datetime.now(timezone.utc), 100))
+    assert "payment_requests.status IN" in sql
+    assert "ORDER BY payment_requests.updated_at" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "payment_requests.tx_confirmation IS NOT NULL" in sql
+
+
+def test_move_copies_history_before_deleting_requests():
+    copy_history, copy_requests, delete_requests = (compile_sql(stmt) for stmt in build_move_statements([uuid4()]))
+    assert copy_history.startswith("INSERT INTO status_history_archive")
+    assert "FROM status_history" in copy_history
+    assert copy_requests.startswith("INSERT INTO payment_requests_archive")
+    assert delete_requests.startswith("DELETE FROM payment_requests")
+
+
+def test_archive_runs_batches_until_a_short_one():
+    db = FakeSession([[uuid4(), uuid4()], 5, None, None, [uuid4()], 2, None, None])
+    result = asyncio.run(archive_terminal_requests(db, timedelta(days=90), batch_size=2))
+    assert (result.requests, result.history, result.batches) == (3, 7, 2)
+    assert len(db.executed) == 8
+
+
+def test_archive_stops_on_empty_batch():
+    db = FakeSession([[]])
+    result = asyncio.run(archive_terminal_requests(db, timedelta(days=90), batch_size=2))
+    assert result.requests == 0 and len(db.executed) == 1
+
+
+def test_detail_falls_back_to_archive():
+    archived_at = datetime.now(timezone.utc)
+    item = fake_payment(status=RequestStatus.paid, tx_hash="ab" * 32, archived_at=archived_at)
+    db = FakeSession([None, item])
+    response = asgi_get(db, f"/api/v1/requests/{item.id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "paid"
+    assert response.json()["archived_at"] is not None
+    assert "payment_requests_archive" in compile_sql(db.executed[1])
+
+
+def test_detail_missing_from_both_tables_is_404():
+    response = asgi_get(FakeSession([None, None]), f"/api/v1/requests/{uuid4()}")
+    assert response.status_code == 404
+
+
+def test_history_falls_back_to_archive():
+    request_id = uuid4()
+    row = SimpleNamespace(
+        id=9, request_id=request_id, old_status=None, new_status=RequestStatus.draft, actor_id=1, reason="created",
+        created_at=datetime.now(timezone.utc),
+    )
+    db = FakeSession([[], [row]])
+    response = asgi_get(db, f"/api/v1/requests/{request_id}/history")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [9]
+    assert "status_history_archive" in compile_sql(db.executed[1])
+
+
+def test_list_merges_archive_only_when_asked():
+    now = datetime.now(timezone.utc)
+    hot = fake_payment(created_at=now)
+    cold = fake_payment(status=RequestStatus.rejected, created_at=now - timedelta(days=200), archived_at=now)
+    db = FakeSession([[hot]])
+    assert len(asgi_get(db, "/api/v1/requests").json()) == 1
+    assert len(db.executed) == 1
+
+    page = [SimpleNamespace(id=hot.id, archived=False), SimpleNamespace(id=cold.id, archived=True)]
+    db = FakeSession([page, [hot], [cold]])
+    items = asgi_get(db, "/api/v1/requests?include_archived=true").json()
+    assert [item["id"] for item in items] == [str(hot.id), str(cold.id)]
+    assert "archived_at" not in items[0] and items[1]["archived_at"] is not None
+    assert "UNION ALL" in compile_sql(db.executed[0])
+
+    db = FakeSession([[hot]])
+    asgi_get(db, "/api/v1/requests?include_archived=true&status=pending")
+    assert len(db.executed) == 1
+
+
+def test_merged_list_pages_both_tables_in_sql():
+    now = datetime.now(timezone.utc)
+    cold = [fake_payment(status=RequestStatus.paid, created_at=now - timedelta(days=200 + i), archived_at=now) for i in range(3)]
+    page = [SimpleNamespace(id=item.id, archived=True) for item in cold]
+    db = FakeSession([page, cold[:2]])
+    response = asgi_get(db, "/api/v1/requests?include_archived=true&limit=2")
+    assert [item["id"] for item in response.json()] == [str(item.id) for item in cold[:2]]
+    assert len(db.executed) == 2
+    page_sql = compile_sql(db.executed[0])
+    assert page_sql.count("ORDER BY") == 3 and page_sql.count("LIMIT") == 3
+    assert "AS page ORDER BY page.created_at DESC, page.id DESC" in page_sql
+
+    cursor = response.headers["X-Next-Cursor"]
+    db = FakeSession([[]])
+    assert asgi_get(db, f"/api/v1/requests?include_archived=true&limit=2&after={cursor}").json() == []
+    assert db.executed[0].compile().params["param_1"] == cold[1].created_at
+    assert asgi_get(FakeSession([]), "/api/v1/requests?after=bogus").status_code == 400
+
+
+def test_archive_export_datasets_join_archive_tables():
+    sql = compile_sql(build_export_query("history_archive", ExportFilter()))
+    assert "FROM status_history_archive JOIN payment_requests_archive" in sql
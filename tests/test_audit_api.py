@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.pagination import decode_time_cursor, encode_cursor
+from app.api.routes_audit import build_audit_query, list_audit_logs
+from app.db.models import UserRole
+from tests.fakes import FakeSession, asgi_get
+
+NOW = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+
+
+def _entry(entry_id: int, created_at: datetime = NOW):
+    return SimpleNamespace(
+        id=entry_id,
+        actor_id=42,
+        action="request_approved",
+        entity_type="payment_request",
+        entity_id="abc",
+        payload_json={},
+        created_at=created_at,
+    )
+
+
+def _list(db, **filters):
+    params = {
+        "actor_id": None,
+        "action": None,
+        "entity_type": None,
+        "entity_id": None,
+        "date_from": None,
+        "date_to": None,
+        "limit": 100,
+        "after": None,
+    } | filters
+    return asyncio.run(list_audit_logs(**params, db=db, actor_role=UserRole.analyst))
+
+
+def test_audit_query_filters_and_orders_by_keyset() -> None:
+    stmt = build_audit_query(
+        50,
+        entity_type="payment_request",
+        entity_id="abc",
+        date_from=NOW - timedelta(days=7),
+        date_to=NOW,
+        after=encode_cursor(NOW, 900),
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "audit_logs.entity_type = %(entity_type_1)s AND audit_logs.entity_id = %(entity_id_1)s" in sql
+    assert "audit_logs.created_at >= %(created_at_1)s AND audit_logs.created_at < %(created_at_2)s" in sql
+    assert "(audit_logs.created_at, audit_logs.id) < (%(param_1)s, %(param_2)s)" in sql
+    assert sql.endswith("ORDER BY audit_logs.created_at DESC, audit_logs.id DESC \n LIMIT %(param_3)s")
+    assert stmt.compile().params["param_3"] == 51
+
+
+def test_audit_query_rejects_bad_input() -> None:
+    with pytest.raises(HTTPException) as exc:
+        build_audit_query(10, after=encode_cursor(NOW, "not-an-id"))
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        build_audit_query(10, after="not-a-cursor")
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        build_audit_query(10, entity_id="abc")
+    assert exc.value.status_code == 400
+
+
+def test_list_audit_logs_returns_next_cursor() -> None:
+    rows = [_entry(3), _entry(2), _entry(1, NOW - timedelta(seconds=1))]
+    page = _list(FakeSession([rows]), actor_id=42, limit=2)
+    assert [item.id for item in page.items] == [3, 2]
+    assert decode_time_cursor(page.next_cursor) == (NOW, "2")
+
+    page = _list(FakeSession([rows[2:]]), actor_id=42, limit=2, after=page.next_cursor)
+    assert [item.id for item in page.items] == [1]
+    assert page.next_cursor is None
+
+
+def test_list_audit_logs_rejects_empty_range() -> None:
+    with pytest.raises(HTTPException) as exc:
+        _list(FakeSession([]), date_from=NOW, date_to=NOW)
+    assert exc.value.status_code == 400
+
+
+def test_audit_endpoint_is_limited_to_auditing_roles() -> None:
+    response = asgi_get(FakeSession([[_entry(1)]]), "/api/v1/audit?action=request_approved", role=UserRole.analyst)
+    assert response.status_code == 200
+    assert response.json()["items"][0]["action"] == "request_approved"
+    assert asgi_get(FakeSession([]), "/api/v1/audit", role=UserRole.manager).status_code == 403
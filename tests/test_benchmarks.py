@@ -0,0 +1,10 @@
+from benchmarks import run
+
+
+def test_find_regressions_flags_only_slowdowns_beyond_threshold(monkeypatch):
+    baselines = {"hot_paths": {"a_ns": 100.0, "b_ns": 100.0, "c_ns": 100.0}}
+    monkeypatch.setattr(run, "load_baseline", lambda suite: baselines.get(suite, {}))
+    results = {"hot_paths": {"a_ns": 119.0, "b_ns": 121.0, "c_ns": 50.0, "new_ns": 10.0}, "api": {"x_ms": 5.0}}
+    regressions = run.find_regressions(results, threshold=0.2)
+    assert [(item["suite"], item["metric"]) for item in regressions] == [("hot_paths", "b_ns")]
+    assert regressions[0]["ratio"] == 1.21
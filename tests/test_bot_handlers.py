@@ -1,15 +1,30 @@
 import asyncio
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
+from uuid import uuid4
 
-from bot.bot import aml_check, build_headers, new_request
+from telegram.error import BadRequest
+
+from bot.bot import (
+    CommandScheduler,
+    aml_check,
+    build_headers,
+    build_idempotency_headers,
+    build_traceparent,
+    etag_cache,
+    extract_addresses,
+    new_request,
+    render_summary,
+    request_info,
+)
 
 
 class DummyResponse:
-    def __init__(self, status_code: int, payload: dict | None = None, text: str = ""):
+    def __init__(self, status_code: int, payload: dict | None = None, text: str = "", headers: dict | None = None):
         self.status_code = status_code
         self._payload = payload or {}
         self.text = text
+        self.headers = headers or {}
 
     def json(self):
         return self._payload
@@ -39,6 +54,25 @@ def _update(user_id: int = 1):
 def test_build_headers() -> None:
     headers = build_headers(_update(42))
     assert headers["X-Telegram-Id"] == "42"
+    assert headers["X-Request-Timeout-Ms"] == "15000"
+
+
+def test_traceparent_is_shared_by_calls_for_one_update() -> None:
+    update = _update()
+    update.update_id = 991
+    first, second = build_traceparent(update).split("-"), build_traceparent(update).split("-")
+    assert first[0] == "00" and first[3] == "00"
+    assert len(first[1]) == 32 and first[1] == second[1]
+    assert first[2] != second[2]
+
+
+def test_build_idempotency_headers() -> None:
+    update = _update()
+    assert build_idempotency_headers(update) == {}
+
+    update.message.chat_id = 5
+    update.message.message_id = 77
+    assert build_idempotency_headers(update) == {"Idempotency-Key": "tg-5-77"}
 
 
 def test_aml_check_usage() -> None:
@@ -77,3 +111,179 @@ def test_new_request_success(monkeypatch) -> None:
     asyncio.run(new_request(update, ctx))
     msg = update.message.reply_text.await_args.args[0]
     assert "Created: PAY-202602-AAAA" in msg
+
+
+class RecordingGetClient(DummyClient):
+    def __init__(self, responses: list[DummyResponse], sent: list[dict]):
+        self._responses = responses
+        self._sent = sent
+
+    async def get(self, url, headers=None):
+        self._sent.append(headers or {})
+        return self._responses.pop(0)
+
+
+def test_request_info_reuses_cached_body_on_304(monkeypatch) -> None:
+    payload = {
+        "request_no": "PAY-202602-000001",
+        "status": "pending",
+        "amount": "10",
+        "asset": "USDT",
+        "history": [{"new_status": "pending", "created_at": "2026-02-01T10:00:00Z", "reason": "submitted"}],
+    }
+    responses = [DummyResponse(200, payload=payload, headers={"ETag": 'W/"v1"'}), DummyResponse(304)]
+    sent: list[dict] = []
+    monkeypatch.setattr("bot.bot.httpx.AsyncClient", lambda timeout=20: RecordingGetClient(responses, sent))
+    monkeypatch.setattr(etag_cache, "_entries", type(etag_cache._entries)())
+
+    for _ in range(2):
+        update = _update(7)
+        asyncio.run(request_info(update, SimpleNamespace(args=["req-1"])))
+        msg = update.message.reply_text.await_args.args[0]
+        assert "PAY-202602-000001 status=pending" in msg
+        assert "last change: pending" in msg
+
+    assert "If-None-Match" not in sent[0]
+    assert sent[1]["If-None-Match"] == 'W/"v1"'
+
+
+ADDR_A = "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"
+ADDR_B = "TVjsyZ7fYF3qLF6BQgPmTEZy1xrNNyVAAA"
+
+
+class PerAddressClient(DummyClient):
+    def __init__(self):
+        super().__init__(DummyResponse(200))
+        self.keys = []
+
+    async def post(self, url, json=None, headers=None, **kwargs):
+        self.keys.append(headers.get("Idempotency-Key"))
+        if json["address"] == ADDR_B:
+            return DummyResponse(503, payload={"detail": "Server busy"}, headers={"Retry-After": "3"})
+        return DummyResponse(200, payload={"risk_level": "high", "risk_score": 91.5, "check_id": "c-1"})
+
+
+def test_extract_addresses_finds_tron_addresses_in_free_text() -> None:
+    assert extract_addresses(f"pay {ADDR_A},\n{ADDR_B}; and 0xdeadbeef") == [ADDR_A, ADDR_B]
+
+
+def test_aml_check_many_addresses_edits_one_summary(monkeypatch) -> None:
+    update = _update()
+    update.message.chat_id = 5
+    update.message.message_id = 77
+    summary = SimpleNamespace(edit_text=AsyncMock())
+    update.message.reply_text = AsyncMock(return_value=summary)
+    client = PerAddressClient()
+    monkeypatch.setattr("bot.bot.httpx.AsyncClient", lambda timeout=20: client)
+
+    asyncio.run(aml_check(update, SimpleNamespace(args=[f"{ADDR_A},{ADDR_B}", ADDR_A])))
+
+    update.message.reply_text.assert_awaited_once()
+    final = summary.edit_text.await_args.args[0]
+    assert "2/2" in final and "high=1" in final and "errors=1" in final
+    assert "c-1" in final and "Server busy (retry in 3s)" in final
+    assert sorted(client.keys) == sorted([f"tg-5-77-{ADDR_A}", f"tg-5-77-{ADDR_B}"])
+
+
+def test_aml_check_reads_addresses_from_replied_message(monkeypatch) -> None:
+    update = _update()
+    update.message.reply_to_message = SimpleNamespace(text=f"{ADDR_A}\n{ADDR_B}", caption=None, document=None)
+    summary = SimpleNamespace(edit_text=AsyncMock())
+    update.message.reply_text = AsyncMock(return_value=summary)
+    client = PerAddressClient()
+    monkeypatch.setattr("bot.bot.httpx.AsyncClient", lambda timeout=20: client)
+
+    asyncio.run(aml_check(update, SimpleNamespace(args=None)))
+
+    assert len(client.keys) == 2
+    assert "2/2" in summary.edit_text.await_args.args[0]
+
+
+def _command(user_id: int, text: str):
+    update = _update(user_id)
+    update.message.text = text
+    return update
+
+
+def test_scheduler_queues_dedupes_and_rotates_between_users() -> None:
+    async def scenario():
+        scheduler = CommandScheduler(max_in_flight=1, user_max_in_flight=1, user_max_queued=2)
+        release = asyncio.Event()
+        order = []
+
+        async def handler(update, context):
+            order.append((update.effective_user.id, update.message.text))
+            await release.wait()
+
+        run = scheduler.wrap(handler)
+        first = _command(1, "/aml_check A")
+        await run(first, None)
+        await asyncio.sleep(0)
+        queued = [_command(1, "/aml_check B"), _command(1, "/aml_check C"), _command(2, "/aml_check D")]
+        for update in queued:
+            await run(update, None)
+        duplicate = _command(1, "/aml_check  B")
+        await run(duplicate, None)
+        overflow = _command(1, "/aml_check E")
+        await run(overflow, None)
+
+        assert first.message.reply_text.await_count == 0
+        assert [u.message.reply_text.await_args.args[0] for u in queued] == [
+            "Queued, position 1.",
+            "Queued, position 2.",
+            "Queued, position 2.",
+        ]
+        assert "already queued" in duplicate.message.reply_text.await_args.args[0]
+        assert "Too many pending" in overflow.message.reply_text.await_args.args[0]
+
+        release.set()
+        await scheduler.drain()
+        return order
+
+    order = asyncio.run(scenario())
+    # User 2 is served after one more of user 1's commands, not after all of them.
+    assert order == [(1, "/aml_check A"), (1, "/aml_check B"), (2, "/aml_check D"), (1, "/aml_check C")]
+
+
+def test_scheduler_keeps_running_after_handler_error() -> None:
+    async def scenario():
+        scheduler = CommandScheduler(max_in_flight=2, user_max_in_flight=1, user_max_queued=5)
+        done = []
+
+        async def handler(update, context):
+            if update.message.text == "boom":
+                raise RuntimeError("boom")
+            done.append(update.message.text)
+
+        run = scheduler.wrap(handler)
+        await run(_command(1, "boom"), None)
+        await run(_command(1, "ok"), None)
+        await scheduler.drain()
+        return done, scheduler._in_flight
+
+    assert asyncio.run(scenario()) == (["ok"], 0)
+
+
+def test_summary_fits_one_telegram_message_for_the_largest_check() -> None:
+    addresses = [f"T{i:033d}" for i in range(50)]
+    results = {address: {"address": address, "risk_level": "medium", "risk_score": 50, "check_id": str(uuid4())} for address in addresses}
+    text = render_summary(addresses, results)
+    assert len(text) <= 4096
+    assert addresses[-1] in text and "check_id" not in text
+
+    errors = {address: {"address": address, "error": "x" * 200} for address in addresses}
+    text = render_summary(addresses, errors)
+    assert len(text) <= 4096 and "more" in text.splitlines()[-1]
+
+
+def test_summary_edit_failures_do_not_stop_the_check(monkeypatch) -> None:
+    update = _update()
+    summary = SimpleNamespace(edit_text=AsyncMock(side_effect=BadRequest("Message is too long")))
+    update.message.reply_text = AsyncMock(return_value=summary)
+    client = PerAddressClient()
+    monkeypatch.setattr("bot.bot.httpx.AsyncClient", lambda timeout=20: client)
+
+    asyncio.run(aml_check(update, SimpleNamespace(args=[ADDR_A, ADDR_B])))
+
+    assert len(client.keys) == 2
+    assert summary.edit_text.await_count >= 1
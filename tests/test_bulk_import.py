@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import RiskLevel
+from app.services.bulk_import import ImportTooLarge, import_requests, read_import_rows
+from tests.fakes import FakeProvider, FakeSession
+
+ADDR_A = "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"
+ADDR_B = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _read(data: bytes, fmt: str, max_bytes: int = 10_000, max_rows: int = 100):
+    return asyncio.run(read_import_rows(_chunks(data), fmt, max_bytes, max_rows))
+
+
+def test_csv_rows_are_parsed_across_chunks_with_line_numbers() -> None:
+    data = (
+        "﻿Address,Amount,Comment\r\n"
+        f"{ADDR_A},10.5,\"Salary\nOctober\"\r\n"
+        "\r\n"
+        f"{ADDR_B},-1,\r\n"
+        "Tbogus,3,\r\n"
+        f"{ADDR_B},2\r\n"
+    ).encode()
+    rows = _read(data, "csv")
+
+    assert [row.line for row in rows] == [2, 5, 6, 7]
+    assert rows[0].row.address == ADDR_A and rows[0].row.comment == "Salary\nOctober" and rows[0].row.network == "TRON"
+    assert "amount" in rows[1].error
+    assert rows[2].error.startswith("address:")
+    assert "Expected 3 columns" in rows[3].error
+
+
+def test_ndjson_rows_report_bad_lines() -> None:
+    data = f'{{"address": "{ADDR_A}", "amount": "1"}}\n[1]\nnot json\n'.encode()
+    rows = _read(data, "ndjson")
+    assert rows[0].row is not None
+    assert rows[1].error == "Expected a JSON object"
+    assert rows[2].error.startswith("Invalid JSON")
+
+
+def test_amounts_outside_the_column_bounds_fail_per_row() -> None:
+    data = f"address,amount\n{ADDR_A},1.5\n{ADDR_A},0.{'1' * 19}\n{ADDR_A},{'9' * 19}\n".encode()
+    rows = _read(data, "csv")
+    assert rows[0].row is not None
+    assert rows[1].error.startswith("amount:") and "decimal places" in rows[1].error
+    assert rows[2].error.startswith("amount:") and "digits" in rows[2].error
+
+
+def test_limits_are_enforced_while_streaming() -> None:
+    with pytest.raises(ImportTooLarge):
+        _read(b"address,amount\n" + f"{ADDR_A},1\n".encode() * 50, "csv", max_bytes=200)
+    with pytest.raises(ImportTooLarge):
+        _read(b"address,amount\n" + f"{ADDR_A},1\n".encode() * 5, "csv", max_rows=3)
+
+
+def test_import_reuses_fresh_checks_screens_the_rest_and_inserts_in_chunks(monkeypatch) -> None:
+    numbers = iter(range(1, 100))
+
+    async def fake_request_no() -> str:
+        return f"PAY-202610-{next(numbers):06d}"
+
+    monkeypatch.setattr("app.services.bulk_import.next_request_no", fake_request_no)
+    data = f"address,amount\n{ADDR_A},1\n{ADDR_B},2\n{ADDR_A},3\nTbogus,4\n".encode()
+    rows = _read(data, "csv")
+    fresh = SimpleNamespace(address=ADDR_A, network="TRON", check_id=uuid4(), risk_level=RiskLevel.medium, checked_at=datetime.now(timezone.utc))
+    db = FakeSession([[fresh]])
+
+    report = asyncio.run(import_requests(db, rows, actor_id=7, provider=FakeProvider(), chunk_size=2, concurrency=2))
+
+    assert (report.created, report.failed, report.aml_checks_reused, report.aml_checks_run) == (3, 1, 1, 1)
+    assert [row.status for row in report.rows] == ["created", "created", "created", "failed"]
+    assert report.rows[0].aml_check_id == report.rows[2].aml_check_id == fresh.check_id
+    assert report.rows[1].risk_level == RiskLevel.low
+    inserts = [str(stmt.compile(dialect=postgresql.dialect())) for stmt in db.executed if "INSERT INTO payment_requests " in str(stmt)]
+    # Two chunks of two and one rows, each a single multi-row statement.
+    assert len(inserts) == 2
+    assert inserts[0].count("VALUES") == 1 and "request_no_m1" in inserts[0]
+
+
+def test_import_screens_stale_addresses_again(monkeypatch) -> None:
+    async def fake_request_no() -> str:
+        return "PAY-202610-000001"
+
+    monkeypatch.setattr("app.services.bulk_import.next_request_no", fake_request_no)
+    stale = SimpleNamespace(
+        address=ADDR_A, network="TRON", check_id=uuid4(), risk_level=RiskLevel.high, checked_at=datetime.now(timezone.utc) - timedelta(days=30)
+    )
+    rows = _read(f"address,amount\n{ADDR_A},1\n".encode(), "csv")
+
+    report = asyncio.run(import_requests(FakeSession([[stale]]), rows, actor_id=7, provider=FakeProvider(), chunk_size=10, concurrency=1))
+
+    assert report.aml_checks_reused == 0 and report.aml_checks_run == 1
+    assert report.rows[0].aml_check_id != stale.check_id
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.etag import etag_matches, history_etag, request_etag
+from app.api.routes_requests import build_version_query
+from app.db.models import RequestStatus, UserRole
+from tests.fakes import FakeSession, asgi_get, fake_payment
+
+
+def test_etag_matching_is_weak_and_handles_lists():
+    etag = 'W/"abc-1"'
+    assert etag_matches('W/"abc-1"', etag)
+    assert etag_matches('"abc-1"', etag)
+    assert etag_matches('W/"zzz", W/"abc-1"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"abc-2"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_request_etag_changes_with_version_and_expand():
+    request_id = uuid4()
+    updated_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    plain = request_etag(request_id, updated_at)
+    assert plain != request_etag(request_id, updated_at.replace(second=1))
+    assert plain != request_etag(request_id, updated_at, {"aml_check"})
+    assert request_etag(request_id, updated_at, {"history"}, 5) != request_etag(request_id, updated_at, {"history"}, 6)
+
+
+def test_version_query_reads_updated_at_and_last_history_id():
+    sql = str(build_version_query(uuid4()).compile(dialect=postgresql.dialect()))
+    assert "payment_requests.updated_at" in sql
+    assert "max(status_history.id)" in sql
+
+
+def test_detail_returns_304_from_version_lookup():
+    item = fake_payment()
+    first = asgi_get(FakeSession([item]), f"/api/v1/requests/{item.id}")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert etag == request_etag(item.id, item.updated_at)
+
+    db = FakeSession([SimpleNamespace(updated_at=item.updated_at, last_history_id=3)])
+    cached = asgi_get(db, f"/api/v1/requests/{item.id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert len(db.executed) == 1
+
+    changed = fake_payment(id=item.id, status=RequestStatus.pending, updated_at=datetime.now(timezone.utc))
+    db = FakeSession([SimpleNamespace(updated_at=changed.updated_at, last_history_id=4), changed])
+    fresh = asgi_get(db, f"/api/v1/requests/{item.id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.json()["status"] == "pending"
+    assert fresh.headers["ETag"] != etag
+
+
+def test_history_returns_304_when_no_new_entries():
+    request_id = uuid4()
+    db = FakeSession([7])
+    response = asgi_get(db, f"/api/v1/requests/{request_id}/history", headers={"If-None-Match": history_etag(request_id, 7)})
+    assert response.status_code == 304
+    assert len(db.executed) == 1
+
+
+def test_detail_with_creator_expanded_is_not_cached():
+    item = fake_payment()
+    user = SimpleNamespace(id=item.creator_id, telegram_id=1, full_name="Manager", role=UserRole.manager)
+    etag = request_etag(item.id, item.updated_at, {"creator"})
+    db = FakeSession([item, [user]])
+    response = asgi_get(db, f"/api/v1/requests/{item.id}?expand=creator", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["creator"]["full_name"] == "Manager"
+    assert "ETag" not in response.headers
+    assert len(db.executed) == 2
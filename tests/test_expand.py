@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.expand import parse_expand
+from app.db.models import RequestStatus, RiskLevel, UserRole
+from tests.fakes import FakeSession, asgi_get, fake_payment
+
+
+def _check(check_id):
+    return SimpleNamespace(
+        id=check_id,
+        address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC",
+        network="TRON",
+        provider="mock",
+        risk_score=12.5,
+        risk_level=RiskLevel.low,
+        categories_json=[{"name": "General", "score": 12.5}],
+        checked_at=datetime.now(timezone.utc),
+    )
+
+
+def _history(request_id, history_id, new_status):
+    return SimpleNamespace(
+        id=history_id,
+        request_id=request_id,
+        old_status=None,
+        new_status=new_status,
+        actor_id=101,
+        reason=None,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def test_parse_expand_rejects_unknown_fields():
+    assert parse_expand("aml_check, history") == {"aml_check", "history"}
+    assert parse_expand(None) == set()
+    with pytest.raises(HTTPException) as exc:
+        parse_expand("aml_check,approver")
+    assert exc.value.status_code == 400
+
+
+def test_list_expand_loads_relations_with_one_query_each():
+    first, second = fake_payment(), fake_payment(creator_id=102)
+    db = FakeSession(
+        [
+            [first, second],
+            [_check(first.aml_check_id), _check(second.aml_check_id)],
+            [_history(first.id, 1, RequestStatus.draft), _history(first.id, 2, RequestStatus.pending)],
+            [SimpleNamespace(id=101, telegram_id=1, full_name="Alice", role=UserRole.manager)],
+        ]
+    )
+
+    response = asgi_get(db, "/api/v1/requests?expand=aml_check,history,creator")
+
+    assert response.status_code == 200
+    assert len(db.executed) == 4
+    first_body, second_body = response.json()
+    assert first_body["aml_check"]["categories"] == [{"name": "General", "score": 12.5}]
+    assert [item["new_status"] for item in first_body["history"]] == ["draft", "pending"]
+    assert second_body["history"] == []
+    assert first_body["creator"]["full_name"] == "Alice"
+    assert second_body["creator"] is None
+
+
+def test_detail_without_expand_keeps_plain_shape():
+    item = fake_payment()
+    db = FakeSession([item])
+
+    response = asgi_get(db, f"/api/v1/requests/{item.id}")
+
+    assert response.status_code == 200
+    assert len(db.executed) == 1
+    assert not {"aml_check", "history", "creator"} & set(response.json())
+
+
+def test_detail_expand_unknown_field_is_400():
+    response = asgi_get(FakeSession([]), f"/api/v1/requests/{uuid4()}?expand=approver")
+    assert response.status_code == 400
@@ -0,0 +1,110 @@
+import asyncio
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.pagination import decode_time_cursor, encode_cursor
+from app.db.models import RequestStatus
+from app.services.export import ExportFilter, build_export_query, export_columns, write_csv, write_parquet
+from tests.fakes import FakeSession, asgi_get
+
+
+def _rows(count: int, start: int = 0) -> list[dict]:
+    rows = []
+    for i in range(start, start + count):
+        created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rows.append(
+            {
+                "id": i,
+                "request_id": str(uuid4()),
+                "request_no": f"PAY-202601-{i:06d}",
+                "old_status": RequestStatus.pending,
+                "new_status": RequestStatus.approved,
+                "actor_id": 1,
+                "reason": None,
+                "created_at": created_at,
+                "cursor": encode_cursor(created_at, i),
+            }
+        )
+    return rows
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect_pieces(stream) -> list[bytes]:
+    return [data async for data in stream]
+
+
+async def _collect(stream) -> bytes:
+    return b"".join(await _collect_pieces(stream))
+
+
+def test_cursor_roundtrip() -> None:
+    created_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    row_id = uuid4()
+
+    assert decode_time_cursor(encode_cursor(created_at, row_id)) == (created_at, str(row_id))
+
+
+def test_invalid_cursor_rejected() -> None:
+    with pytest.raises(ValueError):
+        decode_time_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        build_export_query("requests", ExportFilter(after="not-a-cursor"))
+    response = asgi_get(FakeSession([]), "/api/v1/export/requests?after=not-a-cursor")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_export_query_uses_keyset_and_filters() -> None:
+    cursor = encode_cursor(datetime(2026, 1, 1, tzinfo=timezone.utc), uuid4())
+    stmt = build_export_query("requests", ExportFilter(status=RequestStatus.paid, after=cursor))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "JOIN wallet_checks" in sql
+    assert "(payment_requests.created_at, payment_requests.id) >" in sql
+    assert "ORDER BY payment_requests.created_at ASC, payment_requests.id ASC" in sql
+
+
+def test_audit_export_rejects_status_filter() -> None:
+    with pytest.raises(ValueError):
+        build_export_query("audit", ExportFilter(status=RequestStatus.paid))
+
+
+def test_write_csv_streams_one_piece_per_chunk() -> None:
+    columns = export_columns("history")
+    pieces = asyncio.run(_collect_pieces(write_csv(_chunks(_rows(2), _rows(3, start=2)), columns)))
+
+    assert len(pieces) == 2
+    lines = b"".join(pieces).decode().splitlines()
+    assert lines[0].split(",") == columns
+    assert len(lines) == 6
+    assert ",approved," in lines[1]
+
+
+def test_write_parquet_roundtrip() -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = asyncio.run(_collect(write_parquet(_chunks(_rows(2), _rows(3, start=2)), "history")))
+
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 5
+    assert table.num_columns == len(export_columns("history"))
+    assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == 2
+    assert table.column("new_status").to_pylist()[0] == "approved"
+
+
+def test_decimal_amounts_survive_parquet() -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    row = {name: None for name in export_columns("requests")}
+    row.update(id=uuid4(), amount=Decimal("12.345678901234567890"), created_at=created_at, cursor="c")
+    data = asyncio.run(_collect(write_parquet(_chunks([row]), "requests")))
+
+    assert pq.read_table(io.BytesIO(data)).column("amount").to_pylist() == [Decimal("12.345678901234567890")]
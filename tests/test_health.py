@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, exc, text
+
+from app.api.routes_aml import run_aml_check
+from app.api.schemas import AmlCheckRequest
+from app.db.models import UserRole
+from app.services import health
+from app.services.aml_provider import AmlProviderUnavailable, ProbedAmlProvider
+from app.services.health import CircuitBreaker, LatencyWindow, readiness
+from tests.fakes import FakeProvider, FakeSession
+
+
+class FailingProvider:
+    provider_name = "http"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def check(self, address, network):
+        self.calls += 1
+        raise TimeoutError("vendor timed out")
+
+
+def test_latency_window_p95_drops_old_samples(monkeypatch):
+    window = LatencyWindow(window_s=10)
+    now = [1000.0]
+    monkeypatch.setattr(health.time, "monotonic", lambda: now[0])
+    for value in range(1, 101):
+        window.record(float(value))
+    assert window.p95() == 96.0
+
+    now[0] += 11
+    assert window.p95() is None
+
+
+def test_circuit_breaker_opens_and_allows_one_trial(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(health.time, "monotonic", lambda: now[0])
+    circuit = CircuitBreaker(failure_threshold=2, reset_timeout_s=30)
+
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.closed
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.open
+    assert not circuit.allow()
+
+    now[0] = 31
+    assert circuit.state == CircuitBreaker.half_open
+    assert circuit.allow()
+    assert not circuit.allow()
+    circuit.record_success()
+    assert circuit.state == CircuitBreaker.closed
+
+
+def test_probed_provider_short_circuits_after_failures():
+    inner = FailingProvider()
+    provider = ProbedAmlProvider(inner, CircuitBreaker(failure_threshold=2, reset_timeout_s=60), LatencyWindow())
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            asyncio.run(provider.check("T1", "TRON"))
+    with pytest.raises(AmlProviderUnavailable):
+        asyncio.run(provider.check("T1", "TRON"))
+    assert inner.calls == 2
+
+
+def test_cancelled_trial_call_releases_half_open_circuit():
+    # reset_timeout_s=0 makes the circuit half-open straight away without freezing the event loop's clock.
+    circuit = CircuitBreaker(failure_threshold=1, reset_timeout_s=0)
+    circuit.record_failure()
+
+    class HangingProvider(FailingProvider):
+        async def check(self, address: str, network: str):
+            await asyncio.sleep(10)
+
+    provider = ProbedAmlProvider(HangingProvider(), circuit, LatencyWindow())
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(provider.check("T1", "TRON"), timeout=0.01))
+    assert circuit.state == CircuitBreaker.half_open
+    assert circuit.allow()
+
+
+def test_aml_check_returns_503_when_circuit_open(monkeypatch):
+    circuit = CircuitBreaker(failure_threshold=1, reset_timeout_s=60)
+    circuit.record_failure()
+    provider = ProbedAmlProvider(FakeProvider(), circuit, LatencyWindow())
+    monkeypatch.setattr("app.api.routes_aml.get_aml_provider", lambda: provider)
+    payload = AmlCheckRequest(address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC", network="TRON")
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run_aml_check(payload=payload, db=FakeSession([]), actor_id=1, actor_role=UserRole.manager))
+    assert exc.value.status_code == 503
+
+
+def _engine_with_pool(checked_out: int):
+    pool = SimpleNamespace(checkedout=lambda: checked_out)
+    return SimpleNamespace(sync_engine=SimpleNamespace(pool=pool))
+
+
+def test_readiness_reports_thresholds(monkeypatch):
+    monkeypatch.setattr(health, "db_latency", LatencyWindow())
+    monkeypatch.setattr(health, "provider_latency", LatencyWindow())
+    monkeypatch.setattr(health, "_provider_circuit", CircuitBreaker(failure_threshold=1, reset_timeout_s=60))
+
+    ok, body = readiness(True, _engine_with_pool(2))
+    assert ok
+    assert body["status"] == "ready"
+    assert body["db_pool"] == {"in_use": 2, "capacity": 15, "utilization": 0.133}
+
+    health.db_latency.record(900.0)
+    health.get_provider_circuit().record_failure()
+    ok, body = readiness(False, _engine_with_pool(14))
+    assert not ok
+    assert body["reasons"] == ["warming_up", "db_pool_saturated", "db_slow", "provider_circuit_open"]
+    assert body["db_p95_ms"] == 900.0
+    assert body["provider_circuit"] == "open"
+
+
+def test_failed_statements_are_timed_and_do_not_leak_start_times(monkeypatch):
+    window = LatencyWindow()
+    monkeypatch.setattr(health, "db_latency", window)
+    engine = create_engine("sqlite://")
+    health.instrument_engine(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        for _ in range(3):
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["query_started_at"] == []
+    assert len(window._samples) == 4
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.schemas import DecisionPayload
+from app.services.idempotency import IdempotencyStore, request_fingerprint
+from tests.fakes import FakeSession
+
+
+def _store() -> IdempotencyStore:
+    return IdempotencyStore(ttl_s=60, cache_ttl_s=60, wait_timeout_s=1, poll_interval_s=0.01)
+
+
+class CountingHandler:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls = 0
+        self._delay = delay
+
+    async def __call__(self) -> DecisionPayload:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return DecisionPayload(reason=f"call-{self.calls}")
+
+
+def test_replays_from_hot_tier_without_db_or_handler() -> None:
+    async def scenario():
+        store, handler = _store(), CountingHandler()
+        payload = DecisionPayload(reason="x")
+        # select -> no row, claim -> returns key, update -> stored
+        db = FakeSession([None, "key"])
+        first = await store.run(db, 1, "POST /x", "k1", payload, DecisionPayload, handler)
+        executed = len(db.executed)
+        second = await store.run(db, 1, "POST /x", "k1", payload, DecisionPayload, handler)
+        return first, second, handler.calls, executed, len(db.executed)
+
+    first, second, calls, executed_before, executed_after = asyncio.run(scenario())
+    assert first == second
+    assert calls == 1
+    assert executed_before == executed_after == 3
+
+
+def test_concurrent_duplicates_wait_for_first_execution() -> None:
+    async def scenario():
+        store, handler = _store(), CountingHandler(delay=0.05)
+        payload = DecisionPayload(reason="x")
+        results = await asyncio.gather(
+            store.run(FakeSession([None, "key"]), 1, "POST /x", "k1", payload, DecisionPayload, handler),
+            store.run(FakeSession([]), 1, "POST /x", "k1", payload, DecisionPayload, handler),
+        )
+        return results, handler.calls
+
+    (first, second), calls = asyncio.run(scenario())
+    assert calls == 1
+    assert first == second
+
+
+def test_replays_stored_response_from_database() -> None:
+    payload = DecisionPayload(reason="x")
+    row = SimpleNamespace(fingerprint=request_fingerprint(payload), response_json={"reason": "stored"})
+    handler = CountingHandler()
+
+    res = asyncio.run(_store().run(FakeSession([row]), 1, "POST /x", "k1", payload, DecisionPayload, handler))
+    assert res.reason == "stored"
+    assert handler.calls == 0
+
+
+def test_key_reuse_with_different_payload_rejected() -> None:
+    row = SimpleNamespace(fingerprint=request_fingerprint(DecisionPayload(reason="a")), response_json={"reason": "a"})
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(_store().run(FakeSession([row]), 1, "POST /x", "k1", DecisionPayload(reason="b"), DecisionPayload, CountingHandler()))
+    assert exc.value.status_code == 422
+
+
+def test_failed_execution_releases_key() -> None:
+    async def failing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    async def scenario():
+        store = _store()
+        db = FakeSession([None, "key"])
+        with pytest.raises(HTTPException):
+            await store.run(db, 1, "POST /x", "k1", None, DecisionPayload, failing)
+        retry = await store.run(FakeSession([None, "key"]), 1, "POST /x", "k1", None, DecisionPayload, CountingHandler())
+        return db, retry
+
+    db, retry = asyncio.run(scenario())
+    assert "DELETE FROM idempotency_keys" in str(db.executed[-1])
+    assert retry.reason == "call-1"
+
+
+def test_claim_is_a_lease_extended_when_the_response_is_stored() -> None:
+    store = IdempotencyStore(ttl_s=86400, cache_ttl_s=60, wait_timeout_s=30, lease_s=120, poll_interval_s=0.01)
+    db = FakeSession([None, "key", 1])
+    started = datetime.now(timezone.utc)
+    asyncio.run(store.run(db, 1, "POST /x", "k1", None, DecisionPayload, CountingHandler()))
+
+    claim = db.executed[1].compile(dialect=postgresql.dialect()).params
+    stored = db.executed[2].compile(dialect=postgresql.dialect()).params
+    assert timedelta(seconds=119) < claim["expires_at"] - started < timedelta(seconds=121)
+    assert stored["expires_at"] - started > timedelta(hours=23)
+
+
+def test_handler_outliving_its_lease_does_not_overwrite_the_new_claim(caplog) -> None:
+    store = IdempotencyStore(ttl_s=60, cache_ttl_s=60, wait_timeout_s=1, lease_s=0.01, poll_interval_s=0.01)
+    # The lease runs out while the handler sleeps and another worker re-claims the key, so the update matches nothing.
+    db = FakeSession([None, "key", 0])
+    result = asyncio.run(store.run(db, 1, "POST /x", "k1", None, DecisionPayload, CountingHandler(delay=0.05)))
+
+    assert result.reason == "call-1"
+    claim = db.executed[1].compile(dialect=postgresql.dialect()).params
+    update_sql = db.executed[2].compile(dialect=postgresql.dialect())
+    assert "idempotency_keys.claim_token = " in str(update_sql)
+    assert claim["claim_token"] in update_sql.params.values()
+    assert "lease" in caplog.text
+
+
+def test_release_only_deletes_its_own_claim() -> None:
+    async def failing():
+        raise RuntimeError("boom")
+
+    db = FakeSession([None, "key"])
+    with pytest.raises(RuntimeError):
+        asyncio.run(_store().run(db, 1, "POST /x", "k1", None, DecisionPayload, failing))
+    claim = db.executed[1].compile(dialect=postgresql.dialect()).params
+    delete_sql = db.executed[2].compile(dialect=postgresql.dialect())
+    assert "idempotency_keys.claim_token = " in str(delete_sql)
+    assert claim["claim_token"] in delete_sql.params.values()
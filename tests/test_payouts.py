@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import PayoutBatchStatus, RequestStatus, UserRole
+from app.services.payouts import SettleLine, create_batch, read_settle_lines, settle_batch
+from app.services.stats import bump_transition_stats
+from tests.fakes import FakeSession, asgi_get
+
+HASH_A, HASH_B, HASH_C = "a" * 64, "b" * 64, "c" * 64
+
+
+async def _chunks(data: bytes):
+    yield data
+
+
+def _lines(data: bytes, fmt: str = "csv"):
+    return asyncio.run(read_settle_lines(_chunks(data), fmt, 10_000, 100))
+
+
+def _batch():
+    return SimpleNamespace(id=uuid4(), status=PayoutBatchStatus.open)
+
+
+def test_settlement_file_rows_are_validated() -> None:
+    data = (
+        "request_no,tx_hash\n"
+        f"PAY-1,0x{HASH_A.upper()}\n"
+        "PAY-2,not-a-hash\n"
+        f"PAY-1,{HASH_B}\n"
+        f"PAY-3,{HASH_A}\n"
+        f",{HASH_C}\n"
+    ).encode()
+    lines = _lines(data)
+    assert (lines[0].request_no, lines[0].tx_hash, lines[0].error) == ("PAY-1", HASH_A, None)
+    assert [line.error for line in lines[1:]] == [
+        "tx_hash: expected 64 hex characters",
+        "Duplicate request_no in file",
+        "Duplicate tx_hash in file",
+        "request_no: missing",
+    ]
+
+
+def test_settle_batch_updates_a_chunk_in_one_statement() -> None:
+    batch = _batch()
+    ids = [uuid4() for _ in range(4)]
+    lookup = [
+        SimpleNamespace(request_no="PAY-1", request_id=ids[0], status=RequestStatus.approved, tx_hash=None),
+        SimpleNamespace(request_no="PAY-2", request_id=ids[1], status=RequestStatus.paid, tx_hash=HASH_B),
+        SimpleNamespace(request_no="PAY-3", request_id=ids[2], status=RequestStatus.approved, tx_hash=None),
+        SimpleNamespace(request_no="PAY-4", request_id=ids[3], status=RequestStatus.rejected, tx_hash=None),
+    ]
+    updated = [SimpleNamespace(id=ids[0], creator_id=7, amount=Decimal("5"), created_at=datetime.now(timezone.utc))]
+    closed_id = batch.id
+    db = FakeSession([lookup, [HASH_C], updated, None, None, None, closed_id])
+    lines = [
+        SettleLine(2, "PAY-1", HASH_A),
+        SettleLine(3, "PAY-2", HASH_B),
+        SettleLine(4, "PAY-3", HASH_C),
+        SettleLine(5, "PAY-4", "d" * 64),
+        SettleLine(6, "PAY-9", "e" * 64),
+        SettleLine(7, error="tx_hash: expected 64 hex characters"),
+    ]
+
+    report = asyncio.run(settle_batch(db, batch, lines, actor_id=1, chunk_size=500))
+
+    assert [row.status for row in report.rows] == ["settled", "already_settled", "failed", "failed", "failed", "failed"]
+    assert [row.error for row in report.rows[2:5]] == [
+        "tx_hash already used by another request",
+        "Request is rejected",
+        "Not in this batch",
+    ]
+    assert (report.settled, report.already_settled, report.failed) == (1, 1, 4)
+    assert report.batch_status == PayoutBatchStatus.settled
+    update_sql = str(db.executed[2].compile(dialect=postgresql.dialect()))
+    assert update_sql.startswith("UPDATE payment_requests SET") and "FROM (VALUES" in update_sql
+    assert "updated_at=now()" in update_sql
+    assert "payment_requests_archive" in str(db.executed[1])
+
+
+def test_settle_batch_reports_concurrently_changed_rows() -> None:
+    batch = _batch()
+    lookup = [SimpleNamespace(request_no="PAY-1", request_id=uuid4(), status=RequestStatus.approved, tx_hash=None)]
+    db = FakeSession([lookup, [], [], None])
+
+    report = asyncio.run(settle_batch(db, batch, [SettleLine(2, "PAY-1", HASH_A)], actor_id=1, chunk_size=500))
+
+    assert report.rows[0].error == "Request changed while settling"
+    assert report.batch_status == PayoutBatchStatus.open
+
+
+def test_create_batch_without_candidates_returns_none() -> None:
+    assert asyncio.run(create_batch(FakeSession([]), actor_id=1, request_ids=None, max_size=10)) is None
+
+
+def test_transition_stats_fold_requests_per_creator_and_day() -> None:
+    db = FakeSession([])
+    created = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    requests = [SimpleNamespace(created_at=created, creator_id=7, amount=Decimal(amount)) for amount in ("1", "2")]
+
+    asyncio.run(bump_transition_stats(db, requests, RequestStatus.approved, RequestStatus.paid))
+
+    params = db.executed[0].compile(dialect=postgresql.dialect()).params
+    assert (params["status_m0"], params["request_count_m0"], params["total_amount_m0"]) == (RequestStatus.approved, -2, Decimal("-3"))
+    assert (params["status_m1"], params["request_count_m1"], params["total_amount_m1"]) == (RequestStatus.paid, 2, Decimal("3"))
+
+
+def test_export_lists_unpaid_items_as_csv() -> None:
+    batch = SimpleNamespace(id=uuid4())
+    rows = [("PAY-1", "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC", "TRON", "USDT", Decimal("10.5"))]
+    res = asgi_get(FakeSession([batch, rows]), f"/api/v1/payout-batches/{batch.id}/export", role=UserRole.head)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert res.text.splitlines() == ["request_no,address,network,asset,amount", "PAY-1,TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC,TRON,USDT,10.5"]
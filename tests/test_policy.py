@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.routes_requests import submit_request
+from app.db.models import RequestStatus, RiskLevel, StatusHistory, UserRole
+from app.services.policy import ApprovalFacts, ApprovalPolicy, PolicyError, ReloadingPolicy
+from tests.fakes import FakeSession, fake_payment
+
+RULES = [
+    {"name": "small-usdt-low-risk", "assets": ["USDT"], "max_amount": "100", "risk_levels": ["low"], "deny_categories": ["Sanctions"]},
+    {"name": "analyst-medium", "max_amount": "20", "risk_levels": ["low", "medium"], "creator_roles": ["analyst"], "max_category_score": 50},
+]
+
+
+def _facts(**overrides):
+    values = dict(
+        asset="USDT",
+        amount=Decimal("20"),
+        risk_level=RiskLevel.low,
+        risk_score=10.0,
+        categories=(("General", 10.0),),
+        creator_role=UserRole.manager,
+    )
+    values.update(overrides)
+    return ApprovalFacts(**values)
+
+
+def test_policy_picks_first_matching_rule():
+    policy = ApprovalPolicy(RULES)
+    assert policy.evaluate(_facts()) == "small-usdt-low-risk"
+    assert policy.evaluate(_facts(amount=Decimal("100.01"))) is None
+    assert policy.evaluate(_facts(categories=(("Sanctions", 5.0),))) is None
+    assert policy.evaluate(_facts(risk_level=RiskLevel.medium)) is None
+    assert policy.evaluate(_facts(risk_level=RiskLevel.medium, creator_role=UserRole.analyst)) == "analyst-medium"
+    assert policy.evaluate(_facts(asset="TRX", creator_role=UserRole.analyst)) == "analyst-medium"
+    assert policy.evaluate(_facts(risk_level=RiskLevel.high, creator_role=UserRole.analyst)) is None
+
+
+def test_policy_rejects_invalid_rules():
+    with pytest.raises(PolicyError):
+        ApprovalPolicy([{"name": "typo", "max_amout": "10"}])
+    with pytest.raises(PolicyError):
+        ApprovalPolicy([{"name": "bad-level", "risk_levels": ["none"]}])
+    with pytest.raises(PolicyError):
+        ApprovalPolicy([{"name": "unbounded-high", "risk_levels": ["low", "high"]}])
+    assert not ApprovalPolicy([])
+
+
+def test_rule_without_risk_levels_never_approves_high_risk():
+    policy = ApprovalPolicy([{"name": "small", "max_amount": "100"}])
+    assert policy.evaluate(_facts()) == "small"
+    for role in UserRole:
+        assert policy.evaluate(_facts(risk_level=RiskLevel.high, creator_role=role)) is None
+        assert policy.evaluate(_facts(risk_level=RiskLevel.medium, creator_role=role)) is None
+    bounded = ApprovalPolicy([{"name": "high-bounded", "risk_levels": ["high"], "max_risk_score": 80}])
+    assert bounded.evaluate(_facts(risk_level=RiskLevel.high, risk_score=70.0)) == "high-bounded"
+
+
+def test_reloading_policy_picks_up_edits_and_keeps_last_good(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"rules": RULES[:1]}))
+    reloading = ReloadingPolicy(str(path), check_interval_s=0)
+    assert reloading.current().rule_names == ["small-usdt-low-risk"]
+
+    path.write_text(json.dumps({"rules": RULES}))
+    os.utime(path, ns=(1, 10**18))
+    assert reloading.current().rule_names == ["small-usdt-low-risk", "analyst-medium"]
+
+    path.write_text("{not json")
+    os.utime(path, ns=(1, 2 * 10**18))
+    assert reloading.current().rule_names == ["small-usdt-low-risk", "analyst-medium"]
+
+
+def test_submit_auto_approves_when_policy_matches(monkeypatch):
+    monkeypatch.setattr("app.api.routes_requests.get_approval_policy", lambda: ApprovalPolicy(RULES))
+    item = fake_payment(risk_escalated_at=None)
+    facts = SimpleNamespace(
+        risk_level=RiskLevel.low,
+        risk_score=10,
+        categories_json=[{"name": "General", "score": 10}],
+        checked_at=datetime.now(timezone.utc),
+        role=UserRole.manager,
+    )
+    db = FakeSession([item, None, facts])
+
+    res = asyncio.run(submit_request(request_id=item.id, db=db, actor_id=101, actor_role=UserRole.manager))
+
+    assert res.status == RequestStatus.approved
+    assert item.approved_by is None
+    history = [row for row in db.added if isinstance(row, StatusHistory)]
+    assert [(row.new_status, row.actor_id, row.reason) for row in history] == [
+        (RequestStatus.pending, 101, "submitted"),
+        (RequestStatus.approved, None, "policy:small-usdt-low-risk"),
+    ]
+
+
+def test_submit_stays_pending_for_escalated_request(monkeypatch):
+    monkeypatch.setattr("app.api.routes_requests.get_approval_policy", lambda: ApprovalPolicy(RULES))
+    item = fake_payment(risk_escalated_at=datetime.now(timezone.utc))
+    db = FakeSession([item])
+
+    res = asyncio.run(submit_request(request_id=item.id, db=db, actor_id=101, actor_role=UserRole.manager))
+    assert res.status == RequestStatus.pending
+
+
+def test_submit_stays_pending_for_stale_or_foreign_check(monkeypatch):
+    monkeypatch.setattr("app.api.routes_requests.get_approval_policy", lambda: ApprovalPolicy(RULES))
+    stale = SimpleNamespace(
+        risk_level=RiskLevel.low,
+        risk_score=10,
+        categories_json=[],
+        checked_at=datetime.now(timezone.utc) - timedelta(days=30),
+        role=UserRole.manager,
+    )
+    for facts in (stale, None):
+        item = fake_payment(risk_escalated_at=None)
+        db = FakeSession([item, None, facts])
+        res = asyncio.run(submit_request(request_id=item.id, db=db, actor_id=101, actor_role=UserRole.manager))
+        assert res.status == RequestStatus.pending
+    sql = str(db.executed[2])
+    assert "wallet_checks.address = :address_1 AND wallet_checks.network = :network_1" in sql
@@ -0,0 +1,186 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes_aml import run_aml_check
+from app.api.schemas import AmlCheckRequest
+from app.db.models import UserRole
+from app.services import rate_limit
+from app.services.aml_provider import AmlProviderThrottled, AmlProviderUnavailable, RateLimitedAmlProvider, parse_retry_after
+from app.services.rate_limit import (
+    DailyQuota,
+    Priority,
+    PriorityLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+    consume_daily_quota,
+    seconds_until_utc_midnight,
+    use_priority,
+)
+from tests.fakes import FakeProvider, FakeSession
+
+TIMEOUTS = {Priority.interactive: 5.0, Priority.batch: 5.0, Priority.rescreen: 5.0}
+
+
+def test_token_bucket_refills_and_pauses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate_per_s=2, burst=2)
+
+    assert bucket.take(now[0]) and bucket.take(now[0])
+    assert not bucket.take(now[0])
+    assert bucket.wait_time(now[0]) == pytest.approx(0.5)
+
+    now[0] += 0.5
+    assert bucket.take(now[0])
+
+    bucket.pause(3)
+    now[0] += 2
+    assert not bucket.take(now[0])
+    assert bucket.wait_time(now[0]) == pytest.approx(1.5)
+    now[0] += 1.5
+    assert bucket.take(now[0])
+
+
+def test_limiter_serves_interactive_before_queued_background_work():
+    async def scenario():
+        limiter = PriorityLimiter(TokenBucket(rate_per_s=50, burst=1))
+        await limiter.acquire(Priority.interactive, 1)
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire(priority, 1)
+            order.append(name)
+
+        rescreen = asyncio.create_task(call("rescreen", Priority.rescreen))
+        batch = asyncio.create_task(call("batch", Priority.batch))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("interactive", Priority.interactive))
+        await asyncio.gather(rescreen, batch, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "batch", "rescreen"]
+
+
+def test_limiter_rejects_when_deadline_cannot_be_met():
+    async def scenario():
+        limiter = PriorityLimiter(TokenBucket(rate_per_s=1, burst=1))
+        await limiter.acquire(Priority.interactive, 1)
+        await limiter.acquire(Priority.batch, 0.1)
+
+    with pytest.raises(RateLimitExceeded) as exc:
+        asyncio.run(scenario())
+    assert exc.value.retry_after_s == pytest.approx(1, abs=0.05)
+
+
+class ThrottlingProvider:
+    provider_name = "http"
+
+    def __init__(self, throttles, retry_after_s):
+        self.throttles = throttles
+        self.retry_after_s = retry_after_s
+        self.calls = 0
+
+    async def check(self, address, network):
+        self.calls += 1
+        if self.calls <= self.throttles:
+            raise AmlProviderThrottled(self.retry_after_s)
+        return await FakeProvider().check(address, network)
+
+
+def test_rate_limited_provider_retries_after_vendor_429():
+    inner = ThrottlingProvider(throttles=1, retry_after_s=0.05)
+    provider = RateLimitedAmlProvider(inner, PriorityLimiter(TokenBucket(100, 5)), None, TIMEOUTS)
+
+    result = asyncio.run(provider.check("T1", "TRON"))
+    assert result[0] == 12.5
+    assert inner.calls == 2
+
+
+def test_rate_limited_provider_gives_up_when_retry_after_exceeds_deadline():
+    inner = ThrottlingProvider(throttles=1, retry_after_s=60)
+    provider = RateLimitedAmlProvider(inner, PriorityLimiter(TokenBucket(100, 5)), None, TIMEOUTS)
+
+    with pytest.raises(AmlProviderUnavailable) as exc:
+        asyncio.run(provider.check("T1", "TRON"))
+    assert exc.value.retry_after_s == 60
+    assert inner.calls == 1
+
+
+def test_daily_quota_keeps_reserve_for_interactive_checks():
+    used = {}
+
+    async def consume(provider, day, limit):
+        if used.get(provider, 0) >= limit:
+            return False
+        used[provider] = used.get(provider, 0) + 1
+        return True
+
+    quota = DailyQuota("http", limit=10, interactive_reserve=0.2, consume=consume)
+    provider = RateLimitedAmlProvider(FakeProvider(), PriorityLimiter(TokenBucket(0, 1)), quota, TIMEOUTS)
+
+    async def scenario():
+        with use_priority(Priority.rescreen):
+            for _ in range(8):
+                await provider.check("T1", "TRON")
+            with pytest.raises(AmlProviderUnavailable):
+                await provider.check("T1", "TRON")
+        for _ in range(2):
+            await provider.check("T1", "TRON")
+        with pytest.raises(AmlProviderUnavailable) as exc:
+            await provider.check("T1", "TRON")
+        return exc.value
+
+    exhausted = asyncio.run(scenario())
+    assert used["http"] == 10
+    assert 0 < exhausted.retry_after_s <= 86400
+
+
+def test_queue_rejection_does_not_spend_daily_quota():
+    used = []
+
+    async def consume(provider, day, limit):
+        used.append(provider)
+        return True
+
+    quota = DailyQuota("http", limit=10, consume=consume)
+    # One token, no refill: the second check cannot be admitted before its deadline.
+    provider = RateLimitedAmlProvider(FakeProvider(), PriorityLimiter(TokenBucket(0.001, 1)), quota, TIMEOUTS)
+
+    async def scenario():
+        await provider.check("T1", "TRON")
+        with pytest.raises(AmlProviderUnavailable):
+            await provider.check("T1", "TRON")
+
+    asyncio.run(scenario())
+    assert used == ["http"]
+
+
+def test_zero_daily_limit_admits_nothing():
+    assert asyncio.run(consume_daily_quota("http", datetime(2026, 10, 19).date(), 0)) is False
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) == 1.0
+    assert parse_retry_after("soon") == 1.0
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT") == 0.0
+    assert seconds_until_utc_midnight(datetime(2026, 3, 1, 23, 59, 30, tzinfo=timezone.utc)) == 30.0
+
+
+def test_aml_check_returns_retry_after_when_rate_limited(monkeypatch):
+    class LimitedProvider:
+        provider_name = "http"
+
+        async def check(self, address, network):
+            raise AmlProviderUnavailable("AML provider daily quota is exhausted", retry_after_s=12.2)
+
+    monkeypatch.setattr("app.api.routes_aml.get_aml_provider", lambda: LimitedProvider())
+    payload = AmlCheckRequest(address="TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC", network="TRON")
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run_aml_check(payload=payload, db=FakeSession([]), actor_id=1, actor_role=UserRole.manager))
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "13"}
@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+import os
+from datetime import datetime
+
+import pytest
+
+from app.services.request_numbers import RequestNumberAllocator, build_request_no
+
+
+class InMemoryCounter:
+    def __init__(self) -> None:
+        self.rows: dict[str, int] = {}
+        self.calls = 0
+
+    async def __call__(self, period: str, size: int) -> int:
+        self.calls += 1
+        await asyncio.sleep(0)
+        self.rows[period] = self.rows.get(period, 1) + size
+        return self.rows[period]
+
+
+def test_build_request_no_format() -> None:
+    assert build_request_no(42, datetime(2026, 3, 5)) == "PAY-202603-000042"
+    assert build_request_no(1234567, datetime(2026, 3, 5)) == "PAY-202603-1234567"
+
+
+def test_allocator_serves_block_from_memory() -> None:
+    counter = InMemoryCounter()
+    allocator = RequestNumberAllocator(block_size=10, reserve=counter)
+    now = datetime(2026, 3, 5)
+
+    numbers = asyncio.run(_take(allocator, 25, now))
+    assert numbers[0] == "PAY-202603-000001"
+    assert numbers == sorted(numbers)
+    assert counter.calls == 3
+
+
+def test_allocators_sharing_a_counter_never_collide() -> None:
+    counter = InMemoryCounter()
+    allocators = [RequestNumberAllocator(block_size=7, reserve=counter) for _ in range(4)]
+    now = datetime(2026, 3, 5)
+
+    async def scenario():
+        return await asyncio.gather(*(_take(allocator, 50, now) for allocator in allocators))
+
+    per_worker = asyncio.run(scenario())
+    flat = [number for numbers in per_worker for number in numbers]
+    assert len(flat) == len(set(flat)) == 200
+    assert all(numbers == sorted(numbers) for numbers in per_worker)
+
+
+def test_new_month_starts_new_sequence() -> None:
+    allocator = RequestNumberAllocator(block_size=10, reserve=InMemoryCounter())
+
+    async def scenario():
+        return await allocator.next(datetime(2026, 3, 31)), await allocator.next(datetime(2026, 4, 1))
+
+    assert asyncio.run(scenario()) == ("PAY-202603-000001", "PAY-202604-000001")
+
+
+async def _take(allocator: RequestNumberAllocator, count: int, now: datetime) -> list[str]:
+    return [await allocator.next(now) for _ in range(count)]
+
+
+def _allocate_in_process(database_url: str, count: int, queue) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    from app.services.request_numbers import RequestNumberAllocator
+
+    allocator = RequestNumberAllocator(block_size=5)
+    queue.put(asyncio.run(_take(allocator, count, datetime(2099, 1, 1))))
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="needs TEST_DATABASE_URL pointing at a migrated Postgres")
+def test_allocation_is_collision_free_across_processes() -> None:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    workers = [ctx.Process(target=_allocate_in_process, args=(os.environ["TEST_DATABASE_URL"], 40, queue)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    results = [queue.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+
+    flat = [number for numbers in results for number in numbers]
+    assert len(flat) == len(set(flat)) == 160
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import AuditLog, RequestStatus, RiskLevel, WalletCheck
+from app.services.rate_limit import Priority, current_priority
+from app.services.rescreen import build_stale_query, rescreen_stale
+from tests.fakes import FakeProvider, FakeSession
+
+ADDRESS = "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"
+OTHER = "TFdmunXgDcvwVo9pkfktDc2m4DHqTYmsE1"
+
+
+def _target(address: str, risk_level: RiskLevel):
+    old_check = SimpleNamespace(id=uuid4(), risk_level=risk_level)
+    request = SimpleNamespace(
+        id=uuid4(), address=address, network="TRON", status=RequestStatus.pending, aml_check_id=old_check.id, risk_escalated_at=None
+    )
+    return request, old_check
+
+
+class RecordingProvider(FakeProvider):
+    def __init__(self, levels):
+        self.levels = levels
+        self.calls = []
+
+    async def check(self, address, network):
+        self.calls.append((address, current_priority()))
+        score, _, categories, report = await super().check(address, network)
+        return score, self.levels[address], categories, report
+
+
+def test_stale_query_targets_in_flight_requests_by_check_age():
+    sql = str(build_stale_query(datetime(2026, 3, 1, tzinfo=timezone.utc), 100).compile(dialect=postgresql.dialect()))
+    assert "JOIN wallet_checks ON wallet_checks.id = payment_requests.aml_check_id" in sql
+    assert "payment_requests.status IN" in sql
+    assert "wallet_checks.checked_at <" in sql
+
+
+def test_rescreen_dedupes_addresses_links_checks_and_flags_escalations():
+    first, second, other = _target(ADDRESS, RiskLevel.low), _target(ADDRESS, RiskLevel.high), _target(OTHER, RiskLevel.low)
+    provider = RecordingProvider({ADDRESS: RiskLevel.high, OTHER: RiskLevel.low})
+    live_ids = [first[0].id, second[0].id, other[0].id]
+    # Per address: the FOR UPDATE re-select, then the latest-check upsert and the risk stats bump.
+    db = FakeSession([[first, second, other], live_ids, None, None, live_ids, None, None])
+
+    result = asyncio.run(rescreen_stale(db, provider, timedelta(hours=72), limit=100, concurrency=2))
+
+    assert sorted(address for address, _ in provider.calls) == sorted([ADDRESS, OTHER])
+    assert {priority for _, priority in provider.calls} == {Priority.rescreen}
+    assert (result.requests, result.addresses, result.checked, result.escalated, result.failed) == (3, 2, 2, 1, 0)
+
+    checks = {check.address: check for check in db.added if isinstance(check, WalletCheck)}
+    assert first[0].aml_check_id == second[0].aml_check_id == checks[ADDRESS].id
+    assert other[0].aml_check_id == checks[OTHER].id
+    assert first[0].risk_escalated_at is not None
+    assert second[0].risk_escalated_at is None
+    audits = [row for row in db.added if isinstance(row, AuditLog)]
+    assert [row.entity_id for row in audits] == [str(first[0].id)]
+    assert audits[0].payload_json["new_risk_level"] == "high"
+
+
+def test_rescreen_keeps_old_link_when_vendor_fails():
+    class DownProvider:
+        provider_name = "http"
+
+        async def check(self, address, network):
+            raise TimeoutError("vendor timed out")
+
+    request, old_check = _target(ADDRESS, RiskLevel.low)
+    db = FakeSession([[(request, old_check)]])
+
+    result = asyncio.run(rescreen_stale(db, DownProvider(), timedelta(hours=72), limit=100, concurrency=2))
+    assert result.failed == 1
+    assert request.aml_check_id == old_check.id
+    assert db.added == []
+
+
+def test_rescreen_skips_requests_that_left_flight_during_the_vendor_call():
+    paid, still_pending = _target(ADDRESS, RiskLevel.low), _target(ADDRESS, RiskLevel.low)
+    provider = RecordingProvider({ADDRESS: RiskLevel.high})
+    db = FakeSession([[paid, still_pending], [still_pending[0].id]])
+
+    result = asyncio.run(rescreen_stale(db, provider, timedelta(hours=72), limit=100, concurrency=2))
+
+    lock_sql = str(db.executed[1].compile(dialect=postgresql.dialect()))
+    assert "payment_requests.status IN" in lock_sql and lock_sql.endswith("FOR UPDATE")
+    assert paid[0].aml_check_id == paid[1].id and paid[0].risk_escalated_at is None
+    assert still_pending[0].aml_check_id != still_pending[1].id
+    assert result.escalated == 1
@@ -0,0 +1,92 @@
+import asyncio
+import subprocess
+import sys
+
+import httpx
+
+from app.services.warmup import warm_up
+
+
+def test_importing_app_main_does_not_build_engine_or_load_httpx():
+    code = (
+        "import sys, app.main\n"
+        "from app.db import session\n"
+        "assert session.engine is None\n"
+        "assert 'httpx' not in sys.modules and 'asyncpg' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+class FakeProvider:
+    provider_name = "fake"
+
+    def __init__(self):
+        self.warmed = 0
+        self.closed = 0
+
+    async def warm_up(self):
+        self.warmed += 1
+
+    async def aclose(self):
+        self.closed += 1
+
+
+def test_health_reports_starting_until_warm_up_finishes(monkeypatch):
+    from app import main
+    from app.config import get_settings
+
+    release = asyncio.Event()
+    provider = FakeProvider()
+
+    async def fake_warm_up(engine, provider_, connections, retry_interval_s):
+        await release.wait()
+
+    monkeypatch.setattr(get_settings(), "warmup_enabled", True)
+    monkeypatch.setattr("app.services.warmup.warm_up", fake_warm_up)
+    monkeypatch.setattr("app.db.session.init_engine", lambda: None)
+    monkeypatch.setattr("app.services.aml_provider._provider", provider)
+
+    async def scenario():
+        app = main.create_app()
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                starting = await client.get("/health")
+                not_ready = await client.get("/ready")
+                release.set()
+                for _ in range(100):
+                    await asyncio.sleep(0)
+                ready = await client.get("/health")
+        return starting, not_ready, ready
+
+    starting, not_ready, ready = asyncio.run(scenario())
+    assert starting.status_code == 503
+    assert not_ready.status_code == 503
+    assert "warming_up" in not_ready.json()["reasons"]
+    assert starting.json() == {"status": "starting"}
+    assert ready.status_code == 200
+    assert provider.closed == 1
+
+
+def test_warm_up_retries_db_then_warms_provider(monkeypatch):
+    attempts = []
+
+    async def flaky_warm_up_db(engine, connections):
+        attempts.append(connections)
+        if len(attempts) < 3:
+            raise OSError("connection refused")
+
+    monkeypatch.setattr("app.services.warmup.warm_up_db", flaky_warm_up_db)
+    provider = FakeProvider()
+    asyncio.run(warm_up(object(), provider, connections=4, retry_interval_s=0))
+
+    assert attempts == [4, 4, 4]
+    assert provider.warmed == 1
+
+
+def test_warm_up_tolerates_provider_failure():
+    class BrokenProvider(FakeProvider):
+        async def warm_up(self):
+            raise httpx.ConnectError("vendor down")
+
+    asyncio.run(warm_up(None, BrokenProvider(), connections=1, retry_interval_s=0))
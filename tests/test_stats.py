@@ -0,0 +1,88 @@
+import asyncio
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes_stats import get_stats
+from app.db.models import RequestStatus, RiskLevel, UserRole
+from app.services.stats import bump_request_stats, bump_risk_stats
+from tests.fakes import FakeSession
+
+
+def _compile(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def test_bump_request_stats_moves_amount_between_statuses() -> None:
+    fake_db = FakeSession([])
+    request = SimpleNamespace(
+        created_at=datetime(2026, 3, 1, 23, 30, tzinfo=timezone.utc),
+        amount=Decimal("25.5"),
+        creator_id=7,
+    )
+
+    asyncio.run(bump_request_stats(fake_db, request, RequestStatus.pending, RequestStatus.approved))
+    compiled = _compile(fake_db.executed[0])
+    assert "ON CONFLICT (day, status, creator_id) DO UPDATE" in str(compiled)
+    params = compiled.params
+    assert params["status_m0"] == RequestStatus.approved
+    assert params["request_count_m0"] == 1
+    assert params["status_m1"] == RequestStatus.pending
+    assert params["total_amount_m1"] == Decimal("-25.5")
+    assert params["day_m0"] == date(2026, 3, 1)
+
+
+def test_bump_request_stats_on_create_only_increments() -> None:
+    fake_db = FakeSession([])
+    request = SimpleNamespace(created_at=None, amount=Decimal("10"), creator_id=7)
+
+    asyncio.run(bump_request_stats(fake_db, request, None, RequestStatus.draft))
+    params = _compile(fake_db.executed[0]).params
+    assert params["request_count_m0"] == 1
+    assert "status_m1" not in params
+
+
+def test_bump_risk_stats_upserts_counter() -> None:
+    fake_db = FakeSession([])
+
+    asyncio.run(bump_risk_stats(fake_db, RiskLevel.high))
+    assert "ON CONFLICT (day, risk_level) DO UPDATE" in str(_compile(fake_db.executed[0]))
+
+
+def test_get_stats_aggregates_rollups() -> None:
+    by_day = [
+        (date(2026, 3, 1), RequestStatus.paid, 2, Decimal("30")),
+        (date(2026, 3, 2), RequestStatus.paid, 1, Decimal("5")),
+        (date(2026, 3, 2), RequestStatus.pending, 4, Decimal("100")),
+    ]
+    by_creator = [(7, 7, Decimal("135"))]
+    risk_levels = [(RiskLevel.low, 10), (RiskLevel.high, 1)]
+    fake_db = FakeSession([by_day, by_creator, risk_levels])
+
+    res = asyncio.run(
+        get_stats(date_from=date(2026, 3, 1), date_to=date(2026, 3, 2), db=fake_db, actor_role=UserRole.head)
+    )
+    totals = {item.status: item for item in res.by_status}
+    assert totals[RequestStatus.paid].request_count == 3
+    assert totals[RequestStatus.paid].total_amount == Decimal("35")
+    assert len(res.by_day) == 3
+    assert res.by_creator[0].creator_id == 7
+    assert res.risk_levels[1].risk_level == RiskLevel.high
+
+
+def test_get_stats_rejects_oversized_range() -> None:
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(
+            get_stats(date_from=date(2024, 1, 1), date_to=date(2026, 1, 1), db=FakeSession([]), actor_role=UserRole.head)
+        )
+    assert exc.value.status_code == 400
+
+
+def test_get_stats_forbidden_for_manager() -> None:
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_stats(date_from=None, date_to=None, db=FakeSession([]), actor_role=UserRole.manager))
+    assert exc.value.status_code == 403
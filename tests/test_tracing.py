@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.services import tracing
+from app.services.tracing import SpanExporter, Tracer, parse_traceparent, span
+from tests.fakes import FakeSession, asgi_get, fake_payment
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def read_spans(path) -> list[dict]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [item for line in lines for item in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+
+def test_spans_nest_under_the_request_and_are_skipped_outside_one(tmp_path):
+    with span("orphan") as orphan:
+        assert orphan is None
+
+    tracer = Tracer(SpanExporter(str(tmp_path / "t.jsonl"), 100, 10_000, 1), sample_rate=0, slow_ms=1000)
+    root = tracer.start_request("GET /x", None)
+    token = tracing._current.set(root)
+    try:
+        with span("outer") as outer:
+            conn = SimpleNamespace(info={})
+            tracing._before_cursor_execute(conn, None, "SELECT 1", {}, None, False)
+            tracing._after_cursor_execute(conn, SimpleNamespace(rowcount=1), "SELECT 1", {}, None, False)
+    finally:
+        tracing._current.reset(token)
+    root.end()
+    by_name = {item.name: item for item in root.trace.spans}
+    assert by_name["outer"].parent_id == root.span_id
+    assert by_name["db SELECT"].parent_id == outer.span_id
+    assert by_name["db SELECT"].attributes["db.rowcount"] == 1
+
+
+def test_sampling_keeps_forced_and_slow_requests(tmp_path):
+    tracer = Tracer(SpanExporter(str(tmp_path / "t.jsonl"), 100, 10_000, 1), sample_rate=0, slow_ms=50)
+    fast = tracer.start_request("GET /fast", None)
+    fast.end_ns = fast.start_ns + 1_000_000
+    slow = tracer.start_request("GET /slow", None)
+    slow.end_ns = slow.start_ns + 60_000_000
+    forced = tracer.start_request("GET /forced", f"00-{TRACE_ID}-{PARENT_ID}-01")
+    forced.end_ns = forced.start_ns
+    assert not tracer.should_export(fast)
+    assert tracer.should_export(slow)
+    assert tracer.should_export(forced)
+
+
+def test_exporter_writes_otlp_json_lines_and_rotates(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = SpanExporter(str(path), batch_size=1000, max_bytes=600, backups=2)
+    tracer = Tracer(exporter, sample_rate=1, slow_ms=1000)
+    for index in range(3):
+        root = tracer.start_request(f"GET /{index}", None, **{"http.status_code": 200})
+        root.end()
+        exporter.add(root.trace.spans)
+        exporter.flush()
+    exporter.close()
+    assert (tmp_path / "spans.jsonl.1").exists()
+    spans = read_spans(path)
+    assert spans[-1]["name"] == "GET /2"
+    assert spans[-1]["kind"] == tracing.KIND_SERVER
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in spans[-1]["attributes"]
+
+
+def test_middleware_continues_incoming_trace(tmp_path, monkeypatch):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(SpanExporter(str(path), 1000, 1_000_000, 1), sample_rate=0, slow_ms=60_000)
+    monkeypatch.setattr(tracing, "get_tracer", lambda: tracer)
+    item = fake_payment()
+    response = asgi_get(FakeSession([item]), f"/api/v1/requests/{item.id}", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    assert response.status_code == 200
+    tracer.exporter.close()
+
+    (root,) = [item for item in read_spans(path) if item["kind"] == tracing.KIND_SERVER]
+    assert root["traceId"] == TRACE_ID
+    assert root["parentSpanId"] == PARENT_ID
+    assert root["name"] == "GET /api/v1/requests/{request_id}"
+
+
+def test_pool_checkout_gets_a_span_only_when_the_session_touches_the_db(tmp_path):
+    engine = create_engine("sqlite://")
+    tracing.instrument_engine_tracing(SimpleNamespace(sync_engine=engine))
+    tracer = Tracer(SpanExporter(str(tmp_path / "t.jsonl"), 100, 10_000, 1), sample_rate=0, slow_ms=1000)
+    root = tracer.start_request("GET /x", None)
+    token = tracing._current.set(root)
+    try:
+        with Session(engine):
+            pass
+        with Session(engine) as session:
+            session.execute(text("SELECT 1"))
+            session.execute(text("SELECT 2"))
+            session.commit()
+            session.execute(text("SELECT 3"))
+    finally:
+        tracing._current.reset(token)
+    names = [item.name for item in root.trace.spans]
+    assert names.count("db CHECKOUT") == 2
+    assert names.index("db CHECKOUT") < names.index("db SELECT")
+    assert all(item.parent_id == root.span_id and item.error is None for item in root.trace.spans if item.name == "db CHECKOUT")
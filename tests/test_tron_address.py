@@ -0,0 +1,55 @@
+import pytest
+from pydantic import ValidationError
+
+from app.api.schemas import AmlCheckRequest, MarkPaidPayload
+from app.services.tron_address import InvalidTronAddress, normalize_tron_address, normalize_tron_addresses, normalize_tx_hash, tron_address_to_hex
+
+USDT_CONTRACT = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+USDT_CONTRACT_HEX = "41a614f803b6fd780986a42c78ec9c7f77e6ded13c"
+
+
+def test_base58_address_is_canonical() -> None:
+    assert normalize_tron_address(f"  {USDT_CONTRACT} ") == USDT_CONTRACT
+    assert tron_address_to_hex(USDT_CONTRACT) == USDT_CONTRACT_HEX
+
+
+@pytest.mark.parametrize("value", [USDT_CONTRACT_HEX, USDT_CONTRACT_HEX.upper(), "0x" + USDT_CONTRACT_HEX[2:]])
+def test_hex_forms_normalize_to_base58(value: str) -> None:
+    assert normalize_tron_address(value) == USDT_CONTRACT
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6u",  # checksum
+        "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6",  # length
+        "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj60",  # '0' is not base58
+        "42" + USDT_CONTRACT_HEX[2:],  # wrong prefix
+        "TVjsExampleAddress001",
+        "",
+    ],
+)
+def test_invalid_addresses_rejected(value: str) -> None:
+    with pytest.raises(InvalidTronAddress):
+        normalize_tron_address(value)
+
+
+def test_batch_normalization_reports_errors_by_index() -> None:
+    normalized, errors = normalize_tron_addresses([USDT_CONTRACT_HEX, "bogus", USDT_CONTRACT, "bogus"])
+
+    assert normalized == [USDT_CONTRACT, None, USDT_CONTRACT, None]
+    assert set(errors) == {1, 3}
+
+
+def test_schema_normalizes_and_rejects() -> None:
+    assert AmlCheckRequest(address=USDT_CONTRACT_HEX, network="TRON").address == USDT_CONTRACT
+    with pytest.raises(ValidationError):
+        AmlCheckRequest(address="TVjs1", network="TRON")
+
+
+def test_mark_paid_hash_is_normalized_like_settlement() -> None:
+    assert MarkPaidPayload(tx_hash=" 0X" + "AB" * 32 + " ").tx_hash == "ab" * 32
+    assert normalize_tx_hash("0x" + "ab" * 32) == "ab" * 32
+    for value in ("ab" * 31, "zz" * 32, "0x", ""):
+        with pytest.raises(ValidationError):
+            MarkPaidPayload(tx_hash=value)
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.schemas import RequestResponse
+from app.db.models import RequestStatus, TxConfirmation
+from app.services.rate_limit import PriorityLimiter, TokenBucket
+from app.services.tron_address import tron_address_to_hex
+from app.services.tron_node import (
+    TRANSFER_TOPIC,
+    StubTronNodeClient,
+    TokenTransfer,
+    TronNodeThrottled,
+    TronTransaction,
+    parse_transaction_info,
+)
+from app.services.tx_confirmation import SolidifiedCache, confirm_paid_requests
+from tests.fakes import FakeSession
+
+ADDRESS = "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"
+OTHER = "TBXSw8fM4jpQkGc6zZjsVABFpVN7UvXPdV"
+USDT = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+NOW = datetime.now(timezone.utc)
+
+
+def _row(tx_hash: str, amount: str = "125.5", paid_at: datetime = NOW):
+    return SimpleNamespace(id=uuid4(), address=ADDRESS, amount=Decimal(amount), tx_hash=tx_hash, paid_at=paid_at)
+
+
+def _transfer(amount: str = "125.5", to_address: str = ADDRESS) -> TokenTransfer:
+    return TokenTransfer(USDT, to_address, Decimal(amount))
+
+
+def _confirm(db, client, cache=None, limiter=None):
+    return asyncio.run(
+        confirm_paid_requests(
+            db,
+            client,
+            limiter or PriorityLimiter(TokenBucket(0, 1)),
+            cache or SolidifiedCache(100),
+            limit=100,
+            concurrency=4,
+            recheck_after=timedelta(minutes=1),
+            not_found_after=timedelta(hours=24),
+            usdt_contract=USDT,
+        )
+    )
+
+
+def test_transaction_info_is_parsed_into_token_transfers() -> None:
+    info = {
+        "id": "a" * 64,
+        "blockNumber": 65_000_123,
+        "receipt": {"result": "SUCCESS"},
+        "log": [
+            {"address": "00" * 20, "topics": ["ff" * 32], "data": ""},
+            {
+                "address": tron_address_to_hex(USDT)[2:],
+                "topics": [TRANSFER_TOPIC, "0" * 24 + tron_address_to_hex(OTHER)[2:], "0" * 24 + tron_address_to_hex(ADDRESS)[2:]],
+                "data": format(125_500_000, "064x"),
+            },
+        ],
+    }
+    transaction = parse_transaction_info("a" * 64, info)
+    assert transaction == TronTransaction("a" * 64, True, 65_000_123, (_transfer(),))
+    assert parse_transaction_info("b" * 64, {}) is None
+    assert parse_transaction_info("c" * 64, info | {"receipt": {"result": "REVERT"}}).success is False
+
+
+def test_paid_requests_are_verified_and_written_back_in_one_update() -> None:
+    client = StubTronNodeClient(authoritative=True)
+    client.add(TronTransaction("a" * 64, True, 100, (_transfer(to_address=OTHER), _transfer())))
+    client.add(TronTransaction("b" * 64, True, 101, (_transfer("125"),)))
+    client.add(TronTransaction("c" * 64, False, 102, (_transfer(),)))
+    cache = SolidifiedCache(100)
+    cache.add(TronTransaction("f" * 64, True, 99, (_transfer(),)))
+    rows = [
+        _row("a" * 64),
+        _row("b" * 64),
+        _row("c" * 64),
+        _row("d" * 64),
+        _row("e" * 64, paid_at=NOW - timedelta(hours=30)),
+        _row("f" * 64),
+    ]
+    db = FakeSession([rows, None, None])
+
+    result = _confirm(db, client, cache)
+
+    assert (result.checked, result.confirmed, result.mismatched, result.failed) == (6, 2, 1, 1)
+    assert (result.not_found, result.pending, result.errors, result.cached) == (1, 1, 0, 1)
+    assert "f" * 64 not in client.lookups
+    assert cache.get("a" * 64).block_number == 100
+    assert cache.get("d" * 64) is None
+    update_sql = str(db.executed[1].compile(dialect=postgresql.dialect()))
+    assert update_sql.startswith("UPDATE payment_requests SET") and "FROM (VALUES" in update_sql
+    audit = db.executed[2].compile(dialect=postgresql.dialect()).params
+    actions = sorted(value for key, value in audit.items() if key.startswith("action"))
+    assert actions == ["request_tx_failed", "request_tx_mismatch", "request_tx_not_found"]
+
+
+def test_unconfirmed_query_uses_the_worker_queue_order() -> None:
+    db = FakeSession([[]])
+    result = _confirm(db, StubTronNodeClient())
+    sql = str(db.executed[0].compile(dialect=postgresql.dialect()))
+    assert "payment_requests.tx_confirmation IS NULL" in sql
+    assert "ORDER BY payment_requests.tx_checked_at ASC NULLS FIRST, payment_requests.paid_at" in sql
+    assert result.checked == 0 and len(db.executed) == 1
+
+
+def test_node_throttling_pauses_lookups_and_leaves_rows_queued() -> None:
+    class ThrottledClient(StubTronNodeClient):
+        async def get_transaction(self, tx_hash: str):
+            raise TronNodeThrottled(5.0)
+
+    bucket = TokenBucket(10, 10)
+    db = FakeSession([[_row("a" * 64)]])
+    result = _confirm(db, ThrottledClient(), limiter=PriorityLimiter(bucket))
+    assert result.errors == 1
+    assert bucket.wait_time(time.monotonic()) > 4
+    assert len(db.executed) == 1
+
+
+def test_default_stub_never_marks_a_hash_not_found() -> None:
+    db = FakeSession([[_row("e" * 64, paid_at=NOW - timedelta(days=30))], None])
+    result = _confirm(db, StubTronNodeClient())
+    assert (result.not_found, result.pending) == (0, 1)
+    assert len(db.executed) == 2
+
+
+def test_solidified_cache_evicts_least_recently_used() -> None:
+    cache = SolidifiedCache(2)
+    for tx_hash in ("a", "b"):
+        cache.add(TronTransaction(tx_hash, True, 1))
+    cache.get("a")
+    cache.add(TronTransaction("c", True, 1))
+    assert len(cache) == 2
+    assert cache.get("b") is None and cache.get("a") is not None
+
+
+def test_request_response_exposes_confirmation() -> None:
+    row = SimpleNamespace(
+        id=uuid4(),
+        request_no="PAY-202610-000001",
+        creator_id=1,
+        address=ADDRESS,
+        network="TRON",
+        asset="USDT",
+        amount=Decimal("125.5"),
+        comment=None,
+        attachment_url=None,
+        aml_check_id=uuid4(),
+        status=RequestStatus.paid,
+        tx_hash="a" * 64,
+        tx_confirmation=TxConfirmation.confirmed,
+        tx_block_number=100,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    body = RequestResponse.model_validate(row).model_dump(mode="json")
+    assert (body["tx_confirmation"], body["tx_block_number"]) == ("confirmed", 100)
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes_requests import create_request
+from app.api.schemas import RequestCreate
+from app.db.models import RiskLevel, UserRole, WalletCheck
+from app.services.wallet_checks import build_latest_upsert, is_stale, save_wallet_check
+from tests.fakes import FakeProvider, FakeSession, asgi_get
+
+ADDRESS = "TUSQzWDnJfWTmvXrQAx4Vk13LLdp1BJMgC"
+
+
+def _payload(check_id) -> RequestCreate:
+    return RequestCreate(address=ADDRESS, network="TRON", asset="USDT", amount=Decimal("10"), aml_check_id=check_id)
+
+
+def _latest(**overrides):
+    values = dict(
+        address=ADDRESS,
+        network="TRON",
+        check_id=uuid4(),
+        provider="mock",
+        risk_score=Decimal("12.50"),
+        risk_level=RiskLevel.low,
+        checked_at=datetime.now(timezone.utc),
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_save_wallet_check_upserts_latest_row() -> None:
+    db = FakeSession([])
+    result = asyncio.run(FakeProvider().check(ADDRESS, "TRON"))
+    check = asyncio.run(save_wallet_check(db, ADDRESS, "TRON", "mock", result, checked_by=1))
+
+    sql = str(db.executed[0].compile(dialect=postgresql.dialect()))
+    assert "INSERT INTO wallet_risk_latest" in sql
+    assert "ON CONFLICT (address, network) DO UPDATE" in sql
+    assert "WHERE wallet_risk_latest.checked_at <= excluded.checked_at" in sql
+    assert db.executed[0].compile(dialect=postgresql.dialect()).params["check_id"] == check.id
+
+
+def test_upsert_keeps_address_in_conflict_target_only() -> None:
+    check = WalletCheck(id=uuid4(), address=ADDRESS, network="TRON", provider="mock", risk_score=1, risk_level=RiskLevel.low)
+    sql = str(build_latest_upsert(check).compile(dialect=postgresql.dialect()))
+    assert "SET check_id = excluded.check_id" in sql
+    assert "address = excluded.address" not in sql
+
+
+def test_is_stale_uses_max_age(monkeypatch) -> None:
+    now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    assert not is_stale(now - timedelta(hours=71), now)
+    assert is_stale(now - timedelta(hours=73), now)
+    monkeypatch.setattr("app.services.wallet_checks.get_settings", lambda: SimpleNamespace(aml_check_max_age_h=0))
+    assert not is_stale(now - timedelta(days=365), now)
+
+
+def test_create_request_rejects_superseded_check() -> None:
+    latest = _latest()
+    db = FakeSession([latest, uuid4()])
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(create_request(payload=_payload(uuid4()), db=db, actor_id=101, actor_role=UserRole.manager))
+    assert exc.value.status_code == 409
+    assert str(latest.check_id) in exc.value.detail
+
+
+def test_create_request_rejects_stale_check() -> None:
+    latest = _latest(checked_at=datetime.now(timezone.utc) - timedelta(days=10))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(create_request(payload=_payload(latest.check_id), db=FakeSession([latest]), actor_id=101, actor_role=UserRole.manager))
+    assert exc.value.status_code == 409
+    assert "stale" in exc.value.detail
+
+
+def test_get_address_risk_serves_latest_row() -> None:
+    latest = _latest(checked_at=datetime.now(timezone.utc) - timedelta(days=10))
+    res = asgi_get(FakeSession([latest]), f"/api/v1/aml/addresses/{ADDRESS}")
+    assert res.status_code == 200
+    body = res.json()
+    assert body["check_id"] == str(latest.check_id)
+    assert body["risk_level"] == "low"
+    assert body["stale"] is True
+
+
+def test_get_address_risk_not_found_and_invalid() -> None:
+    assert asgi_get(FakeSession([None]), f"/api/v1/aml/addresses/{ADDRESS}").status_code == 404
+    assert asgi_get(FakeSession([]), "/api/v1/aml/addresses/Tnotanaddress").status_code == 422